@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Activity Streaks
+
+Materializes study streaks and activity-heatmap data into user_activity_streaks.
+
+Each user's active days (days with reviews_done > 0 in daily_summary) are kept as
+run-length encoded arrays of (first day, length) runs, sorted by user and day:
+
+- longest streak is the longest run, current streak is the last run if it ends
+  today or yesterday, so both are O(1) per user instead of the O(reviews) scans of
+  rating_history that calculateCurrentStreak does
+- heatmap levels for a date range come from the per-day counts of the last
+  --heatmap-days days, sliced with a binary search (O(days in range)); the level
+  cut-offs are the user's own reviews_done quartiles over that window
+
+daily_summary rows are read incrementally by updated_at (the table's trigger
+keeps it current), so each run re-encodes only the users with new activity and
+upserts their rows. Run with --full after rebuilding daily_summary.
+
+Usage:
+    python activity_streaks.py
+    python activity_streaks.py --full
+    python activity_streaks.py --heatmap USER_ID
+"""
+
+import argparse
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from supabase import create_client
+
+from array_keys import EPOCH, pack
+from supabase_bulk_writer import BulkUpsertWriter
+from supabase_table_reader import iter_table_rows
+
+DEFAULT_STATE_PATH = 'activity_streaks_state.npz'
+HEATMAP_LEVELS = 4
+
+
+def encode_runs(users: np.ndarray, days: np.ndarray):
+    """
+    Run-length encode active days.
+
+    Args:
+        users: User code per active day, sorted together with days
+        days: Day number per active day (unique per user)
+
+    Returns:
+        (run_user, run_start, run_length)
+    """
+    if not len(days):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    breaks = np.ones(len(days), dtype=bool)
+    breaks[1:] = (users[1:] != users[:-1]) | (days[1:] != days[:-1] + 1)
+    starts = np.flatnonzero(breaks)
+    lengths = np.diff(np.append(starts, len(days)))
+    return users[starts], days[starts], lengths
+
+
+def expand_runs(run_user: np.ndarray, run_start: np.ndarray, run_length: np.ndarray):
+    """Inverse of encode_runs: (users, days) of every active day."""
+    users = np.repeat(run_user, run_length)
+    offsets = np.arange(len(users)) - np.repeat(np.cumsum(run_length) - run_length, run_length)
+    return users, np.repeat(run_start, run_length) + offsets
+
+
+def day_number(value: date) -> int:
+    return (value - EPOCH).days
+
+
+class ActivityStreaks:
+    def __init__(self, client, state_path: Optional[str] = DEFAULT_STATE_PATH,
+                 heatmap_days: int = 365, page_size: int = 1000, max_workers: int = 4):
+        """
+        Initialize the materializer.
+
+        Args:
+            client: Supabase client (service role, daily_summary has per-user RLS)
+            state_path: File holding the runs, recent day counts and watermark
+                (None keeps nothing between runs, i.e. always a full rebuild)
+            heatmap_days: Days of per-day counts kept for heatmap levels
+            page_size: Rows per daily_summary page
+            max_workers: Parallel keyset partitions when reading
+        """
+        self.client = client
+        self.state_path = state_path
+        self.heatmap_days = heatmap_days
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.reset_state()
+        self.stats = {
+            'summary_rows_read': 0,
+            'users_updated': 0,
+            'runs': 0,
+            'rows_failed': 0,
+            'seconds': 0.0,
+        }
+
+    def reset_state(self):
+        self.watermark: Optional[str] = None
+        self.user_ids: List[str] = []
+        self.run_user = np.zeros(0, dtype=np.int64)
+        self.run_start = np.zeros(0, dtype=np.int64)
+        self.run_length = np.zeros(0, dtype=np.int64)
+        self.count_keys = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with np.load(self.state_path) as state:
+            self.watermark = str(state['watermark']) or None
+            self.user_ids = state['user_ids'].tolist()
+            self.run_user, self.run_start, self.run_length = state['run_user'], state['run_start'], state['run_length']
+            self.count_keys, self.counts = state['count_keys'], state['counts']
+        print(f"📂 Loaded streak state: {len(self.user_ids)} users, {len(self.run_user)} runs")
+
+    def save_state(self):
+        if not self.state_path:
+            return
+        tmp_path = self.state_path + '.tmp.npz'
+        np.savez(tmp_path, watermark=self.watermark or '', user_ids=np.array(self.user_ids, dtype=str),
+                 run_user=self.run_user, run_start=self.run_start, run_length=self.run_length,
+                 count_keys=self.count_keys, counts=self.counts)
+        os.replace(tmp_path, self.state_path)
+
+    def read_changes(self):
+        """daily_summary rows updated since the watermark as (user, day, reviews) arrays."""
+        user_codes: Dict[str, int] = {user_id: code for code, user_id in enumerate(self.user_ids)}
+        users, days, reviews = [], [], []
+        newest = self.watermark
+        watermark = self.watermark
+        filters = (lambda q: q.gte('updated_at', watermark)) if watermark else None
+        rows = iter_table_rows(self.client, 'daily_summary', ['id', 'user_id', 'date', 'reviews_done', 'updated_at'],
+                               key='id', page_size=self.page_size, max_workers=self.max_workers, filters=filters)
+        for row in rows:
+            code = user_codes.get(row['user_id'])
+            if code is None:
+                code = user_codes[row['user_id']] = len(self.user_ids)
+                self.user_ids.append(row['user_id'])
+            users.append(code)
+            days.append(day_number(date.fromisoformat(row['date'][:10])))
+            reviews.append(row.get('reviews_done') or 0)
+            updated_at = row.get('updated_at')
+            if updated_at and (newest is None or updated_at > newest):
+                newest = updated_at
+        self.stats['summary_rows_read'] = len(users)
+        return (np.array(users, dtype=np.int64), np.array(days, dtype=np.int64),
+                np.array(reviews, dtype=np.int64), newest)
+
+    def apply(self, users: np.ndarray, days: np.ndarray, reviews: np.ndarray, today: int) -> np.ndarray:
+        """Merge changed day counts into the runs and counts; returns the affected user codes."""
+        affected = np.unique(users)
+        keys = pack(users, days)
+
+        # Re-encode affected users: their old active days, minus changed days, plus changed active days
+        old = np.isin(self.run_user, affected)
+        old_users, old_days = expand_runs(self.run_user[old], self.run_start[old], self.run_length[old])
+        old_keys = pack(old_users, old_days)
+        active_keys = np.union1d(old_keys[~np.isin(old_keys, keys)], keys[reviews > 0])
+        new_user, new_start, new_length = encode_runs(active_keys >> 32, active_keys & 0xFFFFFFFF)
+
+        run_user = np.concatenate([self.run_user[~old], new_user])
+        run_start = np.concatenate([self.run_start[~old], new_start])
+        run_length = np.concatenate([self.run_length[~old], new_length])
+        order = np.lexsort((run_start, run_user))
+        self.run_user, self.run_start, self.run_length = run_user[order], run_start[order], run_length[order]
+
+        # Day counts: changed values replace old ones; keep only the heatmap window
+        merged_keys = np.concatenate([keys, self.count_keys])
+        merged_counts = np.concatenate([reviews, self.counts])
+        self.count_keys, first = np.unique(merged_keys, return_index=True)
+        self.counts = merged_counts[first]
+        keep = (self.counts > 0) & ((self.count_keys & 0xFFFFFFFF) > today - self.heatmap_days)
+        self.count_keys, self.counts = self.count_keys[keep], self.counts[keep]
+        return affected
+
+    def user_runs(self, code: int) -> slice:
+        start = np.searchsorted(self.run_user, code, side='left')
+        end = np.searchsorted(self.run_user, code, side='right')
+        return slice(int(start), int(end))
+
+    def user_counts(self, code: int, first_day: int, last_day: int):
+        """(days, counts) of a user within [first_day, last_day]."""
+        lo = np.searchsorted(self.count_keys, pack(np.array([code]), np.array([first_day]))[0])
+        hi = np.searchsorted(self.count_keys, pack(np.array([code]), np.array([last_day]))[0], side='right')
+        return self.count_keys[lo:hi] & 0xFFFFFFFF, self.counts[lo:hi]
+
+    def thresholds(self, code: int, today: int) -> List[int]:
+        """reviews_done cut-offs for heatmap levels 1-4 (quartiles of the user's active days)."""
+        _, counts = self.user_counts(code, today - self.heatmap_days + 1, today)
+        if not len(counts):
+            return []
+        return np.ceil(np.percentile(counts, [0, 25, 50, 75])).astype(int).tolist()
+
+    def heatmap(self, user_id: str, first_day: int, last_day: int) -> np.ndarray:
+        """Level 0-4 for each day in [first_day, last_day] (within the heatmap window)."""
+        code = self.user_ids.index(user_id)
+        days, counts = self.user_counts(code, first_day, last_day)
+        levels = np.zeros(last_day - first_day + 1, dtype=np.int8)
+        cut_offs = self.thresholds(code, last_day)
+        if cut_offs:
+            levels[days - first_day] = np.searchsorted(cut_offs, counts, side='right')
+        return levels
+
+    def streak_row(self, code: int, today: int, refreshed_at: str) -> Dict:
+        runs = self.user_runs(code)
+        starts, lengths = self.run_start[runs], self.run_length[runs]
+        row = {
+            'user_id': self.user_ids[code],
+            'current_streak': 0,
+            'longest_streak': int(lengths.max()) if len(lengths) else 0,
+            'active_days': int(lengths.sum()),
+            'last_run_end': None,
+            'last_run_length': 0,
+            'activity_runs': [[(EPOCH + timedelta(days=int(s))).isoformat(), int(n)]
+                              for s, n in zip(starts, lengths)],
+            'heatmap_thresholds': self.thresholds(code, today),
+            'refreshed_at': refreshed_at,
+        }
+        if len(lengths):
+            last_end = int(starts[-1] + lengths[-1] - 1)
+            row['last_run_end'] = (EPOCH + timedelta(days=last_end)).isoformat()
+            row['last_run_length'] = int(lengths[-1])
+            # Like calculateCurrentStreak: a streak stays alive until a full day is missed
+            if last_end >= today - 1:
+                row['current_streak'] = int(lengths[-1])
+        return row
+
+    def run(self, full: bool = False, dry_run: bool = False, today: Optional[date] = None) -> Dict:
+        """
+        Refresh user_activity_streaks for users with changed daily_summary rows.
+
+        Args:
+            full: Ignore saved state and rebuild every user
+            dry_run: Compute and report, but neither upsert nor save state
+            today: Day current streaks are computed for (default: today in UTC)
+
+        Returns:
+            Stats dict (summary_rows_read, users_updated, runs, rows_failed, seconds)
+        """
+        started = time.monotonic()
+        if full:
+            self.reset_state()
+        else:
+            self.load_state()
+        today_number = day_number(today or datetime.now(timezone.utc).date())
+
+        users, days, reviews, newest = self.read_changes()
+        print(f"📥 Read {len(users)} changed daily_summary rows")
+        if len(users):
+            affected = self.apply(users, days, reviews, today_number)
+            refreshed_at = datetime.now(timezone.utc).isoformat()
+            rows = [self.streak_row(int(code), today_number, refreshed_at) for code in affected]
+            self.stats['users_updated'] = len(rows)
+            if not dry_run:
+                writer = BulkUpsertWriter(self.client, 'user_activity_streaks', on_conflict='user_id')
+                writer.write(rows)
+                self.stats['rows_failed'] = writer.stats['rows_failed']
+        self.stats['runs'] = len(self.run_user)
+
+        # Keep the old state after failed writes so the next run redoes these users
+        if not dry_run and not self.stats['rows_failed']:
+            self.watermark = newest
+            self.save_state()
+        self.stats['seconds'] = time.monotonic() - started
+        return self.stats
+
+    def print_stats(self):
+        """Print a summary of the last run."""
+        print(f"   📥 daily_summary rows read: {self.stats['summary_rows_read']}")
+        print(f"   🔥 Users refreshed: {self.stats['users_updated']}")
+        print(f"   🧱 Runs stored: {self.stats['runs']}")
+        print(f"   ⏱️  Time: {self.stats['seconds']:.1f}s")
+        if self.stats['rows_failed']:
+            print(f"   ❌ Failed rows: {self.stats['rows_failed']} (state not advanced, rerun to retry)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize study streaks and heatmap data")
+    parser.add_argument('--full', action='store_true', help="Rebuild every user from daily_summary")
+    parser.add_argument('--dry-run', action='store_true', help="Compute without writing")
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help="State file")
+    parser.add_argument('--heatmap', metavar='USER_ID', help="Print the last 12 weeks' heatmap for a user")
+    args = parser.parse_args()
+
+    load_dotenv('.env.local')
+    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    if not supabase_url or not supabase_key:
+        raise ValueError("Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY (daily_summary has per-user RLS)")
+
+    print("🔥 Activity Streaks")
+    print("=" * 60)
+    streaks = ActivityStreaks(create_client(supabase_url, supabase_key), state_path=args.state)
+    streaks.run(full=args.full, dry_run=args.dry_run)
+    streaks.print_stats()
+
+    if args.heatmap:
+        today = day_number(datetime.now(timezone.utc).date())
+        levels = streaks.heatmap(args.heatmap, today - 83, today)
+        print(f"\n🗓️  Last 12 weeks for {args.heatmap} (levels 0-{HEATMAP_LEVELS}):")
+        for week in range(12):
+            print("   " + " ".join(" ░▒▓█"[level] for level in levels[week * 7:(week + 1) * 7]))
+
+
+if __name__ == "__main__":
+    main()
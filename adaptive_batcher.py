@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Adaptive Batcher
+
+Sizes bulk LLM requests from measured token usage instead of a fixed word count.
+
+The batcher keeps a smoothed estimate of output tokens per word from every response,
+grows the next batch toward what fits under the output token cap, and requeues only
+the words a response did not return (truncated or unparsed). A batch that comes back
+with nothing is split in half before it is retried. Per-batch token and latency stats
+are kept so runs can be compared.
+"""
+
+import csv
+import math
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+
+class AdaptiveBatcher:
+    def __init__(self, max_output_tokens: int = 4096, initial_batch_size: int = 15,
+                 min_batch_size: int = 1, max_batch_size: int = 80,
+                 safety_margin: float = 0.8, smoothing: float = 0.3,
+                 max_attempts: int = 3, key: Callable = lambda item: item[0]):
+        """
+        Initialize the batcher.
+
+        Args:
+            max_output_tokens: The request's max_tokens
+            initial_batch_size: Batch size used until a response has been measured
+            min_batch_size: Smallest batch ever sent
+            max_batch_size: Largest batch ever sent (keeps prompts and retries bounded)
+            safety_margin: Fraction of max_output_tokens a batch is sized to fill
+            smoothing: Weight of the newest observation in the tokens-per-word estimate
+            max_attempts: Times a word is sent before it is reported as failed
+            key: Function returning the identifier of a work item
+        """
+        self.max_output_tokens = max_output_tokens
+        self.initial_batch_size = initial_batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.safety_margin = safety_margin
+        self.smoothing = smoothing
+        self.max_attempts = max_attempts
+        self.key = key
+
+        self.queue = deque()
+        self.attempts: Dict = {}
+        self.tokens_per_word: Optional[float] = None
+        self.current_size = initial_batch_size
+        self.split_cap: Optional[int] = None
+        self.batch_stats: List[Dict] = []
+
+    def add(self, items: Iterable):
+        """Queue work items."""
+        self.queue.extend(items)
+
+    def reset_attempts(self):
+        """Forget retry counts, e.g. before a new level whose keys restart at 1."""
+        self.attempts.clear()
+
+    def has_pending(self) -> bool:
+        """Whether any items are still queued."""
+        return bool(self.queue)
+
+    def next_batch_size(self) -> int:
+        """Batch size that should fit under the output token cap."""
+        if self.tokens_per_word:
+            target = int(self.max_output_tokens * self.safety_margin / self.tokens_per_word)
+            # Grow gradually so one cheap response does not overshoot the cap
+            size = min(target, self.current_size * 2)
+        else:
+            size = self.current_size
+
+        if self.split_cap is not None:
+            size = min(size, self.split_cap)
+
+        return max(self.min_batch_size, min(self.max_batch_size, size))
+
+    def next_batch(self) -> List:
+        """Pop the next batch of queued items."""
+        self.current_size = self.next_batch_size()
+        size = min(self.current_size, len(self.queue))
+        return [self.queue.popleft() for _ in range(size)]
+
+    def complete(self, batch: List, returned_keys: Set, usage: Optional[Dict] = None) -> List:
+        """
+        Record a response and requeue the words it did not return.
+
+        Args:
+            batch: Items that were sent
+            returned_keys: Keys of the items the response contained
+            usage: Stats for the API call, if one was made; keys 'words_requested',
+                'words_returned', 'output_tokens', 'input_tokens', 'latency', 'stop_reason'
+
+        Returns:
+            Items that exhausted max_attempts and were given up on
+        """
+        missing = [item for item in batch if self.key(item) not in returned_keys]
+        returned = len(batch) - len(missing)
+        for item in batch:
+            if self.key(item) in returned_keys:
+                self.attempts.pop(self.key(item), None)
+
+        if usage:
+            # Words served from a cache are in returned_keys but cost no output tokens
+            self.observe(usage, usage.get('words_returned', returned))
+
+        # Split a batch that produced nothing; otherwise let the estimate drive the size
+        if batch and returned == 0:
+            self.split_cap = max(self.min_batch_size, len(batch) // 2)
+        elif returned:
+            self.split_cap = None
+
+        given_up = []
+        retry = []
+        for item in missing:
+            item_key = self.key(item)
+            self.attempts[item_key] = self.attempts.get(item_key, 0) + 1
+            if self.attempts[item_key] >= self.max_attempts:
+                del self.attempts[item_key]
+                given_up.append(item)
+            else:
+                retry.append(item)
+
+        # Retry missing words first so a level finishes in input order
+        self.queue.extendleft(reversed(retry))
+        return given_up
+
+    def observe(self, usage: Dict, words_returned: int):
+        """Update the tokens-per-word estimate and record per-batch stats."""
+        output_tokens = usage.get('output_tokens') or 0
+        if output_tokens and words_returned:
+            observed = output_tokens / words_returned
+            if usage.get('stop_reason') == 'max_tokens':
+                # The last record was cut off, so the true cost is somewhat higher
+                observed = output_tokens / max(words_returned - 0.5, 0.5)
+            if self.tokens_per_word is None:
+                self.tokens_per_word = observed
+            else:
+                self.tokens_per_word = (self.smoothing * observed
+                                        + (1 - self.smoothing) * self.tokens_per_word)
+
+        self.batch_stats.append({
+            'batch': len(self.batch_stats) + 1,
+            'words_requested': usage.get('words_requested', 0),
+            'words_returned': words_returned,
+            'input_tokens': usage.get('input_tokens', 0),
+            'output_tokens': output_tokens,
+            'latency_seconds': round(usage.get('latency', 0.0), 3),
+            'stop_reason': usage.get('stop_reason', ''),
+            'tokens_per_word_estimate': round(self.tokens_per_word or 0.0, 2),
+        })
+
+    def print_stats(self):
+        """Print a summary of the measured batches."""
+        if not self.batch_stats:
+            return
+        batches = len(self.batch_stats)
+        requested = sum(s['words_requested'] for s in self.batch_stats)
+        returned = sum(s['words_returned'] for s in self.batch_stats)
+        output_tokens = sum(s['output_tokens'] for s in self.batch_stats)
+        input_tokens = sum(s['input_tokens'] for s in self.batch_stats)
+        latencies = sorted(s['latency_seconds'] for s in self.batch_stats)
+        truncated = sum(1 for s in self.batch_stats if s['stop_reason'] == 'max_tokens')
+        p95 = latencies[min(len(latencies) - 1, math.ceil(0.95 * len(latencies)) - 1)]
+
+        print(f"   📦 Batches measured: {batches} (truncated: {truncated})")
+        print(f"   📝 Words per batch: {requested / batches:.1f} requested, {returned / batches:.1f} returned")
+        print(f"   🔢 Tokens: {input_tokens} in, {output_tokens} out "
+              f"(~{self.tokens_per_word or 0:.1f} out/word)")
+        print(f"   ⏱️  Latency: {sum(latencies) / batches:.1f}s avg, {p95:.1f}s p95")
+        print(f"   🎯 Next batch size: {self.next_batch_size()}")
+
+    def save_stats(self, path: str):
+        """Write the per-batch stats to a CSV file."""
+        if not self.batch_stats:
+            return
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.batch_stats[0].keys()))
+            writer.writeheader()
+            writer.writerows(self.batch_stats)
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Analytics Snapshot
+
+Incremental Parquet snapshot of rating_history and user_progress for offline
+reporting, so retention, leech and deck questions are answered from local files
+instead of ad-hoc full scans of the live tables.
+
+Layout (hive partitioning, readable by pyarrow.dataset, DuckDB, pandas):
+
+    analytics_snapshot/
+      rating_history/month=2026-10/user_bucket=07/part-<first id>.parquet
+      user_progress/user_bucket=07/part.parquet
+      vocabulary_decks/part.parquet
+      _state.json
+
+- rating_history is append-only: each run keyset-reads the rows above the id
+  high-water mark and writes one part per (month, user bucket) it touches. Part
+  names carry the run's starting watermark, so a rerun after a crash overwrites
+  its own parts instead of duplicating rows.
+- user_progress rows change in place: rows with updated_at at or after the
+  watermark are read, and only the user buckets they fall in are rewritten
+  (old versions of those ids dropped). updated_at is maintained by the trigger
+  in 20261027_add_user_progress_updated_at_trigger.sql; run --full once after
+  applying it.
+- vocabulary_decks is small and rewritten each run for deck names.
+
+User buckets are crc32(user_id) % --user-buckets, so one user's data always sits
+in one bucket and per-user scans read 1/N of the files.
+
+The app also logs 'learn' and 'know' ratings (logRating); they are kept in the
+snapshot with rating 0 but left out of the review reports, like
+fsrs_batch.ReviewLog.from_rows does.
+
+Usage:
+    python analytics_snapshot.py export
+    python analytics_snapshot.py export --full
+    python analytics_snapshot.py report retention --since 2026-01
+    python analytics_snapshot.py report leeches
+    python analytics_snapshot.py report decks
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from supabase_table_reader import iter_table_rows
+
+DEFAULT_ROOT = 'analytics_snapshot'
+DEFAULT_USER_BUCKETS = 16
+# 'learn' and 'know' (and anything else) are stored as 0 and skipped by the reports
+RATING_CODES = {'again': 1, 'hard': 2, 'good': 3, 'easy': 4}
+
+RATING_HISTORY_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('user_id', pa.string()),
+    ('word_id', pa.int64()),
+    ('deck_id', pa.string()),
+    ('rating', pa.int8()),
+    ('timestamp', pa.timestamp('us', tz='UTC')),
+])
+USER_PROGRESS_SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('user_id', pa.string()),
+    ('word_id', pa.int64()),
+    ('deck_id', pa.string()),
+    ('repetitions', pa.int32()),
+    ('interval', pa.int32()),
+    ('ease_factor', pa.float64()),
+    ('again_count', pa.int32()),
+    ('next_review_date', pa.timestamp('us', tz='UTC')),
+    ('updated_at', pa.timestamp('us', tz='UTC')),
+])
+DECK_SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('name', pa.string()),
+    ('language_a_code', pa.string()),
+    ('total_words', pa.int32()),
+])
+
+# Elapsed-day bins of the retention curve (left edges)
+RETENTION_BINS = [1, 2, 3, 5, 7, 14, 30, 60, 120, 240, 365]
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def user_bucket(user_id: str, buckets: int) -> int:
+    """Stable bucket of a user id (same across runs and machines)."""
+    return zlib.crc32(user_id.encode('utf-8')) % buckets
+
+
+class AnalyticsSnapshot:
+    def __init__(self, client, root: str = DEFAULT_ROOT, user_buckets: int = DEFAULT_USER_BUCKETS,
+                 page_size: int = 1000, max_workers: int = 4):
+        """
+        Initialize the exporter.
+
+        Args:
+            client: Supabase client (service role, both tables have per-user RLS)
+            root: Snapshot directory
+            user_buckets: Number of user hash partitions (fixed for the life of a snapshot)
+            page_size: Rows per page when reading
+            max_workers: Parallel keyset partitions when reading
+        """
+        self.client = client
+        self.root = root
+        self.user_buckets = user_buckets
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.stats = {
+            'ratings_exported': 0,
+            'progress_rows_exported': 0,
+            'files_written': 0,
+            'seconds': 0.0,
+        }
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.root, '_state.json')
+
+    def load_state(self) -> Dict:
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('user_buckets') != self.user_buckets:
+            raise ValueError(f"Snapshot uses {state.get('user_buckets')} user buckets; "
+                             f"rerun with --full to change it")
+        return state
+
+    def save_state(self, state: Dict):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def write_part(self, table: pa.Table, path: str):
+        """Write a Parquet file atomically."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+        self.stats['files_written'] += 1
+
+    def export_rating_history(self, watermark: int) -> int:
+        """Append rating_history rows above the watermark; returns the new watermark."""
+        partitions: Dict[tuple, List[Dict]] = {}
+        highest = watermark
+        rows = iter_table_rows(self.client, 'rating_history',
+                               ['id', 'user_id', 'word_id', 'deck_id', 'rating', 'timestamp'], key='id',
+                               page_size=self.page_size, max_workers=self.max_workers,
+                               filters=lambda q: q.gt('id', watermark))
+        for row in rows:
+            moment = parse_timestamp(row.get('timestamp'))
+            if row['id'] <= watermark or moment is None:
+                continue
+            record = {
+                'id': row['id'],
+                'user_id': row['user_id'],
+                'word_id': row['word_id'],
+                'deck_id': str(row['deck_id']),
+                'rating': RATING_CODES.get(row.get('rating'), 0),
+                'timestamp': moment,
+            }
+            key = (f"{moment.year:04d}-{moment.month:02d}", user_bucket(row['user_id'], self.user_buckets))
+            partitions.setdefault(key, []).append(record)
+            highest = max(highest, row['id'])
+            self.stats['ratings_exported'] += 1
+
+        for (month, bucket), records in partitions.items():
+            path = os.path.join(self.root, 'rating_history', f'month={month}', f'user_bucket={bucket:02d}',
+                                f'part-{watermark}.parquet')
+            self.write_part(pa.Table.from_pylist(records, schema=RATING_HISTORY_SCHEMA), path)
+        print(f"📥 rating_history: {self.stats['ratings_exported']} new rows in {len(partitions)} partitions")
+        return highest
+
+    def export_user_progress(self, watermark: Optional[str]) -> Optional[str]:
+        """Rewrite the user buckets holding rows updated since the watermark; returns the new watermark."""
+        columns = USER_PROGRESS_SCHEMA.names
+        changed: Dict[int, List[Dict]] = {}
+        newest = watermark
+        filters = (lambda q: q.gte('updated_at', watermark)) if watermark else None
+        rows = iter_table_rows(self.client, 'user_progress', columns, key='id',
+                               page_size=self.page_size, max_workers=self.max_workers, filters=filters)
+        for row in rows:
+            record = {column: row.get(column) for column in columns}
+            record['deck_id'] = str(record['deck_id'])
+            record['next_review_date'] = parse_timestamp(record['next_review_date'])
+            record['updated_at'] = parse_timestamp(record['updated_at'])
+            changed.setdefault(user_bucket(row['user_id'], self.user_buckets), []).append(record)
+            if row.get('updated_at') and (newest is None or parse_timestamp(row['updated_at']) > parse_timestamp(newest)):
+                newest = row['updated_at']
+            self.stats['progress_rows_exported'] += 1
+
+        for bucket, records in changed.items():
+            path = os.path.join(self.root, 'user_progress', f'user_bucket={bucket:02d}', 'part.parquet')
+            fresh = pa.Table.from_pylist(records, schema=USER_PROGRESS_SCHEMA)
+            if os.path.exists(path):
+                existing = pq.read_table(path, schema=USER_PROGRESS_SCHEMA)
+                kept = existing.filter(pc.invert(pc.is_in(existing['id'], value_set=fresh['id'])))
+                fresh = pa.concat_tables([kept, fresh])
+            self.write_part(fresh, path)
+        print(f"📥 user_progress: {self.stats['progress_rows_exported']} changed rows in {len(changed)} buckets")
+        return newest
+
+    def export_decks(self):
+        rows = self.client.table('vocabulary_decks').select(','.join(DECK_SCHEMA.names)).execute().data or []
+        records = [dict(row, id=str(row['id'])) for row in rows]
+        self.write_part(pa.Table.from_pylist(records, schema=DECK_SCHEMA),
+                        os.path.join(self.root, 'vocabulary_decks', 'part.parquet'))
+
+    def export(self, full: bool = False) -> Dict:
+        """
+        Bring the snapshot up to date.
+
+        Args:
+            full: Delete the snapshot and export everything again
+
+        Returns:
+            Stats dict (ratings_exported, progress_rows_exported, files_written, seconds)
+        """
+        started = time.monotonic()
+        if full and os.path.exists(self.root):
+            shutil.rmtree(self.root)
+        state = self.load_state()
+
+        rating_watermark = self.export_rating_history(state.get('rating_history_watermark', 0))
+        progress_watermark = self.export_user_progress(state.get('user_progress_watermark'))
+        self.export_decks()
+
+        self.save_state({
+            'user_buckets': self.user_buckets,
+            'rating_history_watermark': rating_watermark,
+            'user_progress_watermark': progress_watermark,
+            'last_export': datetime.now(timezone.utc).isoformat(),
+        })
+        self.stats['seconds'] = time.monotonic() - started
+        return self.stats
+
+    def print_stats(self):
+        """Print a summary of the last export."""
+        print(f"   ⭐ Ratings appended: {self.stats['ratings_exported']}")
+        print(f"   📈 Progress rows refreshed: {self.stats['progress_rows_exported']}")
+        print(f"   📦 Parquet files written: {self.stats['files_written']}")
+        print(f"   ⏱️  Time: {self.stats['seconds']:.1f}s")
+
+
+class SnapshotQuery:
+    """Reports computed locally from an analytics snapshot."""
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+
+    def dataset(self, name: str) -> ds.Dataset:
+        return ds.dataset(os.path.join(self.root, name), format='parquet', partitioning='hive')
+
+    def ratings(self, since_month: Optional[str] = None, columns: Optional[List[str]] = None) -> pa.Table:
+        """rating_history rows, optionally from a month (YYYY-MM) on."""
+        dataset = self.dataset('rating_history')
+        month_filter = ds.field('month') >= since_month if since_month else None
+        return dataset.to_table(columns=columns, filter=month_filter)
+
+    def deck_names(self) -> Dict[str, str]:
+        path = os.path.join(self.root, 'vocabulary_decks', 'part.parquet')
+        if not os.path.exists(path):
+            return {}
+        decks = pq.read_table(path, columns=['id', 'name']).to_pydict()
+        return dict(zip(decks['id'], decks['name']))
+
+    def retention_curve(self, since_month: Optional[str] = None) -> List[Dict]:
+        """
+        Share of reviews recalled (not "again") by days since the card's previous review.
+
+        Args:
+            since_month: Only use ratings from this month (YYYY-MM) on
+
+        Returns:
+            One dict per elapsed-day bin: {'days_from', 'reviews', 'retention'}
+        """
+        table = self.ratings(since_month, ['user_id', 'word_id', 'deck_id', 'rating', 'timestamp'])
+        table = table.filter(pc.greater(table['rating'], 0))
+        users = pc.dictionary_encode(table['user_id']).combine_chunks().indices.to_numpy()
+        decks = pc.dictionary_encode(table['deck_id']).combine_chunks().indices.to_numpy()
+        words = table['word_id'].to_numpy()
+        rating = table['rating'].to_numpy()
+        seconds = pc.cast(table['timestamp'], pa.int64()).to_numpy() / 1e6
+
+        order = np.lexsort((seconds, words, decks, users))
+        users, decks, words, rating, seconds = users[order], decks[order], words[order], rating[order], seconds[order]
+        same_card = (users[1:] == users[:-1]) & (decks[1:] == decks[:-1]) & (words[1:] == words[:-1])
+        elapsed = np.floor(seconds[1:] / 86400) - np.floor(seconds[:-1] / 86400)
+        scored = same_card & (elapsed >= 1)
+        elapsed, recalled = elapsed[scored], rating[1:][scored] > 1
+
+        bins = np.searchsorted(RETENTION_BINS, elapsed, side='right') - 1
+        reviews = np.bincount(bins, minlength=len(RETENTION_BINS))
+        successes = np.bincount(bins, weights=recalled, minlength=len(RETENTION_BINS))
+        return [{'days_from': RETENTION_BINS[i], 'reviews': int(reviews[i]),
+                 'retention': round(float(successes[i] / reviews[i]), 4) if reviews[i] else None}
+                for i in range(len(RETENTION_BINS))]
+
+    def leech_rates(self, threshold: int = 4) -> List[Dict]:
+        """Share of each deck's progress rows with again_count >= threshold, worst first."""
+        table = self.dataset('user_progress').to_table(columns=['deck_id', 'again_count'])
+        grouped = table.append_column('leech', pc.greater_equal(table['again_count'], threshold)) \
+            .group_by('deck_id').aggregate([('leech', 'sum'), ('leech', 'count')])
+        names = self.deck_names()
+        rows = [{'deck_id': deck_id, 'deck': names.get(deck_id, deck_id), 'cards': count,
+                 'leeches': leeches, 'leech_rate': round(leeches / count, 4)}
+                for deck_id, leeches, count in zip(grouped['deck_id'].to_pylist(),
+                                                   grouped['leech_sum'].to_pylist(),
+                                                   grouped['leech_count'].to_pylist())]
+        return sorted(rows, key=lambda row: row['leech_rate'], reverse=True)
+
+    def deck_difficulty(self, since_month: Optional[str] = None) -> List[Dict]:
+        """Per deck: reviews, again rate and reviews per studied word, hardest first."""
+        table = self.ratings(since_month, ['deck_id', 'user_id', 'word_id', 'rating'])
+        table = table.filter(pc.greater(table['rating'], 0))
+        table = table.append_column('again', pc.equal(table['rating'], 1))
+        per_deck = table.group_by('deck_id').aggregate([('again', 'sum'), ('again', 'count')])
+        cards = table.group_by(['deck_id', 'user_id', 'word_id']).aggregate([]) \
+            .group_by('deck_id').aggregate([('word_id', 'count')])
+        card_counts = dict(zip(cards['deck_id'].to_pylist(), cards['word_id_count'].to_pylist()))
+        names = self.deck_names()
+        rows = []
+        for deck_id, again, reviews in zip(per_deck['deck_id'].to_pylist(), per_deck['again_sum'].to_pylist(),
+                                           per_deck['again_count'].to_pylist()):
+            rows.append({'deck_id': deck_id, 'deck': names.get(deck_id, deck_id), 'reviews': reviews,
+                         'again_rate': round(again / reviews, 4),
+                         'reviews_per_card': round(reviews / card_counts[deck_id], 2)})
+        return sorted(rows, key=lambda row: row['again_rate'], reverse=True)
+
+
+def print_report(name: str, rows: List[Dict], limit: int):
+    print(f"\n📊 {name}")
+    print("=" * 60)
+    for row in rows[:limit]:
+        print("   " + "  ".join(f"{key}={value}" for key, value in row.items() if key != 'deck_id'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parquet snapshot of rating_history and user_progress")
+    parser.add_argument('--root', default=DEFAULT_ROOT, help="Snapshot directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export', help="Bring the snapshot up to date")
+    export_parser.add_argument('--full', action='store_true', help="Re-export everything")
+    export_parser.add_argument('--user-buckets', type=int, default=DEFAULT_USER_BUCKETS)
+    report_parser = commands.add_parser('report', help="Compute a report from the snapshot")
+    report_parser.add_argument('report', choices=['retention', 'leeches', 'decks'])
+    report_parser.add_argument('--since', help="First month to include (YYYY-MM)")
+    report_parser.add_argument('--limit', type=int, default=25, help="Rows to print")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        from dotenv import load_dotenv
+        from supabase import create_client
+
+        load_dotenv('.env.local')
+        supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+        supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+        if not supabase_url or not supabase_key:
+            raise ValueError("Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY (both tables have per-user RLS)")
+
+        print("📦 Analytics Snapshot Export")
+        print("=" * 60)
+        snapshot = AnalyticsSnapshot(create_client(supabase_url, supabase_key), root=args.root,
+                                     user_buckets=args.user_buckets)
+        snapshot.export(full=args.full)
+        snapshot.print_stats()
+        return
+
+    query = SnapshotQuery(args.root)
+    started = time.monotonic()
+    if args.report == 'retention':
+        print_report("Retention by days since previous review", query.retention_curve(args.since), args.limit)
+    elif args.report == 'leeches':
+        print_report("Leech rate by deck", query.leech_rates(), args.limit)
+    else:
+        print_report("Deck difficulty (again rate)", query.deck_difficulty(args.since), args.limit)
+    print(f"\n⏱️  Computed in {time.monotonic() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
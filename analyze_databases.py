@@ -4,48 +4,39 @@ Database Analysis Script for Multi-Language Vocabulary Trainer
 Analyzes existing vocabulary databases and prepares migration data
 """
 
-import sqlite3
 import json
 from pathlib import Path
 from typing import Dict, List, Any
 
-def analyze_database(db_path: str, language_a: str, language_b: str) -> Dict[str, Any]:
-    """Analyze a vocabulary database and return its structure and sample data"""
-    
-    print(f"\n🔍 Analyzing {db_path}")
-    print(f"Language Pair: {language_a} → {language_b}")
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Get schema
-    cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='vocabulary'")
-    schema = cursor.fetchone()[0]
-    
-    # Get total count
-    cursor.execute("SELECT COUNT(*) FROM vocabulary")
-    total_count = cursor.fetchone()[0]
-    
-    # Get sample data
-    cursor.execute("SELECT * FROM vocabulary LIMIT 3")
-    sample_data = cursor.fetchall()
-    
-    # Get column names
-    cursor.execute("PRAGMA table_info(vocabulary)")
-    columns = [col[1] for col in cursor.fetchall()]
+from sqlite_source_scanner import SQLiteSourceScanner
+
+def analysis_from_profile(profile: Dict[str, Any], language_a: str, language_b: str) -> Dict[str, Any]:
+    """Turn a scanner profile into the analysis of its vocabulary table"""
     
-    conn.close()
+    if 'vocabulary' not in profile['tables']:
+        raise ValueError(f"No vocabulary table (tables: {', '.join(profile['tables']) or 'none'})")
+    table = profile['tables']['vocabulary']
     
     return {
-        "db_path": db_path,
+        "db_path": profile["db_path"],
         "language_a": language_a,
         "language_b": language_b,
-        "schema": schema,
-        "total_count": total_count,
-        "columns": columns,
-        "sample_data": sample_data
+        "schema": table["schema"],
+        "total_count": table["row_count"],
+        "columns": table["columns"],
+        "sample_data": table["sample_data"]
     }
 
+def analyze_database(db_path: str, language_a: str, language_b: str,
+                     scanner: SQLiteSourceScanner = None) -> Dict[str, Any]:
+    """Analyze a vocabulary database and return its structure and sample data"""
+    
+    print(f"\n🔍 Analyzing {db_path}")
+    print(f"Language Pair: {language_a} → {language_b}")
+    
+    scanner = scanner or SQLiteSourceScanner()
+    return analysis_from_profile(scanner.profile(db_path), language_a, language_b)
+
 def create_migration_plan(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Create a migration plan based on the analyzed databases"""
     
@@ -104,14 +95,21 @@ def main():
         }
     ]
     
-    # Analyze each database
+    # Analyze all databases in parallel (read-only, cached by file mtime)
+    scanner = SQLiteSourceScanner()
+    profiles = scanner.profile_many([db_info["path"] for db_info in databases])
+    
     analyses = []
-    for db_info in databases:
+    for db_info, (db_path, profile, error) in zip(databases, profiles):
+        print(f"\n🔍 Analyzing {db_path}")
+        print(f"Language Pair: {db_info['language_a']} → {db_info['language_b']}")
         try:
-            analysis = analyze_database(db_info["path"], db_info["language_a"], db_info["language_b"])
-            analyses.append(analysis)
+            if error:
+                raise error
+            analyses.append(analysis_from_profile(profile, db_info["language_a"], db_info["language_b"]))
         except Exception as e:
-            print(f"❌ Error analyzing {db_info['path']}: {e}")
+            print(f"❌ Error analyzing {db_path}: {e}")
+    scanner.print_stats()
     
     # Create migration plan
     migration_plan = create_migration_plan(analyses)
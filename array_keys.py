@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Array Keys
+
+NumPy helpers shared by the batch analytics jobs: packing two integer columns
+into one sortable int64 key, summing values per key, and the day numbering
+(days since 1970-01-01) used for date columns.
+"""
+
+from datetime import date
+
+import numpy as np
+
+EPOCH = date(1970, 1, 1)
+
+
+def pack(high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """Pack two non-negative int arrays into one int64 key array (high << 32 | low)."""
+    return (high.astype(np.int64) << 32) | low.astype(np.int64)
+
+
+def sum_by_key(keys: np.ndarray, *values: np.ndarray):
+    """Sorted unique keys and the per-key sums of each value array."""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    sums = [np.bincount(inverse, weights=value, minlength=len(unique)).astype(np.int64) for value in values]
+    return unique, sums
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Bulk Upsert Benchmark
+
+Compares the old serial upsert loop (fixed 1000-row batches, one request at a time)
+with BulkUpsertWriter on synthetic word_similarities rows.
+
+By default both run against an in-process PostgREST stand-in that charges a fixed
+round-trip latency plus a per-kilobyte cost and fails a configurable share of
+requests. Pass --url to run against a real local PostgREST instead (the table and
+its unique constraint must exist).
+
+Usage:
+    python bench_bulk_upsert.py
+    python bench_bulk_upsert.py --rows 200000 --latency 0.15 --failure-rate 0.02
+    python bench_bulk_upsert.py --url http://localhost:3000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from supabase_bulk_writer import BulkUpsertWriter
+
+
+class SimulatedPostgrest:
+    """Minimal stand-in for client.table(name).upsert(rows, on_conflict=...).execute()."""
+
+    def __init__(self, latency: float, seconds_per_kb: float, failure_rate: float, seed: int = 0):
+        self.latency = latency
+        self.seconds_per_kb = seconds_per_kb
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.rows: Dict[tuple, Dict] = {}
+        self.requests = 0
+
+    def table(self, name: str):
+        return _SimulatedTable(self, name)
+
+
+class _SimulatedTable:
+    def __init__(self, server: SimulatedPostgrest, name: str):
+        self.server = server
+        self.name = name
+        self.payload: List[Dict] = []
+        self.on_conflict = ""
+
+    def upsert(self, rows, on_conflict: str = ""):
+        self.payload = rows if isinstance(rows, list) else [rows]
+        self.on_conflict = on_conflict
+        return self
+
+    def execute(self):
+        server = self.server
+        size_kb = len(json.dumps(self.payload).encode("utf-8")) / 1024
+        with server.lock:
+            server.requests += 1
+            fail = server.random.random() < server.failure_rate
+        time.sleep(server.latency + size_kb * server.seconds_per_kb)
+        if fail:
+            raise RuntimeError("simulated 503 Service Unavailable")
+
+        columns = self.on_conflict.split(",") if self.on_conflict else ['id']
+        with server.lock:
+            for row in self.payload:
+                server.rows[tuple(row.get(column) for column in columns)] = row
+        return self
+
+
+def synthetic_rows(count: int, seed: int = 1) -> List[Dict]:
+    """Distinct word_similarities rows with realistic column sizes."""
+    rng = random.Random(seed)
+    rows = []
+    seen = set()
+    while len(rows) < count:
+        source, target = rng.randint(1, 50000), rng.randint(1, 50000)
+        if source == target or (source, target) in seen:
+            continue
+        seen.add((source, target))
+        rows.append({
+            'source_word_id': source,
+            'target_word_id': target,
+            'similarity_score': round(rng.uniform(0.5, 1.0), 3),
+            'rule_types': rng.sample(['same_radical', 'similar_pronunciation', 'shared_character', 'visual_similarity'], 2),
+            'algorithm_version': 'bench_v1',
+        })
+    return rows
+
+
+def interrupt_after(rows: List[Dict], count: int):
+    """Yield the first count rows, then stop like a Ctrl-C would."""
+    yield from rows[:count]
+    raise KeyboardInterrupt
+
+
+def serial_upsert(client, rows: List[Dict], batch_size: int = 1000) -> Dict:
+    """The loop the migration scripts used before BulkUpsertWriter."""
+    started = time.monotonic()
+    sent = failed = 0
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i + batch_size]
+        try:
+            client.table('word_similarities').upsert(
+                batch, on_conflict='source_word_id,target_word_id,algorithm_version'
+            ).execute()
+            sent += len(batch)
+        except Exception:
+            failed += len(batch)
+    return {'rows_sent': sent, 'rows_failed': failed, 'seconds': time.monotonic() - started}
+
+
+def make_client(args):
+    if args.url:
+        from postgrest import SyncPostgrestClient
+        headers = {'Authorization': f'Bearer {args.token}'} if args.token else {}
+        return SyncPostgrestClient(args.url, headers=headers)
+    return SimulatedPostgrest(args.latency, args.seconds_per_kb, args.failure_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs pipelined bulk upserts")
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--latency', type=float, default=0.08, help="Simulated round trip in seconds")
+    parser.add_argument('--seconds-per-kb', type=float, default=0.0004, help="Simulated server cost per KB")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Share of simulated requests that fail")
+    parser.add_argument('--max-in-flight', type=int, default=4)
+    parser.add_argument('--url', help="Real PostgREST base URL instead of the simulated stand-in")
+    parser.add_argument('--token', help="JWT for the PostgREST instance")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    print(f"🧪 {len(rows)} rows, {'PostgREST at ' + args.url if args.url else 'simulated PostgREST'}")
+    print("=" * 60)
+
+    client = make_client(args)
+    serial = serial_upsert(client, rows)
+    print(f"🐢 Serial 1000-row batches: {serial['rows_sent']} rows in {serial['seconds']:.2f}s "
+          f"({serial['rows_sent'] / serial['seconds']:.0f} rows/s, {serial['rows_failed']} lost)")
+
+    client = make_client(args)
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger_path = os.path.join(tmp, 'ledger.jsonl')
+        writer = BulkUpsertWriter(client, 'word_similarities',
+                                  on_conflict='source_word_id,target_word_id,algorithm_version',
+                                  max_in_flight=args.max_in_flight, base_delay=0.1,
+                                  ledger_path=ledger_path)
+        writer.write(rows)
+        print(f"🚀 BulkUpsertWriter:")
+        writer.print_stats()
+
+        # Interrupt a run halfway, then rerun with the same ledger: only the rest is sent
+        resume_path = os.path.join(tmp, 'resume_ledger.jsonl')
+        interrupted = BulkUpsertWriter(client, 'word_similarities',
+                                       on_conflict='source_word_id,target_word_id,algorithm_version',
+                                       ledger_path=resume_path)
+        try:
+            interrupted.write(interrupt_after(rows, len(rows) // 2))
+        except KeyboardInterrupt:
+            pass
+        rerun = BulkUpsertWriter(client, 'word_similarities',
+                                 on_conflict='source_word_id,target_word_id,algorithm_version',
+                                 ledger_path=resume_path)
+        rerun.write(rows)
+        print(f"🔁 Resume with ledger: {rerun.stats['rows_skipped']} skipped, {rerun.stats['rows_sent']} sent, "
+              f"ledger {'kept' if os.path.exists(resume_path) else 'cleared'}")
+
+    if isinstance(client, SimulatedPostgrest):
+        print(f"📦 Stand-in holds {len(client.rows)} rows after {client.requests} requests")
+
+    speedup = serial['seconds'] / writer.stats['seconds'] if writer.stats['seconds'] else 0
+    print(f"\n⚡ Speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Chinese Conversion Benchmark
+
+Compares the old per-entry `str.replace` loop with PhraseConverter on the
+TRADITIONAL_TO_SIMPLIFIED mappings of migrate_hsk6_decks.py and
+migrate_chinese_financial_decks.py.
+
+The mappings are read from the scripts' source (importing them would connect to
+Supabase). Words and sentences are synthetic, built from the mapping phrases and
+common filler characters, unless --db points at the merged SQLite vocabulary files.
+
+Usage:
+    python bench_chinese_conversion.py
+    python bench_chinese_conversion.py --words 20000 --repeat 5
+    python bench_chinese_conversion.py --db "/path/to/hsk6_vocab_batch_merged_*.db"
+"""
+
+import argparse
+import ast
+import glob
+import random
+import sqlite3
+import time
+from typing import Dict, List
+
+from chinese_converter import PhraseConverter
+
+SCRIPTS = {
+    'HSK6': 'migrate_hsk6_decks.py',
+    'Financial': 'migrate_chinese_financial_decks.py',
+}
+
+FILLER = '的是在了我你他她们这那有个不人来去说到会要和就也都很还把被让给从对为上下中大小多少'
+
+
+def load_mapping(script_path: str) -> Dict[str, str]:
+    """Read TRADITIONAL_TO_SIMPLIFIED from a script without executing it."""
+    with open(script_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                getattr(target, 'id', None) == 'TRADITIONAL_TO_SIMPLIFIED' for target in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"No TRADITIONAL_TO_SIMPLIFIED in {script_path}")
+
+
+def replace_loop(mapping: Dict[str, str], text: str) -> str:
+    """The conversion the migration scripts used before PhraseConverter."""
+    if not text:
+        return text
+    result = text
+    for traditional, simplified in mapping.items():
+        result = result.replace(traditional, simplified)
+    return result
+
+
+def synthetic_vocabulary(mapping: Dict[str, str], count: int, seed: int = 1) -> List[Dict]:
+    rng = random.Random(seed)
+    phrases = list(mapping) + list(mapping.values())
+
+    def sentence(length: int) -> str:
+        parts = []
+        while sum(len(part) for part in parts) < length:
+            parts.append(rng.choice(phrases) if rng.random() < 0.3 else rng.choice(FILLER))
+        return ''.join(parts) + '。'
+
+    return [{
+        'word_number': i,
+        'language_a_word': rng.choice(phrases),
+        'language_a_sentence': sentence(rng.randint(12, 40)),
+    } for i in range(count)]
+
+
+def database_vocabulary(pattern: str) -> List[Dict]:
+    vocabulary = []
+    for path in sorted(glob.glob(pattern)):
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        for word_number, word, sentence in conn.execute(
+                "SELECT word_number, chinese_word, example_sentence FROM vocabulary ORDER BY word_number"):
+            vocabulary.append({'word_number': word_number, 'language_a_word': word,
+                               'language_a_sentence': sentence})
+        conn.close()
+    return vocabulary
+
+
+def timed(function, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark traditional to simplified conversion")
+    parser.add_argument('--words', type=int, default=5000, help="Synthetic words per mapping")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per variant (best is reported)")
+    parser.add_argument('--db', help="Glob of SQLite vocabulary files to use instead of synthetic data")
+    args = parser.parse_args()
+
+    fields = ['language_a_word', 'language_a_sentence']
+
+    for label, script in SCRIPTS.items():
+        mapping = load_mapping(script)
+        vocabulary = database_vocabulary(args.db) if args.db else synthetic_vocabulary(mapping, args.words)
+        texts = [row[field] for row in vocabulary for field in fields]
+        characters = sum(len(text) for text in texts if text)
+
+        phrase_only = PhraseConverter(mapping)
+        derived = PhraseConverter(mapping, derive_characters=True)
+
+        print(f"\n🀄 {label}: {len(mapping)} entries, {len(vocabulary)} words, {characters} characters")
+        print(f"   Regex phrases: {len(phrase_only.phrases)} phrase-only, {len(derived.phrases)} with derived characters "
+              f"({len(derived.char_table)} characters in the translate table)")
+        print("-" * 60)
+
+        variants = [
+            ("replace loop", lambda: [replace_loop(mapping, text) for text in texts]),
+            ("trie regex, per text", lambda: [phrase_only.convert(text) for text in texts]),
+            ("translate + regex, per text", lambda: [derived.convert(text) for text in texts]),
+            ("translate + regex, batch", lambda: derived.convert_vocabulary(vocabulary, fields)),
+        ]
+        baseline = None
+        for name, function in variants:
+            seconds = timed(function, args.repeat)
+            baseline = baseline or seconds
+            print(f"   {name:<30} {seconds * 1000:9.1f} ms  {baseline / seconds:6.1f}x")
+
+        expected = [replace_loop(mapping, text) for text in texts]
+        same_phrase = sum(a == b for a, b in zip(expected, (phrase_only.convert(t) for t in texts)))
+        same_derived = sum(a == b for a, b in zip(expected, (derived.convert(t) for t in texts)))
+        print(f"   Same output as the loop: {same_phrase}/{len(texts)} phrase-only, "
+              f"{same_derived}/{len(texts)} with derived characters")
+
+        # Differences come from overlapping phrases the loop handled in dictionary order
+        traditional = set(''.join(mapping)) - set(''.join(mapping.values()))
+        left_loop = sum(char in traditional for text in expected for char in text)
+        left_derived = sum(char in traditional for text in texts for char in derived.convert(text))
+        print(f"   Traditional characters left: {left_loop} after the loop, {left_derived} after the converter")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Chinese Converter
+
+Traditional to simplified conversion from a phrase mapping, compiled once.
+
+The migration scripts used to call `str.replace` once per mapping entry for every
+field, so each conversion cost O(entries x text). PhraseConverter compiles the
+mapping into:
+
+- a `str.translate` table for single characters, which converts a whole string in
+  one C-level pass
+- one regex built from a trie of the multi-character phrases, matched leftmost and
+  longest first, for the phrases the character table cannot express
+
+With `derive_characters=True` the character table is also learnt from the phrases:
+wherever a phrase and its conversion have the same length, each changed character
+pair is added (pairs that disagree between phrases are left out). Phrases that are
+then fully covered by the table are dropped from the regex, which for the HSK6 and
+financial mappings leaves nothing but the translate pass. It also converts
+traditional characters outside the listed phrases (e.g. 學 in 學者), so only enable
+it for mappings whose keys are traditional-only forms.
+
+Phrases are replaced in a single left-to-right pass, so an overlap such as 大學習
+matches 大學 instead of depending on dictionary order like the replace loop did.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Joins batch items into one string; never part of a mapping key
+_SEPARATOR = '\x00'
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """Regex matching any of the phrases, longest first, with shared prefixes merged."""
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A phrase ends here: greedy optional tries the longer continuation first
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+class PhraseConverter:
+    def __init__(self, mapping: Dict[str, str], derive_characters: bool = False):
+        """
+        Compile a conversion mapping.
+
+        Args:
+            mapping: Source phrase -> replacement (single characters allowed)
+            derive_characters: Also learn single-character conversions from
+                equal-length phrases (see module docstring)
+        """
+        self.char_table: Dict[int, str] = {}
+        for source, target in mapping.items():
+            if len(source) == 1 and source != target:
+                self.char_table[ord(source)] = target
+
+        if derive_characters:
+            derived: Dict[int, str] = {}
+            conflicting = set()
+            for source, target in mapping.items():
+                if len(source) < 2 or len(source) != len(target):
+                    continue
+                for a, b in zip(source, target):
+                    if a != b:
+                        if derived.get(ord(a), b) != b:
+                            conflicting.add(ord(a))
+                        derived[ord(a)] = b
+            for code, char in derived.items():
+                if code not in conflicting:
+                    self.char_table.setdefault(code, char)
+
+        # Only phrases the character table gets wrong need the regex
+        self.phrases = {source: target for source, target in mapping.items()
+                        if len(source) > 1 and source.translate(self.char_table) != target}
+        self.pattern = re.compile(_trie_pattern(self.phrases)) if self.phrases else None
+
+    def convert(self, text: Optional[str]) -> Optional[str]:
+        """Convert one string (None and empty strings are returned unchanged)."""
+        if not text:
+            return text
+        if self.pattern is None:
+            return text.translate(self.char_table)
+
+        pieces: List[str] = []
+        position = 0
+        for match in self.pattern.finditer(text):
+            pieces.append(text[position:match.start()].translate(self.char_table))
+            pieces.append(self.phrases[match.group()])
+            position = match.end()
+        pieces.append(text[position:].translate(self.char_table))
+        return ''.join(pieces)
+
+    def convert_many(self, texts: Iterable[Optional[str]]) -> List[Optional[str]]:
+        """
+        Convert a batch of strings in one pass.
+
+        Args:
+            texts: Strings to convert (None and empty values are kept as they are)
+
+        Returns:
+            Converted strings in the same order
+        """
+        texts = list(texts)
+        present = [i for i, text in enumerate(texts) if text]
+        if not present:
+            return texts
+
+        joined = _SEPARATOR.join(texts[i] for i in present)
+        if joined.count(_SEPARATOR) != len(present) - 1:
+            # The separator occurs in the input itself; convert one by one
+            return [self.convert(text) for text in texts]
+
+        results = list(texts)
+        for i, converted in zip(present, self.convert(joined).split(_SEPARATOR)):
+            results[i] = converted
+        return results
+
+    def convert_vocabulary(self, rows: List[Dict], fields: Iterable[str]) -> List[Dict]:
+        """
+        Convert the given fields of every row in a vocabulary list.
+
+        Args:
+            rows: Vocabulary dicts
+            fields: Keys to convert in each row
+
+        Returns:
+            New row dicts with the fields converted
+        """
+        fields = list(fields)
+        converted = [dict(row) for row in rows]
+        for field in fields:
+            values = self.convert_many(row.get(field) for row in rows)
+            for row, value in zip(converted, values):
+                if field in row:
+                    row[field] = value
+        return converted
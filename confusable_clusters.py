@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Confusable Clusters
+
+Groups mutually confusable words into clusters and exports them as study sets.
+
+The similarity results (word_similarities, or an analyzer CSV) are turned into an
+undirected weighted graph held as edge arrays, and clustered with one of:
+
+- labels: label propagation. Every round, a random half of the words takes the
+  label with the highest total edge weight among its neighbours (keeping its own
+  label on ties), computed for all words at once with packed (word, label) keys
+  and bincount. Stops when no label changes.
+- components: connected components (union-find by min-label propagation with
+  pointer jumping). Coarser; neighbours-of-neighbours chains end up together.
+
+Cluster ids are the smallest node id in the cluster (vocabulary id for database
+runs), stored per word in word_confusable_clusters; rows of words that no longer
+have a similar word are deleted after the upsert. Study sets are the clusters
+with at least two words; clusters larger than --max-set-size are cut into
+breadth-first chunks so each set still holds neighbouring words.
+
+Usage:
+    python confusable_clusters.py --dry-run
+    python confusable_clusters.py --method components --max-set-size 12
+    python confusable_clusters.py --csv word-relationship-analyzer/french_word_similarities_detailed.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from supabase_table_reader import iter_rows_by_ids, iter_table_rows
+
+DEFAULT_EXPORT_PATH = 'confusable_study_sets.json'
+SCORED_WORD = re.compile(r'^(.*?)\s*\(([\d.]+)\)$')
+
+
+def undirected_edges(node_count: int, sources: np.ndarray, targets: np.ndarray,
+                     weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Both directions of every edge once, with the larger weight of duplicates."""
+    keep = sources != targets
+    rows = np.concatenate([sources[keep], targets[keep]])
+    cols = np.concatenate([targets[keep], sources[keep]])
+    weights = np.concatenate([weights[keep], weights[keep]])
+    keys = rows * node_count + cols
+    order = np.lexsort((weights, keys))
+    keys, weights = keys[order], weights[order]
+    last = np.ones(len(keys), dtype=bool)
+    last[:-1] = keys[1:] != keys[:-1]
+    keys, weights = keys[last], weights[last]
+    return keys // node_count, keys % node_count, weights
+
+
+def connected_components(node_count: int, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Component label (smallest node index) per node."""
+    labels = np.arange(node_count)
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, rows, labels[cols])
+        # Pointer jumping: follow labels to their own labels until they settle
+        while True:
+            jumped = updated[updated]
+            if np.array_equal(jumped, updated):
+                break
+            updated = jumped
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def label_propagation(node_count: int, rows: np.ndarray, cols: np.ndarray, weights: np.ndarray,
+                      max_rounds: int = 50, seed: int = 0) -> Tuple[np.ndarray, int]:
+    """
+    Community label per node by weighted label propagation.
+
+    Args:
+        node_count: Number of nodes
+        rows, cols, weights: Undirected edges, both directions present
+        max_rounds: Upper bound on rounds
+        seed: Random seed for update order and tie-breaking
+
+    Returns:
+        (labels, rounds run)
+    """
+    rng = np.random.default_rng(seed)
+    labels = np.arange(node_count)
+    connected = np.bincount(rows, minlength=node_count) > 0
+    for round_number in range(1, max_rounds + 1):
+        keys = rows * node_count + labels[cols]
+        unique, inverse = np.unique(keys, return_inverse=True)
+        score = np.bincount(inverse, weights=weights)
+        node, label = unique // node_count, unique % node_count
+        # Prefer the current label on ties, then break remaining ties randomly
+        score = score + (label == labels[node]) * 1e-6 + rng.random(len(score)) * 1e-9
+        order = np.lexsort((-score, node))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = node[order][1:] != node[order][:-1]
+        best = np.full(node_count, -1)
+        best[node[order][first]] = label[order][first]
+
+        move = connected & (rng.random(node_count) < 0.5) & (best != labels)
+        if not move.any():
+            # Confirm with a full pass: nobody would move
+            if not (connected & (best != labels)).any():
+                return labels, round_number
+            continue
+        labels = np.where(move, best, labels)
+    return labels, max_rounds
+
+
+def canonical_clusters(labels: np.ndarray, node_ids: np.ndarray) -> np.ndarray:
+    """Relabel clusters by their smallest node id."""
+    unique, inverse = np.unique(labels, return_inverse=True)
+    smallest = np.full(len(unique), np.iinfo(np.int64).max)
+    np.minimum.at(smallest, inverse, node_ids)
+    return smallest[inverse]
+
+
+def study_sets(cluster: np.ndarray, rows: np.ndarray, cols: np.ndarray, max_set_size: int) -> List[List[int]]:
+    """Node index lists per study set: clusters of 2+ nodes, large ones cut into breadth-first chunks."""
+    neighbours: Dict[int, List[int]] = {}
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        neighbours.setdefault(row, []).append(col)
+
+    members: Dict[int, List[int]] = {}
+    for node in neighbours:
+        members.setdefault(int(cluster[node]), []).append(node)
+
+    sets = []
+    for cluster_id in sorted(members):
+        nodes = members[cluster_id]
+        if len(nodes) < 2:
+            continue
+        if len(nodes) <= max_set_size:
+            sets.append(sorted(nodes))
+            continue
+        # Breadth-first from the best-connected word keeps neighbours in the same chunk
+        inside = set(nodes)
+        seen = set()
+        ordered = []
+        for start in sorted(nodes, key=lambda n: -len(neighbours[n])):
+            if start in seen:
+                continue
+            seen.add(start)
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                ordered.append(node)
+                for neighbour in neighbours[node]:
+                    if neighbour in inside and neighbour not in seen:
+                        seen.add(neighbour)
+                        queue.append(neighbour)
+        sets.extend(ordered[i:i + max_set_size] for i in range(0, len(ordered), max_set_size))
+    return sets
+
+
+def graph_from_database(client, weighted: bool = False):
+    """(node ids, sources, targets, weights) from word_similarities, nodes are vocabulary ids."""
+    columns = ['id', 'source_word_id', 'target_word_id'] + (['confusability_weight'] if weighted else [])
+    sources, targets, weights = [], [], []
+    for row in iter_table_rows(client, 'word_similarities', columns, key='id'):
+        sources.append(row['source_word_id'])
+        targets.append(row['target_word_id'])
+        weights.append(row.get('confusability_weight') or 1.0)
+    node_ids, inverse = np.unique(np.array(sources + targets, dtype=np.int64), return_inverse=True)
+    half = len(sources)
+    return node_ids, inverse[:half], inverse[half:], np.array(weights, dtype=np.float64)
+
+
+def graph_from_csv(path: str):
+    """(words, sources, targets, weights) from an analyzer CSV (scores used when present)."""
+    codes: Dict[str, int] = {}
+    sources, targets, weights = [], [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            similar = row.get('similar_words_with_scores') or row.get('similar_words') or ''
+            source = codes.setdefault(row['target_word'], len(codes))
+            for item in filter(None, (part.strip() for part in similar.split(', '))):
+                match = SCORED_WORD.match(item)
+                word, score = (match.group(1), float(match.group(2))) if match else (item, 1.0)
+                sources.append(source)
+                targets.append(codes.setdefault(word, len(codes)))
+                weights.append(score)
+    return (np.array(list(codes), dtype=object), np.array(sources, dtype=np.int64),
+            np.array(targets, dtype=np.int64), np.array(weights, dtype=np.float64))
+
+
+class ConfusableClusters:
+    def __init__(self, method: str = 'labels', max_set_size: int = 10, seed: int = 0):
+        """
+        Initialize the clustering.
+
+        Args:
+            method: 'labels' (label propagation) or 'components' (connected components)
+            max_set_size: Largest study set; bigger clusters are split
+            seed: Random seed for label propagation
+        """
+        if method not in ('labels', 'components'):
+            raise ValueError(f"Unknown method: {method}")
+        self.method = method
+        self.max_set_size = max_set_size
+        self.seed = seed
+        self.stats = {
+            'words': 0,
+            'edges': 0,
+            'clusters': 0,
+            'largest_cluster': 0,
+            'study_sets': 0,
+            'rounds': 0,
+            'seconds': 0.0,
+        }
+
+    def cluster(self, node_ids: np.ndarray, sources: np.ndarray, targets: np.ndarray,
+                weights: np.ndarray) -> Dict:
+        """
+        Cluster the graph.
+
+        Args:
+            node_ids: Identity of each node (vocabulary ids or words); ids must sort
+            sources, targets: Edge endpoints as node indices
+            weights: Edge weights
+
+        Returns:
+            {'cluster': cluster id per node, 'size': cluster size per node,
+             'connected': nodes with at least one edge, 'sets': study sets as node index lists}
+        """
+        started = time.monotonic()
+        count = len(node_ids)
+        rows, cols, edge_weights = undirected_edges(count, sources, targets, weights)
+        if self.method == 'labels':
+            labels, self.stats['rounds'] = label_propagation(count, rows, cols, edge_weights, seed=self.seed)
+        else:
+            labels = connected_components(count, rows, cols)
+
+        ranks = np.argsort(np.argsort(node_ids, kind='stable'))
+        cluster_rank = canonical_clusters(labels, ranks)
+        cluster = np.asarray(node_ids)[np.argsort(ranks)][cluster_rank]
+        _, inverse, sizes = np.unique(cluster_rank, return_inverse=True, return_counts=True)
+        connected = np.bincount(rows, minlength=count) > 0
+        sets = study_sets(cluster_rank, rows, cols, self.max_set_size)
+
+        self.stats['words'] = int(connected.sum())
+        self.stats['edges'] = len(rows) // 2
+        self.stats['clusters'] = len(np.unique(cluster_rank[connected]))
+        self.stats['largest_cluster'] = int(sizes[inverse][connected].max()) if connected.any() else 0
+        self.stats['study_sets'] = len(sets)
+        self.stats['seconds'] = time.monotonic() - started
+        return {'cluster': cluster, 'size': sizes[inverse], 'connected': connected, 'sets': sets}
+
+    def print_stats(self):
+        """Print a summary of the last clustering."""
+        print(f"   🔤 Words with similar words: {self.stats['words']}")
+        print(f"   🔗 Similar pairs: {self.stats['edges']}")
+        print(f"   🧩 Clusters: {self.stats['clusters']} (largest {self.stats['largest_cluster']} words)")
+        print(f"   📚 Study sets: {self.stats['study_sets']} (at most {self.max_set_size} words)")
+        if self.method == 'labels':
+            print(f"   🔁 Label propagation rounds: {self.stats['rounds']}")
+        print(f"   ⏱️  Time: {self.stats['seconds']:.2f}s")
+
+
+def cluster_rows(node_ids: np.ndarray, result: Dict, method: str, updated_at: str) -> List[Dict]:
+    """word_confusable_clusters rows for connected words, stamped with the run's updated_at."""
+    connected = np.flatnonzero(result['connected'])
+    return [{'vocabulary_id': int(node_ids[i]), 'cluster_id': int(result['cluster'][i]),
+             'cluster_size': int(result['size'][i]), 'method': method, 'updated_at': updated_at}
+            for i in connected.tolist()]
+
+
+def delete_stale_rows(client, updated_at: str) -> int:
+    """Delete word_confusable_clusters rows not refreshed by the run stamped updated_at."""
+    result = client.table('word_confusable_clusters').delete().lt('updated_at', updated_at).execute()
+    return len(result.data or [])
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def export_study_sets(path: str, node_ids: np.ndarray, result: Dict, words: Optional[Dict] = None):
+    """Write study sets as JSON (vocabulary word and translation when known)."""
+    sets = []
+    for number, nodes in enumerate(result['sets'], 1):
+        entries = []
+        for node in nodes:
+            node_id = _plain(node_ids[node])
+            entry = {'id': node_id}
+            if words and node_id in words:
+                entry.update(words[node_id])
+            entries.append(entry)
+        sets.append({'set': number, 'cluster_id': _plain(result['cluster'][nodes[0]]), 'words': entries})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(sets, f, ensure_ascii=False, indent=2)
+    print(f"💾 Exported {len(sets)} study sets to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster confusable words and export study sets")
+    parser.add_argument('--method', choices=['labels', 'components'], default='labels')
+    parser.add_argument('--max-set-size', type=int, default=10, help="Largest study set")
+    parser.add_argument('--weighted', action='store_true', help="Weight edges by learned confusability_weight")
+    parser.add_argument('--csv', help="Cluster an analyzer CSV instead of word_similarities (no database writes)")
+    parser.add_argument('--output', default=DEFAULT_EXPORT_PATH, help="Study sets JSON")
+    parser.add_argument('--dry-run', action='store_true', help="Do not write word_confusable_clusters")
+    args = parser.parse_args()
+
+    print("🧩 Confusable Clusters")
+    print("=" * 60)
+    clusters = ConfusableClusters(method=args.method, max_set_size=args.max_set_size)
+
+    if args.csv:
+        node_ids, sources, targets, weights = graph_from_csv(args.csv)
+        result = clusters.cluster(node_ids, sources, targets, weights)
+        clusters.print_stats()
+        export_study_sets(args.output, node_ids, result)
+        return
+
+    from dotenv import load_dotenv
+    from supabase import create_client
+    from supabase_bulk_writer import BulkUpsertWriter
+
+    load_dotenv('.env.local')
+    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    if not supabase_url or not supabase_key:
+        raise ValueError("Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
+    client = create_client(supabase_url, supabase_key)
+
+    node_ids, sources, targets, weights = graph_from_database(client, weighted=args.weighted)
+    result = clusters.cluster(node_ids, sources, targets, weights)
+    clusters.print_stats()
+
+    set_words = {int(node_ids[node]) for nodes in result['sets'] for node in nodes}
+    words = {row['id']: {'word': row['language_a_word'], 'translation': row['language_b_translation']}
+             for row in iter_rows_by_ids(client, 'vocabulary', 'id', sorted(set_words),
+                                         ['id', 'language_a_word', 'language_b_translation'])}
+    export_study_sets(args.output, node_ids, result, words)
+
+    if not args.dry_run:
+        updated_at = datetime.now(timezone.utc).isoformat()
+        writer = BulkUpsertWriter(client, 'word_confusable_clusters', on_conflict='vocabulary_id')
+        writer.write(cluster_rows(node_ids, result, args.method, updated_at))
+        writer.print_stats()
+        # Words that lost all their similar words were not upserted; their old rows go
+        if writer.stats['rows_failed'] == 0:
+            print(f"🧹 Deleted {delete_stale_rows(client, updated_at)} outdated cluster rows")
+        else:
+            print("⚠️  Keeping outdated cluster rows because some upserts failed")
+
+
+if __name__ == "__main__":
+    main()
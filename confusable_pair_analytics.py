@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Confusable Pair Analytics
+
+Measures whether similar words (word_similarities) actually cause "again"
+ratings, and writes a learned confusability weight back to each similarity row.
+
+rating_history is loaded once as integer arrays (user, word, time, failed) and
+sorted by user and time. For each review, the previous --lags reviews of the same
+user inside --window seconds are paired with it; pair keys are packed as
+(min word, max word) and joined against the sorted similarity pair keys with a
+binary-search merge, so the whole history is processed in one pass of array
+operations per lag rather than a lookup per review.
+
+For each similarity pair:
+
+- co_exposures: reviews of one word shortly after the other was seen
+- co_failures: those reviews rated "again"
+- confusability_weight: co_failures / expected failures, where the expectation
+  uses each reviewed word's own failure rate over the full history, smoothed
+  towards 1.0 with --prior pseudo-failures. 1.0 means no interference, 2.0 means
+  twice as many failures as the word normally gets.
+
+Per word, the share of its failures that came right after a confusable
+neighbour is reported as a leech signal.
+
+Usage:
+    python confusable_pair_analytics.py --dry-run
+    python confusable_pair_analytics.py --window 900 --lags 8
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import numpy as np
+from dotenv import load_dotenv
+from supabase import create_client
+
+from array_keys import pack
+from supabase_bulk_writer import rpc_in_batches
+from supabase_table_reader import iter_rows_by_ids, iter_table_rows
+
+
+def load_reviews(client) -> Dict[str, np.ndarray]:
+    """rating_history as arrays sorted by (user, time)."""
+    user_codes: Dict[str, int] = {}
+    users, words, seconds, failed = [], [], [], []
+    rows = iter_table_rows(client, 'rating_history', ['id', 'user_id', 'word_id', 'rating', 'timestamp'], key='id')
+    for row in rows:
+        if not row.get('timestamp'):
+            continue
+        moment = datetime.fromisoformat(row['timestamp'].replace('Z', '+00:00'))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        users.append(user_codes.setdefault(row['user_id'], len(user_codes)))
+        words.append(row['word_id'])
+        seconds.append(moment.timestamp())
+        failed.append(row.get('rating') == 'again')
+
+    users = np.array(users, dtype=np.int64)
+    seconds = np.array(seconds, dtype=np.float64)
+    order = np.lexsort((seconds, users))
+    print(f"📥 Loaded {len(users)} ratings from {len(user_codes)} users")
+    return {
+        'user': users[order],
+        'word': np.array(words, dtype=np.int64)[order],
+        'seconds': seconds[order],
+        'failed': np.array(failed, dtype=bool)[order],
+    }
+
+
+def load_similarities(client) -> Dict[str, np.ndarray]:
+    """word_similarities rows with undirected pair keys."""
+    ids, sources, targets = [], [], []
+    for row in iter_table_rows(client, 'word_similarities', ['id', 'source_word_id', 'target_word_id'], key='id'):
+        ids.append(row['id'])
+        sources.append(row['source_word_id'])
+        targets.append(row['target_word_id'])
+    sources = np.array(sources, dtype=np.int64)
+    targets = np.array(targets, dtype=np.int64)
+    print(f"🔗 Loaded {len(ids)} similarity rows")
+    return {
+        'id': np.array(ids, dtype=np.int64),
+        'source': sources,
+        'target': targets,
+        'pair_key': pack(np.minimum(sources, targets), np.maximum(sources, targets)),
+    }
+
+
+class ConfusablePairAnalytics:
+    def __init__(self, window_seconds: float = 600.0, lags: int = 5, prior: float = 2.0):
+        """
+        Initialize the analysis.
+
+        Args:
+            window_seconds: How soon after seeing word A a review of B counts as exposed to A
+            lags: How many previous reviews of the same user are checked
+            prior: Pseudo-failures pulling weights of rarely seen pairs towards 1.0
+        """
+        self.window_seconds = window_seconds
+        self.lags = lags
+        self.prior = prior
+        self.stats = {
+            'reviews': 0,
+            'pairs': 0,
+            'pairs_observed': 0,
+            'co_exposures': 0,
+            'co_failures': 0,
+            'seconds': 0.0,
+        }
+
+    def co_occurrences(self, reviews: Dict[str, np.ndarray], pair_keys: np.ndarray):
+        """
+        (review index, pair index) for every review preceded by a similar word within the window.
+
+        Args:
+            reviews: Arrays from load_reviews (sorted by user and time)
+            pair_keys: Sorted unique undirected similarity pair keys
+
+        Returns:
+            (review indices, pair indices), each (review, pair) once
+        """
+        user, word, seconds = reviews['user'], reviews['word'], reviews['seconds']
+        found = []
+        for lag in range(1, self.lags + 1):
+            current = np.arange(lag, len(word))
+            previous = current - lag
+            close = (user[current] == user[previous]) & (seconds[current] - seconds[previous] <= self.window_seconds)
+            current, previous = current[close], previous[close]
+            a, b = word[previous], word[current]
+            keys = pack(np.minimum(a, b), np.maximum(a, b))
+            positions = np.minimum(np.searchsorted(pair_keys, keys), len(pair_keys) - 1)
+            hit = (pair_keys[positions] == keys) & (a != b)
+            found.append(pack(current[hit], positions[hit]))
+
+        if not found:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        # A neighbour seen twice in the window still counts once for the review
+        unique = np.unique(np.concatenate(found))
+        return unique >> 32, unique & 0xFFFFFFFF
+
+    def analyze(self, reviews: Dict[str, np.ndarray], similarities: Dict[str, np.ndarray]) -> Dict:
+        """
+        Co-failure statistics per similarity row and per word.
+
+        Returns:
+            {'rows': per similarity row arrays (id, co_exposures, co_failures, confusability_weight),
+             'words': per word arrays (word_id, reviews, failures, confused_failures)}
+        """
+        started = time.monotonic()
+        word, failed = reviews['word'], reviews['failed']
+        self.stats['reviews'] = len(word)
+        pair_keys, row_pairs = np.unique(similarities['pair_key'], return_inverse=True)
+        self.stats['pairs'] = len(pair_keys)
+        if not len(word) or not len(pair_keys):
+            raise ValueError("Need ratings and similarity rows to analyze")
+
+        # Each word's own failure rate over the whole history
+        word_ids, word_index = np.unique(word, return_inverse=True)
+        word_reviews = np.bincount(word_index)
+        word_failures = np.bincount(word_index, weights=failed).astype(np.int64)
+        base_rate = word_failures / word_reviews
+
+        review_index, pair_index = self.co_occurrences(reviews, pair_keys)
+        exposures = np.bincount(pair_index, minlength=len(pair_keys))
+        co_failures = np.bincount(pair_index, weights=failed[review_index], minlength=len(pair_keys))
+        expected = np.bincount(pair_index, weights=base_rate[word_index[review_index]], minlength=len(pair_keys))
+        weight = (co_failures + self.prior) / (expected + self.prior)
+
+        confused = np.zeros(len(word), dtype=bool)
+        confused[review_index] = True
+        confused_failures = np.bincount(word_index, weights=failed & confused, minlength=len(word_ids))
+
+        self.stats['pairs_observed'] = int((exposures > 0).sum())
+        self.stats['co_exposures'] = int(exposures.sum())
+        self.stats['co_failures'] = int(co_failures.sum())
+        self.stats['seconds'] = time.monotonic() - started
+        return {
+            'rows': {
+                'id': similarities['id'],
+                'source': similarities['source'],
+                'target': similarities['target'],
+                'co_exposures': exposures[row_pairs],
+                'co_failures': co_failures[row_pairs].astype(np.int64),
+                'confusability_weight': weight[row_pairs],
+            },
+            'words': {
+                'word_id': word_ids,
+                'reviews': word_reviews,
+                'failures': word_failures,
+                'confused_failures': confused_failures.astype(np.int64),
+            },
+        }
+
+    def print_stats(self):
+        """Print a summary of the last analysis."""
+        print(f"   ⭐ Ratings analyzed: {self.stats['reviews']}")
+        print(f"   🔗 Similar pairs: {self.stats['pairs']} ({self.stats['pairs_observed']} seen together)")
+        print(f"   👀 Co-exposures: {self.stats['co_exposures']}")
+        print(f"   ❌ Co-failures: {self.stats['co_failures']}")
+        print(f"   ⏱️  Time: {self.stats['seconds']:.2f}s")
+
+
+def weight_rows(result: Dict) -> List[Dict]:
+    """apply_confusability_weights payload for every similarity row."""
+    rows = result['rows']
+    return [{'id': row_id, 'co_exposures': exposures, 'co_failures': failures, 'confusability_weight': round(weight, 4)}
+            for row_id, exposures, failures, weight in zip(rows['id'].tolist(), rows['co_exposures'].tolist(),
+                                                           rows['co_failures'].tolist(),
+                                                           rows['confusability_weight'].tolist())]
+
+
+def print_report(client, result: Dict, limit: int, min_exposures: int):
+    """Most confusing pairs and the words whose failures are most often interference."""
+    rows, words = result['rows'], result['words']
+    seen = rows['co_exposures'] >= min_exposures
+    top_pairs = np.flatnonzero(seen)[np.argsort(-rows['confusability_weight'][seen])][:limit]
+
+    share = np.divide(words['confused_failures'], words['failures'],
+                      out=np.zeros(len(words['failures'])), where=words['failures'] > 0)
+    eligible = np.flatnonzero(words['failures'] >= min_exposures)
+    top_words = eligible[np.argsort(-share[eligible])][:limit]
+
+    word_ids = set(rows['source'][top_pairs].tolist()) | set(rows['target'][top_pairs].tolist()) | \
+        set(words['word_id'][top_words].tolist())
+    text = {row['id']: row['language_a_word']
+            for row in iter_rows_by_ids(client, 'vocabulary', 'id', sorted(word_ids), ['id', 'language_a_word'])}
+
+    print(f"\n🔀 Most confusable pairs (at least {min_exposures} co-exposures):")
+    for i in top_pairs:
+        print(f"   {text.get(rows['source'][i], rows['source'][i])} ↔ {text.get(rows['target'][i], rows['target'][i])}: "
+              f"weight {rows['confusability_weight'][i]:.2f} "
+              f"({rows['co_failures'][i]}/{rows['co_exposures'][i]} failed)")
+
+    print(f"\n🩹 Words whose failures most often follow a similar word:")
+    for i in top_words:
+        print(f"   {text.get(words['word_id'][i], words['word_id'][i])}: {share[i] * 100:.0f}% of "
+              f"{words['failures'][i]} failures")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Learn confusability weights from rating_history")
+    parser.add_argument('--window', type=float, default=600.0, help="Seconds after seeing a word that count as exposure")
+    parser.add_argument('--lags', type=int, default=5, help="Previous reviews checked per review")
+    parser.add_argument('--prior', type=float, default=2.0, help="Smoothing pseudo-failures")
+    parser.add_argument('--min-exposures', type=int, default=20, help="Minimum co-exposures for the report")
+    parser.add_argument('--limit', type=int, default=20, help="Rows in each report section")
+    parser.add_argument('--dry-run', action='store_true', help="Report without writing weights")
+    args = parser.parse_args()
+
+    load_dotenv('.env.local')
+    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    if not supabase_url or not supabase_key:
+        raise ValueError("Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY (rating_history has per-user RLS)")
+    client = create_client(supabase_url, supabase_key)
+
+    print("🔀 Confusable Pair Analytics")
+    print("=" * 60)
+    analytics = ConfusablePairAnalytics(window_seconds=args.window, lags=args.lags, prior=args.prior)
+    result = analytics.analyze(load_reviews(client), load_similarities(client))
+    analytics.print_stats()
+    print_report(client, result, args.limit, args.min_exposures)
+
+    if not args.dry_run:
+        stats = rpc_in_batches(client, 'apply_confusability_weights', weight_rows(result))
+        print(f"\n💾 Updated {stats['updated']} word_similarities rows ({stats['failed']} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Daily Summary Rollup
+
+Rebuilds per-day review totals from rating_history in bulk, incrementally, into
+daily_summary_rollup.
+
+rating_history is streamed with keyset pages (only id, user_id, word_id and
+timestamp) starting after the highest id already rolled up. The new rows are turned
+into NumPy arrays and grouped per (user, day) with packed 64-bit keys:
+
+- reviews_done is the number of ratings on that day
+- new_words_learned is the number of words the user rated for the first time ever
+  on that day
+
+The running totals and the set of (user, word) pairs already seen are kept in a
+local state file next to the high-water mark, so each run only reads the rows added
+since the last one and upserts only the (user_id, date) rows they touch. With the
+table kept current this way, dashboard stats are reads of a few rows instead of
+count scans over rating_history.
+
+The totals go to their own table rather than daily_summary: the app increments
+daily_summary after every study session (DailySummaryManager.logDailySummary),
+keyed by the user's local date, and overwriting those rows with recounted totals
+would make the next session's increment count the same reviews twice.
+
+Days are calendar days at a fixed UTC offset (UTC by default). Changing the offset
+needs --full. Rows committed with an id below the high-water mark after a run (long
+concurrent transactions) are not picked up until the next --full rebuild.
+
+Usage:
+    python daily_summary_rollup.py
+    python daily_summary_rollup.py --full --utc-offset-minutes 120
+    python daily_summary_rollup.py --dry-run
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from supabase import create_client
+
+from array_keys import EPOCH, pack, sum_by_key
+from supabase_bulk_writer import BulkUpsertWriter
+from supabase_table_reader import iter_table_rows
+
+DEFAULT_STATE_PATH = 'daily_summary_rollup_state.npz'
+ROLLUP_TABLE = 'daily_summary_rollup'
+
+
+def parse_day(timestamp: str, utc_offset_minutes: int = 0) -> int:
+    """Days since 1970-01-01 of a timestamptz string, at the given UTC offset."""
+    moment = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    local = moment.astimezone(timezone(timedelta(minutes=utc_offset_minutes)))
+    return (local.date() - EPOCH).days
+
+
+class DailySummaryRollup:
+    def __init__(self, client, state_path: Optional[str] = DEFAULT_STATE_PATH,
+                 utc_offset_minutes: int = 0, page_size: int = 1000, max_workers: int = 4):
+        """
+        Initialize the rollup.
+
+        Args:
+            client: Supabase client (service role, daily_summary_rollup is read-only for users)
+            state_path: File holding the high-water mark and running totals
+                (None keeps nothing between runs, i.e. always a full rebuild)
+            utc_offset_minutes: Offset used to cut timestamps into days
+            page_size: Rows per rating_history page
+            max_workers: Parallel keyset partitions when reading
+        """
+        self.client = client
+        self.state_path = state_path
+        self.utc_offset_minutes = utc_offset_minutes
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.reset_state()
+        self.stats = {
+            'ratings_read': 0,
+            'days_updated': 0,
+            'new_words': 0,
+            'rows_failed': 0,
+            'watermark': 0,
+            'seconds': 0.0,
+        }
+
+    def reset_state(self):
+        self.watermark = 0
+        self.user_ids: List[str] = []
+        self.summary_keys = np.zeros(0, dtype=np.int64)
+        self.reviews = np.zeros(0, dtype=np.int64)
+        self.new_words = np.zeros(0, dtype=np.int64)
+        self.seen_pairs = np.zeros(0, dtype=np.int64)
+
+    def load_state(self):
+        """Load the previous run's state, if it used the same UTC offset."""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with np.load(self.state_path) as state:
+            if int(state['utc_offset_minutes']) != self.utc_offset_minutes:
+                raise ValueError(f"State was built with UTC offset {int(state['utc_offset_minutes'])} min; "
+                                 f"rerun with --full to change it")
+            self.watermark = int(state['watermark'])
+            self.user_ids = state['user_ids'].tolist()
+            self.summary_keys = state['summary_keys']
+            self.reviews = state['reviews']
+            self.new_words = state['new_words']
+            self.seen_pairs = state['seen_pairs']
+        print(f"📂 Loaded rollup state: watermark {self.watermark}, {len(self.user_ids)} users, "
+              f"{len(self.summary_keys)} user-days")
+
+    def save_state(self):
+        if not self.state_path:
+            return
+        tmp_path = self.state_path + '.tmp.npz'
+        np.savez(tmp_path, watermark=self.watermark, utc_offset_minutes=self.utc_offset_minutes,
+                 user_ids=np.array(self.user_ids, dtype=str), summary_keys=self.summary_keys,
+                 reviews=self.reviews, new_words=self.new_words, seen_pairs=self.seen_pairs)
+        os.replace(tmp_path, self.state_path)
+
+    def read_new_ratings(self):
+        """Stream rating_history rows above the watermark into (user, word, day) arrays."""
+        user_codes: Dict[str, int] = {user_id: code for code, user_id in enumerate(self.user_ids)}
+        users, words, days = [], [], []
+        highest = self.watermark
+
+        rows = iter_table_rows(self.client, 'rating_history', ['id', 'user_id', 'word_id', 'timestamp'],
+                               key='id', page_size=self.page_size, max_workers=self.max_workers,
+                               filters=lambda q: q.gt('id', self.watermark))
+        for row in rows:
+            if row['id'] <= self.watermark or not row.get('timestamp'):
+                continue
+            code = user_codes.get(row['user_id'])
+            if code is None:
+                code = user_codes[row['user_id']] = len(self.user_ids)
+                self.user_ids.append(row['user_id'])
+            users.append(code)
+            words.append(row['word_id'])
+            days.append(parse_day(row['timestamp'], self.utc_offset_minutes))
+            if row['id'] > highest:
+                highest = row['id']
+
+        return (np.array(users, dtype=np.int64), np.array(words, dtype=np.int64),
+                np.array(days, dtype=np.int64), highest)
+
+    def aggregate(self, users: np.ndarray, words: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """Fold new ratings into the running totals; returns the touched summary keys."""
+        day_keys = pack(users, days)
+        touched, (review_counts,) = sum_by_key(day_keys, np.ones(len(day_keys)))
+
+        # First day of each (user, word) pair among the new rows
+        pair_keys = pack(users, words)
+        order = np.lexsort((days, pair_keys))
+        pair_keys, pair_days, pair_users = pair_keys[order], days[order], users[order]
+        first = np.ones(len(pair_keys), dtype=bool)
+        first[1:] = pair_keys[1:] != pair_keys[:-1]
+        pair_keys, pair_days, pair_users = pair_keys[first], pair_days[first], pair_users[first]
+
+        # Only pairs never seen in earlier runs count as new words
+        if len(self.seen_pairs):
+            positions = np.searchsorted(self.seen_pairs, pair_keys)
+            known = (positions < len(self.seen_pairs)) & \
+                (self.seen_pairs[np.minimum(positions, len(self.seen_pairs) - 1)] == pair_keys)
+        else:
+            known = np.zeros(len(pair_keys), dtype=bool)
+        fresh = ~known
+        self.stats['new_words'] = int(fresh.sum())
+
+        new_word_keys = pack(pair_users[fresh], pair_days[fresh])
+        self.seen_pairs = np.union1d(self.seen_pairs, pair_keys[fresh])
+
+        keys = np.concatenate([self.summary_keys, touched, new_word_keys])
+        reviews = np.concatenate([self.reviews, review_counts, np.zeros(len(new_word_keys), dtype=np.int64)])
+        new_words = np.concatenate([self.new_words, np.zeros(len(touched), dtype=np.int64),
+                                    np.ones(len(new_word_keys), dtype=np.int64)])
+        self.summary_keys, (self.reviews, self.new_words) = sum_by_key(keys, reviews, new_words)
+        return touched
+
+    def summary_rows(self, keys: np.ndarray) -> List[Dict]:
+        """daily_summary_rollup rows for the given packed (user, day) keys."""
+        positions = np.searchsorted(self.summary_keys, keys)
+        rows = []
+        for key, index in zip(keys.tolist(), positions.tolist()):
+            rows.append({
+                'user_id': self.user_ids[key >> 32],
+                'date': (EPOCH + timedelta(days=key & 0xFFFFFFFF)).isoformat(),
+                'reviews_done': int(self.reviews[index]),
+                'new_words_learned': int(self.new_words[index]),
+            })
+        return rows
+
+    def run(self, full: bool = False, dry_run: bool = False) -> Dict:
+        """
+        Roll up new rating_history rows into daily_summary_rollup.
+
+        Args:
+            full: Ignore the saved state and rebuild every user-day from scratch
+            dry_run: Compute and report, but neither upsert nor save state
+
+        Returns:
+            Stats dict (ratings_read, days_updated, new_words, rows_failed, watermark, seconds)
+        """
+        started = time.monotonic()
+        if full:
+            self.reset_state()
+        else:
+            self.load_state()
+
+        users, words, days, highest = self.read_new_ratings()
+        self.stats['ratings_read'] = len(users)
+        print(f"📥 Read {len(users)} new ratings above id {self.watermark}")
+
+        if len(users):
+            touched = self.aggregate(users, words, days)
+            rows = self.summary_rows(touched)
+            self.stats['days_updated'] = len(rows)
+            print(f"🧮 {len(rows)} user-days changed, {self.stats['new_words']} first-time words")
+
+            if not dry_run:
+                writer = BulkUpsertWriter(self.client, ROLLUP_TABLE, on_conflict='user_id,date')
+                writer.write(rows)
+                self.stats['rows_failed'] = writer.stats['rows_failed']
+
+        # Keep the old state after failed writes so the next run redoes these rows
+        if not dry_run and not self.stats['rows_failed']:
+            self.watermark = highest
+            self.save_state()
+        self.stats['watermark'] = self.watermark
+        self.stats['seconds'] = time.monotonic() - started
+        return self.stats
+
+    def print_stats(self):
+        """Print a summary of the last run."""
+        print(f"   📥 Ratings read: {self.stats['ratings_read']}")
+        print(f"   📅 User-days upserted: {self.stats['days_updated']}")
+        print(f"   🆕 First-time words: {self.stats['new_words']}")
+        print(f"   🔖 High-water mark: rating_history.id {self.stats['watermark']}")
+        print(f"   ⏱️  Time: {self.stats['seconds']:.1f}s")
+        if self.stats['rows_failed']:
+            print(f"   ❌ Failed rows: {self.stats['rows_failed']} (state not advanced, rerun to retry)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll rating_history up into daily_summary_rollup")
+    parser.add_argument('--full', action='store_true', help="Rebuild from the first rating")
+    parser.add_argument('--dry-run', action='store_true', help="Compute without writing")
+    parser.add_argument('--utc-offset-minutes', type=int, default=0, help="Offset used to cut days")
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help="Rollup state file")
+    args = parser.parse_args()
+
+    load_dotenv('.env.local')
+    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    if not supabase_url or not supabase_key:
+        raise ValueError("Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY (daily_summary_rollup is service-role only)")
+
+    print("📊 Daily Summary Rollup")
+    print("=" * 60)
+    rollup = DailySummaryRollup(create_client(supabase_url, supabase_key), state_path=args.state,
+                                utc_offset_minutes=args.utc_offset_minutes)
+    rollup.run(full=args.full, dry_run=args.dry_run)
+    rollup.print_stats()
+
+
+if __name__ == "__main__":
+    main()
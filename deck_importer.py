@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Deck Importer
+
+Imports a whole deck (deck row, vocabulary and deck_vocabulary links) with one call
+to the `import_deck` database function (supabase/migrations/20261019_create_import_deck_function.sql).
+
+The function runs in a single transaction, so a failed import leaves no deck and no
+orphan vocabulary behind. Each import has a stable key (e.g. "hsk:HSK Level 3") and
+a content hash; re-running with unchanged content returns the existing deck instead
+of creating a duplicate, which also makes retries after a timeout safe.
+
+Only decks created through import_deck have an import record. For a deck created
+before it existed, the function refuses to import a deck with the same name
+(supabase/migrations/20261028_secure_deck_imports.sql) instead of duplicating it;
+delete the old deck, or record it in deck_imports, first.
+"""
+
+import hashlib
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+DECK_FIELDS = ('name', 'description', 'language_a_code', 'language_b_code', 'language_a_name',
+               'language_b_name', 'difficulty_level', 'is_active')
+WORD_FIELDS = ('language_a_word', 'language_b_translation', 'language_a_sentence', 'language_b_sentence')
+
+
+def content_hash(deck: Dict, words: List[Dict]) -> str:
+    """Hash of the deck fields and words in order."""
+    payload = json.dumps([deck, words], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DeckImporter:
+    def __init__(self, client, function_name: str = 'import_deck',
+                 max_retries: int = 3, base_delay: float = 2.0):
+        """
+        Initialize the importer.
+
+        Args:
+            client: Supabase client
+            function_name: Database function doing the import
+            max_retries: Attempts per deck for transient errors
+            base_delay: First backoff delay in seconds (doubles per attempt)
+        """
+        self.client = client
+        self.function_name = function_name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.stats = {'imported': 0, 'unchanged': 0, 'failed': 0, 'words': 0, 'requests': 0}
+
+    def import_deck(self, import_key: str, deck: Dict, words: List[Dict]) -> Optional[Dict]:
+        """
+        Import one deck atomically.
+
+        Args:
+            import_key: Stable identifier of this deck across runs
+            deck: vocabulary_decks fields (total_words is set from the words)
+            words: Vocabulary rows in deck order
+
+        Returns:
+            {'deck_id', 'status': 'imported' | 'unchanged', 'word_count'}, or None on failure
+        """
+        deck_payload = {field: deck[field] for field in DECK_FIELDS if field in deck}
+        word_payload = [{field: word.get(field) for field in WORD_FIELDS} for word in words]
+        params = {
+            'p_import_key': import_key,
+            'p_content_hash': content_hash(deck_payload, word_payload),
+            'p_deck': deck_payload,
+            'p_words': word_payload,
+        }
+
+        for attempt in range(self.max_retries):
+            self.stats['requests'] += 1
+            try:
+                result = self.client.rpc(self.function_name, params).execute().data
+                status = result['status']
+                self.stats[status] += 1
+                if status == 'imported':
+                    self.stats['words'] += result['word_count']
+                    print(f"✅ Imported deck '{deck_payload.get('name')}' with {result['word_count']} words "
+                          f"(ID: {result['deck_id']})")
+                else:
+                    print(f"⏭️  Deck '{deck_payload.get('name')}' already imported (ID: {result['deck_id']})")
+                return result
+            except Exception as e:
+                # RAISE EXCEPTION from the function (content conflict) will not change on retry
+                if getattr(e, 'code', None) == 'P0001' or attempt == self.max_retries - 1:
+                    print(f"❌ Error importing deck '{deck_payload.get('name')}': {e}")
+                    self.stats['failed'] += 1
+                    return None
+                delay = self.base_delay * (2 ** attempt) + random.uniform(0, self.base_delay)
+                print(f"⚠️  Import of '{deck_payload.get('name')}' failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+        return None
+
+    def print_stats(self):
+        """Print a summary of the imports."""
+        print(f"   ✅ Decks imported: {self.stats['imported']} ({self.stats['words']} words)")
+        print(f"   ⏭️  Decks already imported: {self.stats['unchanged']}")
+        print(f"   ❌ Decks failed: {self.stats['failed']}")
+        print(f"   📨 Requests: {self.stats['requests']}")
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Deck Progress Metrics
+
+Batch job that fills deck_progress_metrics with the per-deck progress buckets the
+app otherwise computes on demand (SessionQueueManager.calculateMetrics loads every
+user_progress row of the deck plus a deck_vocabulary count for each call).
+
+deck_vocabulary is loaded once as a sorted array of packed (deck, vocabulary_id)
+keys. user_progress is streamed with keyset pages; each chunk of rows is turned
+into arrays, rows whose word is no longer in the deck are dropped with a sorted
+lookup, and the rest are bucketed and counted per packed (user, deck) key:
+
+- leeches: again_count >= 4
+- learning / strengthening / consolidating: interval < 7 / < 21 / < 60
+- mastered: everything else
+- unseen: deck size minus the words with progress
+
+Incremental runs read rating_history above the saved high-water mark, collect the
+(user, deck) pairs that were rated since, and recompute only those pairs. Deck
+sizes change only when decks are edited, so run --full after imports.
+
+Usage:
+    python deck_progress_metrics.py
+    python deck_progress_metrics.py --full
+    python deck_progress_metrics.py --dry-run
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from supabase import create_client
+
+from array_keys import pack
+from supabase_bulk_writer import BulkUpsertWriter
+from supabase_table_reader import iter_rows_by_ids, iter_table_rows
+
+DEFAULT_STATE_PATH = 'deck_progress_metrics_state.json'
+BUCKETS = ['unseen', 'leeches', 'learning', 'strengthening', 'consolidating', 'mastered']
+PROGRESS_COLUMNS = ['id', 'user_id', 'word_id', 'deck_id', 'interval', 'again_count']
+
+# Thresholds from src/lib/session-queues.ts and SRS.LEECH_THRESHOLD in src/lib/utils.ts
+LEECH_THRESHOLD = 4
+INTERVAL_LIMITS = [7, 21, 60]
+
+
+def progress_buckets(interval: np.ndarray, again_count: np.ndarray) -> np.ndarray:
+    """Bucket index (1-5, see BUCKETS) for each progress row."""
+    return np.select(
+        [again_count >= LEECH_THRESHOLD, interval < INTERVAL_LIMITS[0],
+         interval < INTERVAL_LIMITS[1], interval < INTERVAL_LIMITS[2]],
+        [1, 2, 3, 4], default=5)
+
+
+def count_by_key(keys: np.ndarray, buckets: np.ndarray):
+    """Sorted unique keys and a (keys x len(BUCKETS)) matrix of bucket counts."""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    width = len(BUCKETS)
+    counts = np.bincount(inverse * width + buckets, minlength=len(unique) * width)
+    return unique, counts.astype(np.int64).reshape(len(unique), width)
+
+
+class DeckProgressMetrics:
+    def __init__(self, client, state_path: Optional[str] = DEFAULT_STATE_PATH,
+                 page_size: int = 1000, max_workers: int = 4, chunk_rows: int = 50000):
+        """
+        Initialize the job.
+
+        Args:
+            client: Supabase client (service role, user_progress has per-user RLS)
+            state_path: JSON file holding the rating_history high-water mark
+                (None keeps nothing between runs, i.e. always a full recompute)
+            page_size: Rows per page when reading
+            max_workers: Parallel keyset partitions / id chunks when reading
+            chunk_rows: user_progress rows converted to arrays at a time
+        """
+        self.client = client
+        self.state_path = state_path
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.chunk_rows = chunk_rows
+
+        self.deck_codes: Dict[str, int] = {}
+        self.user_codes: Dict[str, int] = {}
+        self.deck_words = np.zeros(0, dtype=np.int64)
+        self.deck_totals = np.zeros(0, dtype=np.int64)
+        self.stats = {
+            'progress_rows': 0,
+            'stale_rows': 0,
+            'ratings_read': 0,
+            'pairs_updated': 0,
+            'rows_failed': 0,
+            'watermark': 0,
+            'seconds': 0.0,
+        }
+
+    def load_state(self) -> Dict:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_state(self, state: Dict):
+        if not self.state_path:
+            return
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def deck_code(self, deck_id: str) -> int:
+        return self.deck_codes.setdefault(str(deck_id), len(self.deck_codes))
+
+    def user_code(self, user_id: str) -> int:
+        return self.user_codes.setdefault(user_id, len(self.user_codes))
+
+    def load_deck_vocabulary(self, deck_ids: Optional[Set[str]] = None):
+        """Load deck membership (all decks, or only deck_ids) as sorted packed keys."""
+        columns = ['id', 'deck_id', 'vocabulary_id']
+        if deck_ids is None:
+            rows = iter_table_rows(self.client, 'deck_vocabulary', columns, key='id',
+                                   page_size=self.page_size, max_workers=self.max_workers)
+        else:
+            rows = iter_rows_by_ids(self.client, 'deck_vocabulary', 'deck_id', sorted(deck_ids), columns,
+                                    page_size=self.page_size, max_workers=self.max_workers)
+        decks, words = [], []
+        for row in rows:
+            decks.append(self.deck_code(row['deck_id']))
+            words.append(row['vocabulary_id'])
+
+        decks = np.array(decks, dtype=np.int64)
+        self.deck_words = np.unique(pack(decks, np.array(words, dtype=np.int64)))
+        self.deck_totals = np.bincount(self.deck_words >> 32, minlength=len(self.deck_codes))
+        print(f"📚 Loaded {len(self.deck_words)} deck words across {int((self.deck_totals > 0).sum())} decks")
+
+    def in_deck(self, decks: np.ndarray, words: np.ndarray) -> np.ndarray:
+        """Mask of (deck, word) pairs present in deck_vocabulary."""
+        keys = pack(decks, words)
+        if not len(self.deck_words):
+            return np.zeros(len(keys), dtype=bool)
+        positions = np.minimum(np.searchsorted(self.deck_words, keys), len(self.deck_words) - 1)
+        return self.deck_words[positions] == keys
+
+    def count_progress(self, rows, pairs: Optional[Set[Tuple[str, str]]] = None):
+        """
+        Bucket counts per packed (user, deck) key from streamed user_progress rows.
+
+        Args:
+            rows: Iterable of user_progress rows (PROGRESS_COLUMNS)
+            pairs: Only count rows of these (user_id, deck_id) pairs
+
+        Returns:
+            (sorted keys, counts matrix) with the unseen column still zero
+        """
+        keys = np.zeros(0, dtype=np.int64)
+        counts = np.zeros((0, len(BUCKETS)), dtype=np.int64)
+        buffer: List[Tuple[int, int, int, int, int]] = []
+
+        def flush():
+            nonlocal keys, counts
+            users, decks, words, interval, again = np.array(buffer, dtype=np.int64).reshape(-1, 5).T
+            buffer.clear()
+            member = self.in_deck(decks, words)
+            self.stats['stale_rows'] += int((~member).sum())
+            chunk_keys, chunk_counts = count_by_key(
+                pack(users[member], decks[member]), progress_buckets(interval[member], again[member]))
+            # Merge with the running totals
+            merged_keys = np.concatenate([keys, chunk_keys])
+            unique, inverse = np.unique(merged_keys, return_inverse=True)
+            merged = np.zeros((len(unique), len(BUCKETS)), dtype=np.int64)
+            np.add.at(merged, inverse, np.concatenate([counts, chunk_counts]))
+            keys, counts = unique, merged
+
+        for row in rows:
+            deck_id = str(row['deck_id'])
+            if pairs is not None and (row['user_id'], deck_id) not in pairs:
+                continue
+            buffer.append((self.user_code(row['user_id']), self.deck_code(deck_id), row['word_id'],
+                           row.get('interval') or 0, row.get('again_count') or 0))
+            self.stats['progress_rows'] += 1
+            if len(buffer) >= self.chunk_rows:
+                flush()
+        if buffer:
+            flush()
+        return keys, counts
+
+    def latest_rating_id(self) -> int:
+        result = self.client.table('rating_history').select('id').order('id', desc=True).limit(1).execute()
+        return result.data[0]['id'] if result.data else 0
+
+    def read_rated_pairs(self, watermark: int) -> Tuple[Set[Tuple[str, str]], int]:
+        """(user_id, deck_id) pairs rated above the watermark, and the new watermark."""
+        pairs: Set[Tuple[str, str]] = set()
+        highest = watermark
+        rows = iter_table_rows(self.client, 'rating_history', ['id', 'user_id', 'deck_id'], key='id',
+                               page_size=self.page_size, max_workers=self.max_workers,
+                               filters=lambda q: q.gt('id', watermark))
+        for row in rows:
+            if row['id'] <= watermark:
+                continue
+            pairs.add((row['user_id'], str(row['deck_id'])))
+            self.stats['ratings_read'] += 1
+            highest = max(highest, row['id'])
+        return pairs, highest
+
+    def metric_rows(self, keys: np.ndarray, counts: np.ndarray) -> List[Dict]:
+        """deck_progress_metrics rows; fills in total_words and unseen."""
+        user_ids = list(self.user_codes)
+        deck_ids = list(self.deck_codes)
+        decks = keys & 0xFFFFFFFF
+        totals = np.zeros(len(keys), dtype=np.int64)
+        known = decks < len(self.deck_totals)
+        totals[known] = self.deck_totals[decks[known]]
+        counts[:, 0] = np.maximum(0, totals - counts[:, 1:].sum(axis=1))
+
+        updated_at = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for key, total, row_counts in zip(keys.tolist(), totals.tolist(), counts.tolist()):
+            row = {'user_id': user_ids[key >> 32], 'deck_id': deck_ids[key & 0xFFFFFFFF], 'total_words': total}
+            row.update(zip(BUCKETS, row_counts))
+            row['updated_at'] = updated_at
+            rows.append(row)
+        return rows
+
+    def run(self, full: bool = False, dry_run: bool = False) -> Dict:
+        """
+        Recompute deck_progress_metrics.
+
+        Args:
+            full: Recompute every (user, deck) pair instead of the ones rated since the last run
+            dry_run: Compute and report, but neither upsert nor save state
+
+        Returns:
+            Stats dict (progress_rows, stale_rows, ratings_read, pairs_updated, rows_failed, watermark, seconds)
+        """
+        started = time.monotonic()
+        state = {} if full else self.load_state()
+        watermark = state.get('watermark', 0)
+
+        if not state:
+            # Everything up to the current last rating is covered by the full pass
+            highest = self.latest_rating_id()
+            self.load_deck_vocabulary()
+            rows = iter_table_rows(self.client, 'user_progress', PROGRESS_COLUMNS, key='id',
+                                   page_size=self.page_size, max_workers=self.max_workers)
+            keys, counts = self.count_progress(rows)
+        else:
+            pairs, highest = self.read_rated_pairs(watermark)
+            print(f"📥 {self.stats['ratings_read']} ratings above id {watermark}, {len(pairs)} (user, deck) pairs")
+            if pairs:
+                self.load_deck_vocabulary({deck_id for _, deck_id in pairs})
+                rows = iter_rows_by_ids(self.client, 'user_progress', 'user_id', sorted({u for u, _ in pairs}),
+                                        PROGRESS_COLUMNS, page_size=self.page_size, max_workers=self.max_workers)
+                keys, counts = self.count_progress(rows, pairs)
+                # Pairs without any progress left in the deck still get a row
+                missing = np.setdiff1d(pack(np.array([self.user_code(u) for u, _ in pairs], dtype=np.int64),
+                                            np.array([self.deck_code(d) for _, d in pairs], dtype=np.int64)), keys)
+                keys = np.concatenate([keys, missing])
+                counts = np.concatenate([counts, np.zeros((len(missing), len(BUCKETS)), dtype=np.int64)])
+            else:
+                keys, counts = np.zeros(0, dtype=np.int64), np.zeros((0, len(BUCKETS)), dtype=np.int64)
+
+        metric_rows = self.metric_rows(keys, counts)
+        self.stats['pairs_updated'] = len(metric_rows)
+        print(f"🧮 {len(metric_rows)} (user, deck) pairs from {self.stats['progress_rows']} progress rows")
+
+        if metric_rows and not dry_run:
+            writer = BulkUpsertWriter(self.client, 'deck_progress_metrics', on_conflict='user_id,deck_id')
+            writer.write(metric_rows)
+            self.stats['rows_failed'] = writer.stats['rows_failed']
+
+        # Keep the old watermark after failed writes so the next run redoes these pairs
+        if not dry_run and not self.stats['rows_failed']:
+            watermark = highest
+            self.save_state({'watermark': watermark, 'last_run': datetime.now(timezone.utc).isoformat()})
+        self.stats['watermark'] = watermark
+        self.stats['seconds'] = time.monotonic() - started
+        return self.stats
+
+    def print_stats(self):
+        """Print a summary of the last run."""
+        print(f"   📥 Progress rows counted: {self.stats['progress_rows']}")
+        if self.stats['stale_rows']:
+            print(f"   🧹 Rows for words no longer in their deck: {self.stats['stale_rows']} (ignored)")
+        print(f"   ⭐ Ratings read: {self.stats['ratings_read']}")
+        print(f"   📊 (user, deck) pairs upserted: {self.stats['pairs_updated']}")
+        print(f"   🔖 High-water mark: rating_history.id {self.stats['watermark']}")
+        print(f"   ⏱️  Time: {self.stats['seconds']:.1f}s")
+        if self.stats['rows_failed']:
+            print(f"   ❌ Failed rows: {self.stats['rows_failed']} (state not advanced, rerun to retry)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute deck_progress_metrics")
+    parser.add_argument('--full', action='store_true', help="Recompute every (user, deck) pair")
+    parser.add_argument('--dry-run', action='store_true', help="Compute without writing")
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help="State file")
+    args = parser.parse_args()
+
+    load_dotenv('.env.local')
+    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    if not supabase_url or not supabase_key:
+        raise ValueError("Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY (user_progress has per-user RLS)")
+
+    print("📊 Deck Progress Metrics")
+    print("=" * 60)
+    job = DeckProgressMetrics(create_client(supabase_url, supabase_key), state_path=args.state)
+    job.run(full=args.full, dry_run=args.dry_run)
+    job.print_stats()
+
+
+if __name__ == "__main__":
+    main()
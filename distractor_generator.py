@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Distractor Generator
+
+Precomputes multiple-choice distractors for every word of a language and stores
+them in vocabulary.distractor_ids, best first, so quiz and tutor flows read one
+column instead of querying word_similarities at runtime.
+
+Candidates are scored in one pass of array operations over all words:
+
+- direct neighbours in word_similarities (either direction), weighted by the
+  learned confusability_weight when --weighted is given
+- neighbours of neighbours, built with a CSR gather
+- words of similar Lexique frequency rank (the words ranked just above and
+  below), which fill the remaining slots with plausible, equally common words.
+  Only words with a rank take part, and ranks come from
+  french_vocabulary_lexique_mapping, so German and Chinese words get
+  similarity-based distractors only and may end up with fewer than --count
+
+Candidates that would be right answers (same word or same English translation)
+are dropped, and only part-of-speech compatible words are kept. There is no part
+of speech column, so a coarse class is read off the English translation: "to ..."
+is a verb, "a/an/the ..." a noun, "-ly" words adverbs; unclassified words are
+compatible with everything.
+
+Usage:
+    python distractor_generator.py --language fr-FR --dry-run
+    python distractor_generator.py --language fr-FR --count 6 --weighted
+"""
+
+import argparse
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from supabase_bulk_writer import rpc_in_batches
+from supabase_table_reader import iter_rows_by_ids, iter_table_rows
+
+POS_OTHER, POS_VERB, POS_NOUN, POS_ADVERB = 0, 1, 2, 3
+SOURCE_SCORES = {'similar': 3.0, 'two_hop': 2.0, 'frequency': 1.0}
+
+
+def coarse_part_of_speech(translation: Optional[str]) -> int:
+    """Coarse word class from an English translation (POS_OTHER when unsure)."""
+    text = (translation or '').strip().lower()
+    if text.startswith('to '):
+        return POS_VERB
+    if re.match(r'^(a|an|the)\s', text):
+        return POS_NOUN
+    if re.fullmatch(r'[a-z]+ly', text):
+        return POS_ADVERB
+    return POS_OTHER
+
+
+def normalize_translation(translation: Optional[str]) -> str:
+    text = (translation or '').strip().lower()
+    return re.sub(r'^(to|a|an|the)\s+', '', text)
+
+
+def two_hop(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray, cols: np.ndarray):
+    """(node, node two steps away) for every path node -> col -> neighbour of col."""
+    degree = np.diff(indptr)[cols]
+    sources = np.repeat(rows, degree)
+    starts = np.repeat(indptr[cols], degree)
+    offsets = np.arange(len(sources)) - np.repeat(np.cumsum(degree) - degree, degree)
+    targets = indices[starts + offsets]
+    keep = sources != targets
+    return sources[keep], targets[keep]
+
+
+def top_per_row(rows: np.ndarray, cols: np.ndarray, scores: np.ndarray, count: int):
+    """Best `count` cols per row by score (duplicates keep their best score)."""
+    order = np.lexsort((-scores, cols, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    rows, cols, scores = rows[first], cols[first], scores[first]
+
+    order = np.lexsort((cols, -scores, rows))
+    rows, cols = rows[order], cols[order]
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.zeros(0, dtype=np.int64)
+    position = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+    keep = position < count
+    return rows[keep], cols[keep]
+
+
+class DistractorGenerator:
+    def __init__(self, count: int = 4, frequency_window: int = 10, max_two_hop: int = 50, seed: int = 0):
+        """
+        Initialize the generator.
+
+        Args:
+            count: Distractors per word
+            frequency_window: Words ranked this many places above and below are candidates
+            max_two_hop: Nodes with more neighbours than this are skipped as two-hop bridges
+            seed: Random seed for ordering words with the same frequency rank
+        """
+        self.count = count
+        self.frequency_window = frequency_window
+        self.max_two_hop = max_two_hop
+        self.seed = seed
+        self.stats = {
+            'words': 0,
+            'candidates': 0,
+            'words_filled': 0,
+            'words_empty': 0,
+            'ranked_words': 0,
+            'from_similarity': 0,
+            'seconds': 0.0,
+        }
+
+    def generate(self, words: Dict[str, np.ndarray], sources: np.ndarray, targets: np.ndarray,
+                 weights: np.ndarray) -> Dict[int, List[int]]:
+        """
+        Distractors for every word.
+
+        Args:
+            words: Arrays per word: 'id', 'rank' (np.inf when unknown), 'pos', 'translation' (normalized, object)
+                and 'text' (normalized word, object)
+            sources, targets: Similarity edges as vocabulary ids
+            weights: Edge weights
+
+        Returns:
+            {vocabulary id: [distractor vocabulary ids, best first]} for every word; words
+            without candidates get an empty list so stale distractors are cleared
+        """
+        started = time.monotonic()
+        ids = words['id']
+        count = len(ids)
+        order = np.argsort(ids)
+        sorted_ids = ids[order]
+
+        def local(values):
+            positions = np.minimum(np.searchsorted(sorted_ids, values), count - 1)
+            return np.where(sorted_ids[positions] == values, order[positions], -1)
+
+        # Similarity graph over the words in scope (both directions)
+        a, b = local(sources), local(targets)
+        keep = (a >= 0) & (b >= 0) & (a != b)
+        rows = np.concatenate([a[keep], b[keep]])
+        cols = np.concatenate([b[keep], a[keep]])
+        edge_weights = np.concatenate([weights[keep], weights[keep]])
+        by_row = np.lexsort((cols, rows))
+        rows, cols, edge_weights = rows[by_row], cols[by_row], edge_weights[by_row]
+        indptr = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=count), out=indptr[1:])
+
+        candidates = [(rows, cols, SOURCE_SCORES['similar'] * edge_weights)]
+
+        # Neighbours of neighbours, not through hub words
+        bridge = np.diff(indptr)[cols] <= self.max_two_hop
+        hop_rows, hop_cols = two_hop(indptr, cols, rows[bridge], cols[bridge])
+        candidates.append((hop_rows, hop_cols, np.full(len(hop_rows), SOURCE_SCORES['two_hop'])))
+
+        # Frequency neighbours: the words ranked just above and below. Only words with a
+        # frequency rank take part; without one, "neighbours" would just be random words
+        rng = np.random.default_rng(self.seed)
+        ranked = np.flatnonzero(np.isfinite(words['rank']))
+        by_rank = ranked[np.lexsort((rng.random(len(ranked)), words['rank'][ranked]))]
+        for offset in range(1, self.frequency_window + 1):
+            score = SOURCE_SCORES['frequency'] * (1 - offset / (self.frequency_window + 1))
+            candidates.append((by_rank[offset:], by_rank[:-offset], np.full(max(len(by_rank) - offset, 0), score)))
+            candidates.append((by_rank[:-offset], by_rank[offset:], np.full(max(len(by_rank) - offset, 0), score)))
+        self.stats['ranked_words'] = len(ranked)
+
+        cand_rows = np.concatenate([c[0] for c in candidates])
+        cand_cols = np.concatenate([c[1] for c in candidates])
+        cand_scores = np.concatenate([c[2] for c in candidates])
+
+        # Drop right answers and incompatible word classes
+        pos = words['pos']
+        compatible = (pos[cand_rows] == pos[cand_cols]) | (pos[cand_rows] == POS_OTHER) | (pos[cand_cols] == POS_OTHER)
+        wrong = (words['translation'][cand_rows] != words['translation'][cand_cols]) & \
+            (words['text'][cand_rows] != words['text'][cand_cols])
+        keep = compatible & wrong & (cand_rows != cand_cols)
+        self.stats['candidates'] = int(keep.sum())
+
+        best_rows, best_cols = top_per_row(cand_rows[keep], cand_cols[keep], cand_scores[keep], self.count)
+        result: Dict[int, List[int]] = {int(word_id): [] for word_id in ids.tolist()}
+        for row, col in zip(best_rows.tolist(), best_cols.tolist()):
+            result[int(ids[row])].append(int(ids[col]))
+
+        similar = set(zip(rows.tolist(), cols.tolist()))
+        self.stats['words'] = count
+        self.stats['words_filled'] = sum(1 for values in result.values() if len(values) == self.count)
+        self.stats['words_empty'] = sum(1 for values in result.values() if not values)
+        self.stats['from_similarity'] = sum(1 for pair in zip(best_rows.tolist(), best_cols.tolist()) if pair in similar)
+        self.stats['seconds'] = time.monotonic() - started
+        return result
+
+    def print_stats(self):
+        """Print a summary of the last run."""
+        print(f"   🔤 Words: {self.stats['words']}")
+        print(f"   📊 Words with a frequency rank: {self.stats['ranked_words']}")
+        print(f"   🎯 Candidates after filtering: {self.stats['candidates']}")
+        print(f"   ✅ Words with {self.count} distractors: {self.stats['words_filled']}")
+        print(f"   🧹 Words without distractors (cleared): {self.stats['words_empty']}")
+        print(f"   🔗 Distractors from similar words: {self.stats['from_similarity']}")
+        print(f"   ⏱️  Time: {self.stats['seconds']:.2f}s")
+
+
+def load_words(client, language_code: str) -> Dict[str, np.ndarray]:
+    """Words of all decks in a language with frequency rank and coarse part of speech."""
+    decks = client.table('vocabulary_decks').select('id').eq('language_a_code', language_code).execute().data or []
+    deck_ids = [deck['id'] for deck in decks]
+    vocabulary_ids = sorted({row['vocabulary_id'] for row in
+                             iter_rows_by_ids(client, 'deck_vocabulary', 'deck_id', deck_ids, ['id', 'vocabulary_id'])})
+
+    ranks: Dict[int, int] = {}
+    for row in iter_rows_by_ids(client, 'french_vocabulary_lexique_mapping', 'vocabulary_id', vocabulary_ids,
+                                ['vocabulary_id', 'french_lexique_words(frequency_rank)']):
+        rank = (row.get('french_lexique_words') or {}).get('frequency_rank')
+        if rank is not None:
+            ranks[row['vocabulary_id']] = min(int(rank), ranks.get(row['vocabulary_id'], int(rank)))
+
+    ids, rank, pos, translation, text = [], [], [], [], []
+    for row in iter_rows_by_ids(client, 'vocabulary', 'id', vocabulary_ids,
+                                ['id', 'language_a_word', 'language_b_translation']):
+        ids.append(row['id'])
+        rank.append(ranks.get(row['id'], np.inf))
+        pos.append(coarse_part_of_speech(row.get('language_b_translation')))
+        translation.append(normalize_translation(row.get('language_b_translation')))
+        text.append((row.get('language_a_word') or '').strip().lower())
+    print(f"📚 {len(ids)} words in {len(deck_ids)} {language_code} decks, {len(ranks)} with frequency rank")
+    return {
+        'id': np.array(ids, dtype=np.int64),
+        'rank': np.array(rank, dtype=np.float64),
+        'pos': np.array(pos, dtype=np.int8),
+        'translation': np.array(translation, dtype=object),
+        'text': np.array(text, dtype=object),
+    }
+
+
+def load_similarity_edges(client, weighted: bool = False):
+    """(sources, targets, weights) from word_similarities."""
+    columns = ['id', 'source_word_id', 'target_word_id'] + (['confusability_weight'] if weighted else [])
+    sources, targets, weights = [], [], []
+    for row in iter_table_rows(client, 'word_similarities', columns, key='id'):
+        sources.append(row['source_word_id'])
+        targets.append(row['target_word_id'])
+        weights.append(row.get('confusability_weight') or 1.0)
+    return (np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64),
+            np.array(weights, dtype=np.float64))
+
+
+def apply_distractors(client, distractors: Dict[int, List[int]]) -> Dict:
+    """Send distractor lists to apply_distractors (an empty list clears a word's distractors)."""
+    rows = [{'id': word_id, 'distractor_ids': values} for word_id, values in distractors.items()]
+    return rpc_in_batches(client, 'apply_distractors', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute multiple-choice distractors per word")
+    parser.add_argument('--language', default='fr-FR', help="language_a_code of the decks to cover")
+    parser.add_argument('--count', type=int, default=4, help="Distractors per word")
+    parser.add_argument('--frequency-window', type=int, default=10, help="Rank neighbours considered")
+    parser.add_argument('--weighted', action='store_true', help="Weight similar words by learned confusability_weight")
+    parser.add_argument('--dry-run', action='store_true', help="Report without writing")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv('.env.local')
+    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    if not supabase_url or not supabase_key:
+        raise ValueError("Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
+    client = create_client(supabase_url, supabase_key)
+
+    print("🎯 Distractor Generator")
+    print("=" * 60)
+    words = load_words(client, args.language)
+    if not len(words['id']):
+        print(f"❌ No words found for {args.language}")
+        return
+    generator = DistractorGenerator(count=args.count, frequency_window=args.frequency_window)
+    distractors = generator.generate(words, *load_similarity_edges(client, weighted=args.weighted))
+    generator.print_stats()
+
+    if not args.dry_run:
+        stats = apply_distractors(client, distractors)
+        print(f"\n💾 Updated {stats['updated']} vocabulary rows ({stats['failed']} failed)")
+
+
+if __name__ == "__main__":
+    main()
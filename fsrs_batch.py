@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+FSRS Batch Scheduler
+
+Vectorized FSRS (v4.5, 17 parameters) for bulk work on user_progress.
+
+All formulas take NumPy arrays, so next states for millions of (user, word) cards
+are computed in one pass per step instead of a row-by-row loop. Parameters are
+either one vector of 17 weights or one row of weights per card (per-user
+personalization).
+
+Review histories are replayed by review depth: the logs are sorted by card and
+time once, then step k updates every card's k-th review at the same time, so a
+replay costs one vectorized step per review depth rather than one per review.
+
+FSRSOptimizer fits the weights to a review log by minimising the log loss of the
+predicted recall probability, with Adam on central finite-difference gradients
+over mini-batches of cards, clipped to the usual FSRS parameter bounds.
+
+Usage:
+    python fsrs_batch.py optimize [--min-reviews 400] [--output fsrs_parameters.json]
+    python fsrs_batch.py backfill [--parameters fsrs_parameters.json] [--dry-run]
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from supabase_bulk_writer import rpc_in_batches
+from supabase_table_reader import iter_table_rows
+
+DEFAULT_PARAMETERS = np.array([
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+])
+LOWER_BOUNDS = np.array([0.1, 0.1, 0.1, 0.1, 1.0, 0.1, 0.1, 0.0, 0.0, 0.1, 0.01, 0.5, 0.01, 0.01, 0.01, 0.0, 1.0])
+UPPER_BOUNDS = np.array([100.0, 100.0, 100.0, 100.0, 10.0, 5.0, 5.0, 0.5, 3.0, 0.8, 2.5, 5.0, 0.2, 0.9, 2.0, 1.0, 6.0])
+
+RATINGS = {'again': 1, 'hard': 2, 'good': 3, 'easy': 4}
+DECAY = -0.5
+FACTOR = 0.9 ** (1 / DECAY) - 1
+SECONDS_PER_DAY = 86400.0
+
+
+def encode_ratings(ratings: Iterable[str]) -> np.ndarray:
+    """Map again/hard/good/easy to 1-4."""
+    return np.array([RATINGS[rating] for rating in ratings], dtype=np.int8)
+
+
+def _w(w: np.ndarray, i: int):
+    # One weight for all cards (scalar) or one per card (column)
+    return w[..., i]
+
+
+def retrievability(elapsed_days: np.ndarray, stability: np.ndarray) -> np.ndarray:
+    """Probability of recall after elapsed_days for the given stability."""
+    return (1 + FACTOR * elapsed_days / stability) ** DECAY
+
+
+def next_interval(stability: np.ndarray, desired_retention: float = 0.9,
+                  maximum_interval: int = 36500) -> np.ndarray:
+    """Days until recall probability drops to desired_retention (at least 1)."""
+    interval = stability / FACTOR * (desired_retention ** (1 / DECAY) - 1)
+    return np.clip(np.round(interval), 1, maximum_interval).astype(np.int64)
+
+
+def initial_stability(ratings: np.ndarray, w: np.ndarray) -> np.ndarray:
+    if w.ndim == 1:
+        return w[ratings - 1]
+    return w[np.arange(len(ratings)), ratings - 1]
+
+
+def initial_difficulty(ratings: np.ndarray, w: np.ndarray) -> np.ndarray:
+    return np.clip(_w(w, 4) - (ratings - 3) * _w(w, 5), 1, 10)
+
+
+def next_difficulty(difficulty: np.ndarray, ratings: np.ndarray, w: np.ndarray) -> np.ndarray:
+    changed = difficulty - _w(w, 6) * (ratings - 3)
+    # Mean reversion towards the initial difficulty of a "good" first rating
+    return np.clip(_w(w, 7) * _w(w, 4) + (1 - _w(w, 7)) * changed, 1, 10)
+
+
+def stability_after_success(stability, difficulty, recall, ratings, w) -> np.ndarray:
+    hard_penalty = np.where(ratings == 2, _w(w, 15), 1.0)
+    easy_bonus = np.where(ratings == 4, _w(w, 16), 1.0)
+    growth = (np.exp(_w(w, 8)) * (11 - difficulty) * stability ** -_w(w, 9)
+              * (np.exp((1 - recall) * _w(w, 10)) - 1) * hard_penalty * easy_bonus)
+    return stability * (1 + growth)
+
+
+def stability_after_failure(stability, difficulty, recall, w) -> np.ndarray:
+    forgotten = (_w(w, 11) * difficulty ** -_w(w, 12) * ((stability + 1) ** _w(w, 13) - 1)
+                 * np.exp((1 - recall) * _w(w, 14)))
+    return np.minimum(forgotten, stability)
+
+
+def step(stability: np.ndarray, difficulty: np.ndarray, elapsed_days: np.ndarray,
+         ratings: np.ndarray, w: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Apply one review to every card at once.
+
+    Args:
+        stability: Current stability per card (NaN for cards never reviewed)
+        difficulty: Current difficulty per card (NaN for cards never reviewed)
+        elapsed_days: Days since each card's previous review
+        ratings: 1-4 per card
+        w: 17 weights, or one row of weights per card
+
+    Returns:
+        (new stability, new difficulty, recall probability before the review; NaN for new cards)
+    """
+    new = np.isnan(stability)
+    safe_stability = np.where(new, 1.0, stability)
+    safe_difficulty = np.where(new, 5.0, difficulty)
+    recall = retrievability(np.maximum(elapsed_days, 0), safe_stability)
+
+    reviewed_stability = np.where(
+        ratings == 1,
+        stability_after_failure(safe_stability, safe_difficulty, recall, w),
+        stability_after_success(safe_stability, safe_difficulty, recall, ratings, w),
+    )
+    reviewed_difficulty = next_difficulty(safe_difficulty, ratings, w)
+
+    stability = np.where(new, initial_stability(ratings, w), reviewed_stability)
+    difficulty = np.where(new, initial_difficulty(ratings, w), reviewed_difficulty)
+    return np.maximum(stability, 0.01), difficulty, np.where(new, np.nan, recall)
+
+
+def memory_state_from_sm2(interval: np.ndarray, ease_factor: np.ndarray, w: np.ndarray = DEFAULT_PARAMETERS,
+                          sm2_retention: float = 0.9) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Approximate FSRS state for cards that only have SM-2 fields.
+
+    Stability is the interval at which SM-2 was assumed to hit sm2_retention.
+    Difficulty is solved from the FSRS success formula so that a "good" review at
+    that retention grows stability by the card's ease factor.
+
+    Args:
+        interval: SM-2 interval in days (0 after an "again")
+        ease_factor: SM-2 ease factor
+        w: 17 weights, or one row per card
+        sm2_retention: Recall probability SM-2 intervals are assumed to target
+
+    Returns:
+        (stability, difficulty)
+    """
+    interval = np.asarray(interval, dtype=np.float64)
+    ease_factor = np.asarray(ease_factor, dtype=np.float64)
+    from_interval = np.maximum(interval, 0.1) * FACTOR / (sm2_retention ** (1 / DECAY) - 1)
+    stability = np.where(interval > 0, from_interval, _w(w, 0))
+
+    growth_per_difficulty = (np.exp(_w(w, 8)) * stability ** -_w(w, 9)
+                             * (np.exp((1 - sm2_retention) * _w(w, 10)) - 1))
+    difficulty = np.clip(11 - (ease_factor - 1) / growth_per_difficulty, 1, 10)
+    return stability, difficulty
+
+
+def _epoch_days(timestamp: str) -> float:
+    moment = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp() / SECONDS_PER_DAY
+
+
+class ReviewLog:
+    """Reviews as arrays, sorted by card and time, with per-card review depth."""
+
+    def __init__(self, card: np.ndarray, user: np.ndarray, rating: np.ndarray, day: np.ndarray,
+                 card_keys: Sequence[Hashable], user_ids: Sequence[str]):
+        """
+        Args:
+            card: Card index per review (into card_keys)
+            user: User index per review (into user_ids)
+            rating: 1-4 per review
+            day: Review time in days since the epoch (fractional)
+            card_keys: Identity of each card, e.g. (user_id, word_id, deck_id)
+            user_ids: Identity of each user
+        """
+        order = np.lexsort((day, card))
+        self.card = card[order]
+        self.user = user[order]
+        self.rating = rating[order]
+        self.day = day[order]
+        self.card_keys = list(card_keys)
+        self.user_ids = list(user_ids)
+
+        first = np.ones(len(self.card), dtype=bool)
+        first[1:] = self.card[1:] != self.card[:-1]
+        starts = np.flatnonzero(first)
+        counts = np.diff(np.append(starts, len(self.card)))
+        self.depth = np.arange(len(self.card)) - np.repeat(starts, counts)
+
+        whole_days = np.floor(self.day)
+        self.elapsed = np.zeros(len(self.card))
+        self.elapsed[1:] = whole_days[1:] - whole_days[:-1]
+        self.elapsed[first] = 0
+
+        # Rows of each depth, for replaying all cards' k-th review together
+        by_depth = np.argsort(self.depth, kind='stable')
+        depth_counts = np.bincount(self.depth) if len(self.depth) else np.zeros(0, dtype=np.int64)
+        self.depth_rows = np.split(by_depth, np.cumsum(depth_counts)[:-1]) if len(depth_counts) else []
+
+        # Reviews the loss is computed on: a previous review exists and a day has passed
+        self.scored = (self.depth > 0) & (self.elapsed > 0)
+
+    def __len__(self):
+        return len(self.card)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> 'ReviewLog':
+        """Build from rating_history rows (user_id, word_id, deck_id, rating, timestamp)."""
+        card_codes: Dict[Hashable, int] = {}
+        user_codes: Dict[str, int] = {}
+        cards, users, ratings, days = [], [], [], []
+        for row in rows:
+            if row.get('rating') not in RATINGS or not row.get('timestamp'):
+                continue
+            key = (row['user_id'], row['word_id'], row.get('deck_id'))
+            cards.append(card_codes.setdefault(key, len(card_codes)))
+            users.append(user_codes.setdefault(row['user_id'], len(user_codes)))
+            ratings.append(RATINGS[row['rating']])
+            days.append(_epoch_days(row['timestamp']))
+        return cls(np.array(cards, dtype=np.int64), np.array(users, dtype=np.int64),
+                   np.array(ratings, dtype=np.int8), np.array(days, dtype=np.float64),
+                   list(card_codes), list(user_codes))
+
+    def subset(self, mask: np.ndarray) -> 'ReviewLog':
+        """
+        Reviews where mask is True (mask per review row).
+
+        Cards are renumbered to the ones present, so replaying the subset costs
+        O(its own cards) rather than O(all cards in the log).
+        """
+        cards, local = np.unique(self.card[mask], return_inverse=True)
+        return ReviewLog(local.reshape(-1), self.user[mask], self.rating[mask], self.day[mask],
+                         [self.card_keys[card] for card in cards.tolist()], self.user_ids)
+
+    def cards_subset(self, cards: np.ndarray) -> 'ReviewLog':
+        """All reviews of the given card indices."""
+        return self.subset(np.isin(self.card, cards))
+
+
+def replay(log: ReviewLog, w: np.ndarray = DEFAULT_PARAMETERS):
+    """
+    Replay every card's history.
+
+    Args:
+        log: Review log
+        w: 17 weights, or an (n_card_keys, 17) array with one row per card
+
+    Returns:
+        (stability, difficulty, last_day) per card index (NaN for cards without
+        reviews) and the predicted recall per review row (NaN at depth 0)
+    """
+    w = np.asarray(w, dtype=np.float64)
+    n_cards = len(log.card_keys)
+    stability = np.full(n_cards, np.nan)
+    difficulty = np.full(n_cards, np.nan)
+    last_day = np.full(n_cards, np.nan)
+    predicted = np.full(len(log), np.nan)
+
+    for rows in log.depth_rows:
+        cards = log.card[rows]
+        wk = w if w.ndim == 1 else w[cards]
+        stability[cards], difficulty[cards], predicted[rows] = step(
+            stability[cards], difficulty[cards], log.elapsed[rows], log.rating[rows].astype(np.int64), wk)
+        last_day[cards] = log.day[rows]
+    return stability, difficulty, last_day, predicted
+
+
+def log_loss(log: ReviewLog, w: np.ndarray) -> float:
+    """Mean binary cross-entropy of predicted recall on the scored reviews."""
+    _, _, _, predicted = replay(log, w)
+    if not log.scored.any():
+        return 0.0
+    p = np.clip(predicted[log.scored], 1e-6, 1 - 1e-6)
+    recalled = log.rating[log.scored] > 1
+    return float(-np.mean(np.where(recalled, np.log(p), np.log(1 - p))))
+
+
+class FSRSBatchScheduler:
+    def __init__(self, parameters: Optional[np.ndarray] = None, desired_retention: float = 0.9,
+                 maximum_interval: int = 36500):
+        """
+        Initialize the scheduler.
+
+        Args:
+            parameters: 17 weights, or one row per card (default FSRS v4.5 weights)
+            desired_retention: Target recall probability at the next review
+            maximum_interval: Longest interval in days
+        """
+        self.parameters = np.asarray(DEFAULT_PARAMETERS if parameters is None else parameters, dtype=np.float64)
+        self.desired_retention = desired_retention
+        self.maximum_interval = maximum_interval
+
+    def review(self, stability: np.ndarray, difficulty: np.ndarray, elapsed_days: np.ndarray,
+               ratings: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Next state and interval for a batch of reviews.
+
+        Args:
+            stability: Current stability (NaN for new cards)
+            difficulty: Current difficulty (NaN for new cards)
+            elapsed_days: Days since the previous review
+            ratings: 1-4, or again/hard/good/easy strings
+
+        Returns:
+            (stability, difficulty, interval in days)
+        """
+        ratings = np.asarray(ratings)
+        if ratings.dtype.kind in 'UO':
+            ratings = encode_ratings(ratings)
+        stability, difficulty, _ = step(np.asarray(stability, dtype=np.float64),
+                                        np.asarray(difficulty, dtype=np.float64),
+                                        np.asarray(elapsed_days, dtype=np.float64),
+                                        ratings.astype(np.int64), self.parameters)
+        return stability, difficulty, next_interval(stability, self.desired_retention, self.maximum_interval)
+
+
+class FSRSOptimizer:
+    def __init__(self, learning_rate: float = 0.04, steps: int = 200, batch_cards: int = 20000,
+                 epsilon: float = 1e-3, seed: int = 0):
+        """
+        Initialize the optimizer.
+
+        Args:
+            learning_rate: Adam step size
+            steps: Adam steps
+            batch_cards: Cards sampled per step (all cards if fewer)
+            epsilon: Finite-difference step, relative to each parameter's range
+            seed: Random seed for the mini-batches
+        """
+        self.learning_rate = learning_rate
+        self.steps = steps
+        self.batch_cards = batch_cards
+        self.epsilon = epsilon
+        self.rng = np.random.default_rng(seed)
+        self.stats = {'reviews': 0, 'loss_before': 0.0, 'loss_after': 0.0, 'seconds': 0.0}
+
+    def gradient(self, log: ReviewLog, w: np.ndarray) -> np.ndarray:
+        """Central finite-difference gradient of the log loss."""
+        steps = self.epsilon * (UPPER_BOUNDS - LOWER_BOUNDS)
+        gradient = np.zeros_like(w)
+        for i in range(len(w)):
+            up, down = w.copy(), w.copy()
+            up[i] = min(w[i] + steps[i], UPPER_BOUNDS[i])
+            down[i] = max(w[i] - steps[i], LOWER_BOUNDS[i])
+            if up[i] > down[i]:
+                gradient[i] = (log_loss(log, up) - log_loss(log, down)) / (up[i] - down[i])
+        return gradient
+
+    def fit(self, log: ReviewLog, initial: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Fit the 17 weights to a review log.
+
+        Args:
+            log: Review log (all cards share the fitted weights)
+            initial: Starting weights (default FSRS v4.5 weights)
+
+        Returns:
+            Fitted weights
+        """
+        started = time.monotonic()
+        w = np.array(DEFAULT_PARAMETERS if initial is None else initial, dtype=np.float64)
+        self.stats['reviews'] = int(log.scored.sum())
+        self.stats['loss_before'] = log_loss(log, w)
+
+        cards = np.unique(log.card)
+        first_moment = np.zeros_like(w)
+        second_moment = np.zeros_like(w)
+        beta1, beta2 = 0.9, 0.999
+
+        for t in range(1, self.steps + 1):
+            if len(cards) > self.batch_cards:
+                batch = log.cards_subset(self.rng.choice(cards, self.batch_cards, replace=False))
+            else:
+                batch = log
+            gradient = self.gradient(batch, w)
+            first_moment = beta1 * first_moment + (1 - beta1) * gradient
+            second_moment = beta2 * second_moment + (1 - beta2) * gradient ** 2
+            corrected = first_moment / (1 - beta1 ** t)
+            scale = np.sqrt(second_moment / (1 - beta2 ** t)) + 1e-8
+            # Steps are relative to each weight's range so small and large weights move alike
+            w = np.clip(w - self.learning_rate * (UPPER_BOUNDS - LOWER_BOUNDS) / 10 * corrected / scale,
+                        LOWER_BOUNDS, UPPER_BOUNDS)
+
+        self.stats['loss_after'] = log_loss(log, w)
+        self.stats['seconds'] = time.monotonic() - started
+        return w
+
+    def print_stats(self):
+        """Print a summary of the last fit."""
+        print(f"   📚 Scored reviews: {self.stats['reviews']}")
+        print(f"   📉 Log loss: {self.stats['loss_before']:.4f} → {self.stats['loss_after']:.4f}")
+        print(f"   ⏱️  Time: {self.stats['seconds']:.1f}s")
+
+
+def load_review_log(client) -> ReviewLog:
+    """Stream rating_history into a ReviewLog."""
+    rows = iter_table_rows(client, 'rating_history', ['id', 'user_id', 'word_id', 'deck_id', 'rating', 'timestamp'],
+                           key='id')
+    log = ReviewLog.from_rows(rows)
+    print(f"📥 Loaded {len(log)} reviews of {len(log.card_keys)} cards from {len(log.user_ids)} users")
+    return log
+
+
+def optimize_parameters(log: ReviewLog, min_reviews: int = 400, steps: int = 200) -> Dict:
+    """
+    Fit global weights, then per-user weights for users with enough reviews.
+
+    Args:
+        log: Review log of all users
+        min_reviews: Scored reviews a user needs for personal weights
+        steps: Adam steps per fit
+
+    Returns:
+        {'global': [...], 'users': {user_id: [...]}}
+    """
+    print("🌍 Fitting global parameters...")
+    optimizer = FSRSOptimizer(steps=steps)
+    global_w = optimizer.fit(log)
+    optimizer.print_stats()
+
+    scored_per_user = np.bincount(log.user[log.scored], minlength=len(log.user_ids))
+    personal = {}
+    for user in np.flatnonzero(scored_per_user >= min_reviews):
+        user_log = log.subset(log.user == user)
+        user_optimizer = FSRSOptimizer(steps=steps)
+        personal[log.user_ids[user]] = user_optimizer.fit(user_log, initial=global_w).round(4).tolist()
+        print(f"👤 {log.user_ids[user][:8]}...: log loss {user_optimizer.stats['loss_before']:.4f} → "
+              f"{user_optimizer.stats['loss_after']:.4f} ({user_optimizer.stats['reviews']} reviews)")
+
+    return {'global': global_w.round(4).tolist(), 'users': personal}
+
+
+def backfill_rows(progress: List[Dict], log: ReviewLog, parameters: Dict, now: datetime) -> List[Dict]:
+    """
+    FSRS state for user_progress rows.
+
+    Cards with rating_history are replayed; the rest are converted from their SM-2
+    interval and ease factor.
+
+    Args:
+        progress: user_progress rows (id, user_id, word_id, deck_id, interval,
+            ease_factor, next_review_date)
+        log: Review log
+        parameters: {'global': [...], 'users': {user_id: [...]}}
+        now: Time the retrievability is computed for
+
+    Returns:
+        Rows for apply_fsrs_backfill
+    """
+    global_w = np.array(parameters.get('global') or DEFAULT_PARAMETERS, dtype=np.float64)
+    users = parameters.get('users', {})
+
+    # Replay with each card's owner's weights
+    card_users = [key[0] for key in log.card_keys]
+    card_w = np.array([users.get(user_id, global_w) for user_id in card_users], dtype=np.float64) \
+        if users and card_users else global_w
+    stability, difficulty, last_day, _ = replay(log, card_w)
+    card_index = {key: i for i, key in enumerate(log.card_keys)}
+
+    count = len(progress)
+    s = np.full(count, np.nan)
+    d = np.full(count, np.nan)
+    last = np.full(count, np.nan)
+    history = np.zeros(count, dtype=bool)
+    for i, row in enumerate(progress):
+        index = card_index.get((row['user_id'], row['word_id'], row.get('deck_id')))
+        if index is not None and not np.isnan(stability[index]):
+            s[i], d[i], last[i] = stability[index], difficulty[index], last_day[index]
+            history[i] = True
+
+    # SM-2 only cards
+    sm2 = ~history
+    if sm2.any():
+        rows_w = np.array([users.get(progress[i]['user_id'], global_w) for i in np.flatnonzero(sm2)],
+                          dtype=np.float64) if users else global_w
+        intervals = np.array([progress[i].get('interval') or 0 for i in np.flatnonzero(sm2)], dtype=np.float64)
+        eases = np.array([progress[i].get('ease_factor') or 2.5 for i in np.flatnonzero(sm2)], dtype=np.float64)
+        s[sm2], d[sm2] = memory_state_from_sm2(intervals, eases, rows_w)
+        for i in np.flatnonzero(sm2):
+            due = progress[i].get('next_review_date')
+            if due:
+                last[i] = _epoch_days(due) - (progress[i].get('interval') or 0)
+
+    now_day = now.timestamp() / SECONDS_PER_DAY
+    elapsed = np.where(np.isnan(last), 0, np.floor(now_day) - np.floor(np.nan_to_num(last)))
+    recall = retrievability(np.maximum(elapsed, 0), s)
+
+    rows = []
+    for i, row in enumerate(progress):
+        rows.append({
+            'id': row['id'],
+            'stability': round(float(s[i]), 4),
+            'difficulty': round(float(d[i]), 4),
+            'retrievability': round(float(recall[i]), 4),
+            'elapsed_days': int(max(elapsed[i], 0)),
+            'last_reviewed_at': None if np.isnan(last[i]) else
+            datetime.fromtimestamp(last[i] * SECONDS_PER_DAY, tz=timezone.utc).isoformat(),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized FSRS backfill and parameter fitting")
+    parser.add_argument('command', choices=['optimize', 'backfill'])
+    parser.add_argument('--parameters', default='fsrs_parameters.json', help="Fitted parameters file")
+    parser.add_argument('--output', default='fsrs_parameters.json', help="Where optimize writes parameters")
+    parser.add_argument('--min-reviews', type=int, default=400, help="Scored reviews needed for personal weights")
+    parser.add_argument('--steps', type=int, default=200, help="Adam steps per fit")
+    parser.add_argument('--dry-run', action='store_true', help="Backfill: compute without writing")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv('.env.local')
+    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    if not supabase_url or not supabase_key:
+        raise ValueError("Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
+    client = create_client(supabase_url, supabase_key)
+
+    print("🧠 FSRS Batch")
+    print("=" * 60)
+    started = time.monotonic()
+    log = load_review_log(client)
+
+    if args.command == 'optimize':
+        parameters = optimize_parameters(log, args.min_reviews, args.steps)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(parameters, f, indent=2)
+        print(f"💾 Saved global and {len(parameters['users'])} personal parameter sets to {args.output}")
+    else:
+        parameters = {}
+        if os.path.exists(args.parameters):
+            with open(args.parameters, 'r', encoding='utf-8') as f:
+                parameters = json.load(f)
+            print(f"📂 Using parameters from {args.parameters} ({len(parameters.get('users', {}))} personal)")
+        else:
+            print("ℹ️  No parameters file, using FSRS defaults")
+
+        progress = list(iter_table_rows(client, 'user_progress',
+                                        ['id', 'user_id', 'word_id', 'deck_id', 'interval', 'ease_factor',
+                                         'next_review_date'], key='id'))
+        rows = backfill_rows(progress, log, parameters, datetime.now(timezone.utc))
+        print(f"🧮 Computed FSRS state for {len(rows)} user_progress rows")
+        if not args.dry_run:
+            stats = rpc_in_batches(client, 'apply_fsrs_backfill', rows)
+            print(f"✅ Updated {stats['updated']} rows ({stats['failed']} failed)")
+
+    print(f"⏱️  Done in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
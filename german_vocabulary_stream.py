@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+German Vocabulary Stream
+
+Streams the German B1 word list (B1_Wortliste.csv) in deck-sized chunks.
+
+Rows are parsed one at a time and grouped into chunks as they are read, so memory
+holds a single chunk no matter how long the list is. Chunks can be fed straight into
+DeckImporter; the german_vocab_chunks/ CSV files are only written when an output
+directory is given.
+
+Chunks are 1000 words by default, with the last one taking the remainder, which
+matches the existing "German NN" decks and their import keys. With balanced=True the
+words are spread evenly over the same number of chunks instead; that needs the row
+count up front, so the file is counted in a quick first pass without building rows.
+"""
+
+import csv
+import math
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
+
+GERMAN_B1_CSV = '/Users/ding/Desktop/Vocabulary Deck/B1_Wortliste.csv'
+CHUNK_DIR = 'german_vocab_chunks'
+CHUNK_HEADER = ['german_word', 'english_translation', 'german_sentence', 'english_sentence']
+
+
+def iter_german_vocabulary(input_file: str = GERMAN_B1_CSV, warn: bool = True) -> Iterator[Dict[str, str]]:
+    """
+    Yield vocabulary entries from the B1 CSV.
+
+    Fields 1 (German), 2 (English), 7 (German sentence) and 8 (English sentence) are
+    kept; rows with fewer than 8 fields or without word/translation are skipped.
+
+    Args:
+        input_file: Path of the CSV file
+        warn: Print a warning for rows with too few fields
+
+    Yields:
+        Dicts with german_word, english_translation, german_sentence, english_sentence
+    """
+    with open(input_file, 'r', encoding='utf-8', newline='') as file:
+        reader = csv.reader(file)
+        next(reader, None)  # Skip header
+
+        for row_num, row in enumerate(reader, 2):
+            if len(row) >= 8:
+                german_word = row[0].strip()
+                english_translation = row[1].strip()
+
+                if german_word and english_translation:
+                    yield {
+                        'german_word': german_word,
+                        'english_translation': english_translation,
+                        'german_sentence': row[6].strip(),
+                        'english_sentence': row[7].strip()
+                    }
+            elif warn:
+                print(f"⚠️  Row {row_num}: Insufficient fields ({len(row)})")
+
+
+def count_german_vocabulary(input_file: str = GERMAN_B1_CSV) -> int:
+    """Number of entries iter_german_vocabulary would yield."""
+    return sum(1 for _ in iter_german_vocabulary(input_file, warn=False))
+
+
+def chunk_entries(entries: Iterable[Dict], chunk_size: int = 1000,
+                  total: Optional[int] = None) -> Iterator[List[Dict]]:
+    """
+    Group entries into chunks on the fly.
+
+    Args:
+        entries: Vocabulary entries
+        chunk_size: Maximum words per chunk
+        total: Number of entries; when given, chunk sizes differ by at most one
+
+    Yields:
+        Lists of entries
+    """
+    if total:
+        chunk_count = math.ceil(total / chunk_size)
+        base, extra = divmod(total, chunk_count)
+        sizes = iter([base + 1] * extra + [base] * (chunk_count - extra))
+    else:
+        sizes = None
+
+    target = next(sizes, chunk_size) if sizes else chunk_size
+    chunk: List[Dict] = []
+    for entry in entries:
+        chunk.append(entry)
+        if len(chunk) >= target:
+            yield chunk
+            chunk = []
+            target = next(sizes, chunk_size) if sizes else chunk_size
+    if chunk:
+        yield chunk
+
+
+def write_chunk_file(chunk: List[Dict], path: str):
+    """Write one chunk in the german_vocab_chunks CSV format."""
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(CHUNK_HEADER)
+        for entry in chunk:
+            writer.writerow([entry[field] for field in CHUNK_HEADER])
+
+
+def iter_german_chunks(input_file: str = GERMAN_B1_CSV, chunk_size: int = 1000, balanced: bool = False,
+                       output_dir: Optional[str] = None) -> Iterator[List[Dict]]:
+    """
+    Stream the B1 list as deck-sized chunks.
+
+    Args:
+        input_file: Path of the CSV file
+        chunk_size: Maximum words per chunk
+        balanced: Spread words evenly over the chunks (adds a counting pass)
+        output_dir: Also write each chunk to <output_dir>/german_vocab_chunk_<n>.csv
+
+    Yields:
+        Lists of vocabulary entries, one per deck
+    """
+    total = count_german_vocabulary(input_file) if balanced else None
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    for chunk_num, chunk in enumerate(chunk_entries(iter_german_vocabulary(input_file), chunk_size, total), 1):
+        if output_dir:
+            output_file = os.path.join(output_dir, f'german_vocab_chunk_{chunk_num}.csv')
+            write_chunk_file(chunk, output_file)
+            print(f"✅ Chunk {chunk_num}: {len(chunk)} words → {output_file}")
+        yield chunk
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+HSK Multi-Language Enrichment Pipeline
+
+Reads each HSK level once and asks for every configured target language in the
+same request. Each word gets one Chinese example sentence plus a translation and a
+sentence translation per language, and the results are fanned out to the existing
+per-language outputs:
+
+- english → hsk_api_enhanced_vocabulary/hsk{level}_api_enhanced.csv
+- french  → hsk_french_enhanced_vocabulary/hsk{level}_french_enhanced.csv
+
+Compared to running hsk_vocab_processor.py and process_hsk_to_french.py separately,
+the word list and instructions are sent once instead of once per language, and the
+Chinese sentence is generated once. Caching, journaling, adaptive batching and
+streaming are inherited from HSKVocabularyProcessor.
+"""
+
+import json
+import os
+import sys
+from typing import Dict, List, Tuple
+
+from hsk_vocab_processor import HSKVocabularyProcessor
+
+# Per-language output layout, matching the single-language processors
+TARGET_LANGUAGES = {
+    'english': {
+        'label': 'English',
+        'output_dir': 'hsk_api_enhanced_vocabulary',
+        'output_file': 'hsk{level}_api_enhanced.csv',
+        'translation_field': 'english_translation',
+        'sentence_field': 'english_sentence',
+    },
+    'french': {
+        'label': 'French',
+        'output_dir': 'hsk_french_enhanced_vocabulary',
+        'output_file': 'hsk{level}_french_enhanced.csv',
+        'translation_field': 'french_translation',
+        'sentence_field': 'french_sentence',
+    },
+}
+
+INPUT_FILE = "/Users/ding/Desktop/Vocabulary Deck/hsk{level}_vocab.csv"
+
+
+def build_prompt_template(languages: List[str]) -> str:
+    """Build the bulk prompt template for a set of target languages."""
+    labels = [TARGET_LANGUAGES[language]['label'] for language in languages]
+    record_fields = ['"chinese_word"', '"Chinese example sentence"']
+    for label in labels:
+        record_fields += [f'"{label} translation"', f'"{label} sentence translation"']
+    record_line = "(" + ", ".join(record_fields) + "),"
+    requirements = "\n".join(
+        f"        - Provide a clear, concise {label} translation of the word and an accurate {label} translation of the example"
+        for label in labels
+    )
+
+    return f"""
+        Translate these {{word_count}} Chinese words/phrases to {" and ".join(labels)} and provide one example sentence per word. Return ONLY the structured data in this exact format:
+
+        Chinese words:
+        {{words_text}}
+
+        Return format (one line per word):
+        {record_line}
+        {record_line}
+        ...
+
+        Requirements:
+        - Create one natural Chinese example sentence per word, appropriate for HSK learners
+{requirements}
+        - Use exact format with quotes and commas
+        - Include all {{word_count}} words
+        - Keep examples simple but natural
+        - Focus on the main meaning of each word
+        """
+
+
+class HSKEnrichmentPipeline(HSKVocabularyProcessor):
+    def __init__(self, api_key: str, languages: List[str],
+                 cache_path: str = "llm_response_cache.sqlite3",
+                 journal_path: str = "hsk_enrichment_journal.jsonl"):
+        """
+        Initialize the pipeline.
+
+        Args:
+            api_key: Anthropic API key
+            languages: Target languages, keys of TARGET_LANGUAGES
+            cache_path: SQLite file holding previously parsed API results
+            journal_path: JSONL progress journal used for resuming
+        """
+        unknown = [language for language in languages if language not in TARGET_LANGUAGES]
+        if unknown:
+            raise ValueError(f"Unsupported target languages: {unknown}")
+
+        super().__init__(api_key, cache_path=cache_path, journal_path=journal_path)
+        self.languages = languages
+        self.target_language = "+".join(languages)
+        self.prompt_template = build_prompt_template(languages)
+        self.record_field_count = 2 + 2 * len(languages)
+
+    def result_from_record(self, word_num: int, record: Tuple[str, ...]) -> Dict:
+        """Build a result dict holding every language's fields."""
+        result = {
+            'word_number': word_num,
+            'chinese_word': record[0],
+            'chinese_sentence': record[1],
+        }
+        for i, language in enumerate(self.languages):
+            config = TARGET_LANGUAGES[language]
+            result[config['translation_field']] = record[2 + 2 * i]
+            result[config['sentence_field']] = record[3 + 2 * i]
+        return result
+
+    def describe_result(self, result: Dict) -> str:
+        """Show every language's translation in the progress line."""
+        return " | ".join(result[TARGET_LANGUAGES[language]['translation_field']] for language in self.languages)
+
+    def output_path(self, language: str, hsk_level: int) -> str:
+        """Output CSV for one language and level."""
+        config = TARGET_LANGUAGES[language]
+        return os.path.join(config['output_dir'], config['output_file'].format(level=hsk_level))
+
+    def write_level_outputs(self, hsk_level: int, output_file: str = None):
+        """Fan a level's journaled results out to one CSV per language."""
+        for language in self.languages:
+            config = TARGET_LANGUAGES[language]
+            os.makedirs(config['output_dir'], exist_ok=True)
+            path = self.output_path(language, hsk_level)
+            fieldnames = ['chinese_word', config['translation_field'], 'chinese_sentence', config['sentence_field']]
+            written = self.journal.write_level_csv(hsk_level, path, fieldnames)
+            print(f"💾 Saved {written} words to {path}")
+
+    def process_levels(self, hsk_levels: List[int]):
+        """Process the given HSK levels, reading each input file once."""
+        print(f"🎯 Enriching HSK {hsk_levels} into {', '.join(self.languages)} with Anthropic API")
+        print("=" * 60)
+
+        if self.load_progress():
+            print(f"📂 Resuming from previous session")
+
+        summary = {}
+        for hsk_level in hsk_levels:
+            if hsk_level in self.journal.completed_levels:
+                print(f"⏭️  Skipping HSK {hsk_level} (already completed)")
+                summary[f"HSK{hsk_level}"] = len(self.journal.level_records(hsk_level))
+                continue
+
+            input_file = INPUT_FILE.format(level=hsk_level)
+            if not os.path.exists(input_file):
+                print(f"⚠️  File not found: {input_file}")
+                continue
+
+            vocabulary = self.process_hsk_file(hsk_level, input_file, None)
+            summary[f"HSK{hsk_level}"] = len(vocabulary)
+
+        print(f"\n🎉 Processing Complete!")
+        print(f"📊 Final Summary:")
+        for level_name, count in summary.items():
+            print(f"   - {level_name}: {count} words × {len(self.languages)} languages")
+        self.print_progress_stats()
+        self.batcher.save_stats("hsk_enrichment_batch_stats.csv")
+
+        if all(hsk_level in self.journal.completed_levels for hsk_level in hsk_levels):
+            self.journal.remove()
+            print(f"🧹 Progress journal cleaned up")
+
+
+def main():
+    """Main function to run the enrichment pipeline."""
+    config_path = "api-config.json"
+
+    if not os.path.exists(config_path):
+        print(f"❌ {config_path} not found. Please create it with your Anthropic API key.")
+        return
+
+    try:
+        with open(config_path, 'r') as f:
+            api_key = json.load(f).get('anthropicApiKey')
+    except Exception as e:
+        print(f"❌ Error loading config: {e}")
+        return
+
+    if not api_key:
+        print("❌ No API key found in config file.")
+        return
+
+    languages = ['english', 'french']
+    hsk_levels = [1, 2, 3, 4, 5]
+
+    args = sys.argv[1:]
+    if "--languages" in args:
+        index = args.index("--languages")
+        languages = [language.strip() for language in args[index + 1].split(",") if language.strip()]
+        del args[index:index + 2]
+    if args:
+        if args[0] == "test" and len(args) > 1:
+            hsk_levels = [int(args[1])]
+        else:
+            print("Usage:")
+            print("  python hsk_enrichment_pipeline.py                              # HSK 1-5, English + French")
+            print("  python hsk_enrichment_pipeline.py test 1                       # HSK 1 only")
+            print("  python hsk_enrichment_pipeline.py --languages english,french   # Choose target languages")
+            return
+
+    pipeline = HSKEnrichmentPipeline(api_key, languages)
+    pipeline.process_levels(hsk_levels)
+
+
+if __name__ == "__main__":
+    main()
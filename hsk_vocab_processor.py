@@ -11,23 +11,53 @@ This script:
 
 import csv
 import json
-import re
 import time
 import requests
 import random
 import os
 import math
-import pickle
+from collections import deque
 from datetime import datetime, timedelta
 from typing import List, Tuple, Dict, Optional
 
+from llm_response_cache import LLMResponseCache
+from progress_journal import ProgressJournal
+from adaptive_batcher import AdaptiveBatcher
+from llm_stream_parser import AnthropicMessageStream, TupleStreamParser
+
+OUTPUT_FIELDS = ['chinese_word', 'english_translation', 'chinese_sentence', 'english_sentence']
+
+PROMPT_TEMPLATE = """
+        Translate these {word_count} Chinese words/phrases to English and provide example sentences. Return ONLY the structured data in this exact format:
+
+        Chinese words:
+        {words_text}
+
+        Return format (one line per word):
+        ("chinese_word", "English translation", "Chinese example sentence", "English sentence translation"),
+        ("chinese_word", "English translation", "Chinese example sentence", "English sentence translation"),
+        ...
+
+        Requirements:
+        - Provide clear, concise English translations
+        - Create natural Chinese example sentences appropriate for HSK learners
+        - Provide accurate English translations of examples
+        - Use exact format with quotes and commas
+        - Include all {word_count} words
+        - Keep examples simple but natural
+        - Focus on the main meaning of each word
+        """
+
 class HSKVocabularyProcessor:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_path: str = "llm_response_cache.sqlite3",
+                 journal_path: str = "hsk_processing_journal.jsonl"):
         """
         Initialize the HSK vocabulary processor.
         
         Args:
             api_key: Anthropic API key
+            cache_path: SQLite file holding previously parsed API results
+            journal_path: JSONL progress journal used for resuming
         """
         self.api_key = api_key
         self.api_url = "https://api.anthropic.com/v1/messages"
@@ -49,11 +79,28 @@ class HSKVocabularyProcessor:
         self.max_delay = 60.0
         
         # Efficiency configuration
-        self.words_per_api_call = 15  # Conservative for Chinese-English translation
+        self.words_per_api_call = 15  # Starting batch size; adjusted from measured token usage
         self.max_output_tokens = 4096
+        self.batcher = AdaptiveBatcher(
+            max_output_tokens=self.max_output_tokens,
+            initial_batch_size=self.words_per_api_call
+        )
+        self.last_batch_usage = None
+        self.stream_responses = True  # Parse records incrementally as the response streams in
+        self.model = "claude-3-5-sonnet-20241022"
+        self.target_language = "english"
+        
+        # Prompt and response layout (overridden by the multi-language pipeline)
+        self.prompt_template = PROMPT_TEMPLATE
+        self.record_field_count = 4
+        self.output_fields = OUTPUT_FIELDS
+        
+        # Response cache so reruns only pay for words not translated yet
+        self.cache = LLMResponseCache(cache_path)
         
         # Progress tracking
-        self.progress_file = "hsk_processing_progress.pkl"
+        self.journal = ProgressJournal(journal_path)
+        self.current_hsk_level = None
         self.start_time = datetime.now()
         self.total_api_calls = 0
         self.successful_api_calls = 0
@@ -110,6 +157,48 @@ class HSKVocabularyProcessor:
             time.sleep(wait_time)
     
     def call_anthropic_api_bulk(self, words_batch: List[Tuple[int, str, str]]) -> List[Dict]:
+        """
+        Get English translations for a batch, serving cached words locally and
+        calling the Anthropic API only for cache misses.
+        
+        Args:
+            words_batch: List of (word_number, chinese_word, existing_translation) tuples
+            
+        Returns:
+            List of dictionaries with translation data, in batch order
+        """
+        self.last_batch_usage = None
+        keys = {
+            word_num: self.cache.make_key(self.model, self.prompt_template, self.target_language, word, existing_translation)
+            for word_num, word, existing_translation in words_batch
+        }
+        cached = self.cache.get_many(keys.values())
+        missing = [entry for entry in words_batch if keys[entry[0]] not in cached]
+        
+        if len(missing) < len(words_batch):
+            print(f"🗄️  {len(words_batch) - len(missing)} cached, {len(missing)} to request")
+        
+        fresh = {}
+        if missing:
+            requested_words = {word_num: word for word_num, word, _ in missing}
+            new_entries = []
+            for result in self.request_bulk_translations(missing):
+                fresh[result['word_number']] = result
+                # Only cache results that are verifiably aligned with the requested word
+                if result['chinese_word'] == requested_words.get(result['word_number']):
+                    record = {k: v for k, v in result.items() if k != 'word_number'}
+                    new_entries.append((keys[result['word_number']], self.model, self.target_language, result['chinese_word'], record))
+            self.cache.put_many(new_entries)
+        
+        results = []
+        for word_num, word, existing_translation in words_batch:
+            if keys[word_num] in cached:
+                results.append({'word_number': word_num, **cached[keys[word_num]]})
+            elif word_num in fresh:
+                results.append(fresh[word_num])
+        return results
+    
+    def request_bulk_translations(self, words_batch: List[Tuple[int, str, str]]) -> List[Dict]:
         """
         Call Anthropic API to process Chinese words and get English translations.
         
@@ -130,30 +219,12 @@ class HSKVocabularyProcessor:
         words_text = "\n".join(word_list)
         
         # Prompt for Chinese to English translation
-        prompt = f"""
-        Translate these {len(words_batch)} Chinese words/phrases to English and provide example sentences. Return ONLY the structured data in this exact format:
-
-        Chinese words:
-        {words_text}
-
-        Return format (one line per word):
-        ("chinese_word", "English translation", "Chinese example sentence", "English sentence translation"),
-        ("chinese_word", "English translation", "Chinese example sentence", "English sentence translation"),
-        ...
-
-        Requirements:
-        - Provide clear, concise English translations
-        - Create natural Chinese example sentences appropriate for HSK learners
-        - Provide accurate English translations of examples
-        - Use exact format with quotes and commas
-        - Include all {len(words_batch)} words
-        - Keep examples simple but natural
-        - Focus on the main meaning of each word
-        """
+        prompt = self.prompt_template.format(word_count=len(words_batch), words_text=words_text)
         
         body = {
-            "model": "claude-3-5-sonnet-20241022",
+            "model": self.model,
             "max_tokens": self.max_output_tokens,
+            "stream": self.stream_responses,
             "messages": [{"role": "user", "content": prompt}]
         }
         
@@ -163,54 +234,59 @@ class HSKVocabularyProcessor:
             try:
                 # Record request time for rate limiting
                 self.request_times.append(datetime.now())
+                request_started = time.monotonic()
                 
                 response = requests.post(
                     self.api_url,
                     headers=self.headers,
                     json=body,
-                    timeout=120
+                    timeout=120,
+                    stream=self.stream_responses
                 )
                 
                 if response.status_code == 200:
-                    data = response.json()
-                    content = data['content'][0]['text']
+                    parser = TupleStreamParser(field_count=self.record_field_count)
+                    # Homographs can appear more than once per batch; each record takes the next number
+                    word_numbers: Dict[str, deque] = {}
+                    for word_num, chinese_word, _ in words_batch:
+                        word_numbers.setdefault(chinese_word, deque()).append(word_num)
+                    results = []
+                    seen = set()
+                    unmatched = []
+                    records_seen = 0
+                    
+                    # Match records to requested words by the word itself as they arrive
+                    for record in self.iter_response_records(response, parser, len(words_batch), request_started):
+                        pending = word_numbers.get(record[0].strip())
+                        if pending is None:
+                            unmatched.append((records_seen, record))
+                        elif pending:
+                            word_num = pending.popleft()
+                            seen.add(word_num)
+                            result = self.result_from_record(word_num, record)
+                            results.append(result)
+                            # Write each word out as soon as its record is complete
+                            self.journal_streamed_result(result)
+                        records_seen += 1
+                    
+                    # Fall back to position only when there is exactly one record per word
+                    if unmatched and records_seen == len(words_batch):
+                        for index, record in unmatched:
+                            word_num = words_batch[index][0]
+                            if word_num not in seen:
+                                seen.add(word_num)
+                                results.append(self.result_from_record(word_num, record))
                     
-                    # Parse the response to extract all structured data
-                    pattern = r'\("([^"]+)",\s*"([^"]+)",\s*"([^"]+)",\s*"([^"]+)"\)'
-                    matches = re.findall(pattern, content)
+                    self.last_batch_usage['words_returned'] = len(results)
                     
-                    if len(matches) == len(words_batch):
+                    if parser.malformed:
+                        print(f"⚠️  {len(parser.malformed)} malformed records flagged for re-request: {parser.malformed[0][:80]}...")
+                    if len(results) < len(words_batch):
+                        truncated = " (hit max_tokens)" if self.last_batch_usage['stop_reason'] == 'max_tokens' else ""
+                        print(f"Expected {len(words_batch)} words, got {len(results)}{truncated}")
+                    if results:
                         self.successful_api_calls += 1
-                        results = []
-                        for i, match in enumerate(matches):
-                            word_num, chinese_word, existing_translation = words_batch[i]
-                            results.append({
-                                'word_number': word_num,
-                                'chinese_word': match[0],
-                                'english_translation': match[1],
-                                'chinese_sentence': match[2],
-                                'english_sentence': match[3]
-                            })
-                        return results
-                    else:
-                        print(f"Expected {len(words_batch)} words, got {len(matches)}. Response: {content[:200]}...")
-                        # Try to salvage partial results
-                        if len(matches) > 0:
-                            self.successful_api_calls += 1
-                            results = []
-                            for i, match in enumerate(matches):
-                                if i < len(words_batch):
-                                    word_num, chinese_word, existing_translation = words_batch[i]
-                                    results.append({
-                                        'word_number': word_num,
-                                        'chinese_word': match[0],
-                                        'english_translation': match[1],
-                                        'chinese_sentence': match[2],
-                                        'english_sentence': match[3]
-                                    })
-                            print(f"Salvaged {len(results)} words from partial response")
-                            return results
-                        return []
+                    return results
                 
                 elif response.status_code == 429:  # Rate limited
                     retry_after = int(response.headers.get('Retry-After', self.base_delay * (2 ** attempt)))
@@ -247,34 +323,81 @@ class HSKVocabularyProcessor:
         print(f"Failed to process request after {self.max_retries} attempts")
         return []
     
-    def save_progress(self, hsk_level: int, chunk_index: int, vocabulary_data: List[Dict]):
-        """Save progress to allow resuming from where we left off."""
-        progress = {
-            'hsk_level': hsk_level,
-            'chunk_index': chunk_index,
-            'vocabulary_data': vocabulary_data,
+    def iter_response_records(self, response, parser: TupleStreamParser, words_requested: int, request_started: float):
+        """
+        Yield parsed records from a successful response, streaming when enabled.
+        
+        Sets self.last_batch_usage once the response has been fully read.
+        """
+        if self.stream_responses:
+            stream = AnthropicMessageStream(response)
+            for text in stream.text_deltas():
+                yield from parser.feed(text)
+            input_tokens, output_tokens, stop_reason = stream.input_tokens, stream.output_tokens, stream.stop_reason
+        else:
+            data = response.json()
+            yield from parser.feed(data['content'][0]['text'])
+            usage = data.get('usage', {})
+            input_tokens, output_tokens = usage.get('input_tokens', 0), usage.get('output_tokens', 0)
+            stop_reason = data.get('stop_reason', '')
+        yield from parser.close()
+        
+        self.last_batch_usage = {
+            'words_requested': words_requested,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'latency': time.monotonic() - request_started,
+            'stop_reason': stop_reason
+        }
+    
+    def result_from_record(self, word_num: int, record: Tuple[str, ...]) -> Dict:
+        """Build a result dict from a parsed (word, translation, sentence, sentence) record."""
+        return {
+            'word_number': word_num,
+            'chinese_word': record[0],
+            'english_translation': record[1],
+            'chinese_sentence': record[2],
+            'english_sentence': record[3]
+        }
+    
+    def describe_result(self, result: Dict) -> str:
+        """Short text shown in the per-word progress line."""
+        return result['english_translation']
+    
+    def write_level_outputs(self, hsk_level: int, output_file: str):
+        """Write a level's output CSV from the journal."""
+        written = self.journal.write_level_csv(hsk_level, output_file, self.output_fields)
+        print(f"💾 Saved {written} words to {output_file}")
+    
+    def journal_streamed_result(self, result: Dict):
+        """Journal a streamed result immediately so a crash mid-response keeps it."""
+        if self.stream_responses and self.current_hsk_level is not None:
+            self.journal.record_word(self.current_hsk_level, result)
+    
+    def save_progress(self, hsk_level: int, chunk_index: int, results: List[Dict]):
+        """Append one chunk's results to the progress journal (cost is O(chunk))."""
+        counters = {
             'total_api_calls': self.total_api_calls,
             'successful_api_calls': self.successful_api_calls,
-            'failed_api_calls': self.failed_api_calls,
-            'timestamp': datetime.now()
+            'failed_api_calls': self.failed_api_calls
         }
+        self.journal.record_chunk(hsk_level, chunk_index, results, counters)
         
-        with open(self.progress_file, 'wb') as f:
-            pickle.dump(progress, f)
-        
-        print(f"💾 Progress saved: HSK{hsk_level}, chunk {chunk_index}, {len(vocabulary_data)} words processed")
+        print(f"💾 Progress saved: HSK{hsk_level}, chunk {chunk_index}, {len(results)} words journaled")
     
     def load_progress(self) -> Optional[Dict]:
-        """Load progress to resume from where we left off."""
-        if os.path.exists(self.progress_file):
-            try:
-                with open(self.progress_file, 'rb') as f:
-                    progress = pickle.load(f)
-                print(f"📂 Resuming from: HSK{progress['hsk_level']}, chunk {progress['chunk_index']}")
-                return progress
-            except Exception as e:
-                print(f"⚠️  Could not load progress: {e}")
-        return None
+        """Restore API counters from the progress journal, if there is one."""
+        if not self.journal.last_chunk and not self.journal.completed_levels:
+            return None
+        
+        counters = self.journal.counters
+        self.total_api_calls = counters.get('total_api_calls', 0)
+        self.successful_api_calls = counters.get('successful_api_calls', 0)
+        self.failed_api_calls = counters.get('failed_api_calls', 0)
+        
+        for hsk_level, chunk_index in sorted(self.journal.last_chunk.items()):
+            print(f"📂 Resuming from: HSK{hsk_level}, chunk {chunk_index}")
+        return counters
     
     def print_progress_stats(self):
         """Print current progress statistics."""
@@ -288,6 +411,8 @@ class HSKVocabularyProcessor:
         print(f"   ❌ Failed calls: {self.failed_api_calls}")
         print(f"   📈 Success rate: {success_rate:.1f}%")
         print(f"   🚀 API calls per hour: {self.total_api_calls / (elapsed_time.total_seconds() / 3600):.1f}")
+        self.cache.print_stats()
+        self.batcher.print_stats()
     
     def process_hsk_file(self, hsk_level: int, input_file: str, output_file: str):
         """
@@ -299,6 +424,7 @@ class HSKVocabularyProcessor:
             output_file: Path to output CSV file
         """
         print(f"\n🔧 Processing HSK {hsk_level} vocabulary...")
+        self.current_hsk_level = hsk_level
         
         # Parse the input file
         all_words = self.parse_hsk_csv(input_file)
@@ -307,62 +433,70 @@ class HSKVocabularyProcessor:
             print("No words found in file. Skipping.")
             return []
         
-        vocabulary_data = []
+        # Skip words that already have a journaled result
+        done = self.journal.processed_word_numbers(hsk_level)
+        pending_words = [word for word in all_words if word[0] not in done]
+        if done:
+            print(f"📂 {len(all_words) - len(pending_words)} words already journaled, {len(pending_words)} remaining")
+        
         processed_count = 0
         failed_count = 0
         
-        # Process words in chunks
-        total_chunks = (len(all_words) + self.words_per_api_call - 1) // self.words_per_api_call
+        # Process words in batches sized from measured token usage; word numbers
+        # restart at 1 in every level, so retry counts must not carry over
+        self.batcher.reset_attempts()
+        self.batcher.add(pending_words)
+        chunk_index = 0
         
-        for i in range(0, len(all_words), self.words_per_api_call):
-            chunk = all_words[i:i + self.words_per_api_call]
-            chunk_index = i // self.words_per_api_call + 1
+        while self.batcher.has_pending():
+            chunk = self.batcher.next_batch()
+            chunk_index += 1
             
-            print(f"\n🔄 Processing chunk {chunk_index}/{total_chunks}")
+            print(f"\n🔄 Processing chunk {chunk_index} ({len(self.batcher.queue)} words queued after this one)")
             print(f"📝 Words in chunk: {len(chunk)}")
             print(f"🔤 Sample words: {[word[1] for word in chunk[:3]]}...")
             
             # Call API with bulk processing
+            api_calls_before = self.total_api_calls
             results = self.call_anthropic_api_bulk(chunk)
             
-            if results:
-                for result in results:
-                    vocabulary_data.append({
-                        'chinese_word': result['chinese_word'],
-                        'english_translation': result['english_translation'],
-                        'chinese_sentence': result['chinese_sentence'],
-                        'english_sentence': result['english_sentence']
-                    })
-                    processed_count += 1
-                    print(f"✅ Successfully processed: {result['chinese_word']} → {result['english_translation']}")
-            else:
-                failed_count += len(chunk)
-                print(f"❌ Failed to process chunk: {[word[1] for word in chunk]}")
+            for result in results:
+                processed_count += 1
+                print(f"✅ Successfully processed: {result['chinese_word']} → {self.describe_result(result)}")
             
-            # Save progress every chunk
-            if vocabulary_data:
-                with open(output_file, 'w', newline='', encoding='utf-8') as file:
-                    writer = csv.DictWriter(file, fieldnames=['chinese_word', 'english_translation', 'chinese_sentence', 'english_sentence'])
-                    writer.writeheader()
-                    writer.writerows(vocabulary_data)
-                print(f"💾 Saved {len(vocabulary_data)} words to {output_file}")
+            # Requeue only the words missing from the response
+            given_up = self.batcher.complete(chunk, {result['word_number'] for result in results}, self.last_batch_usage)
+            if len(results) < len(chunk):
+                print(f"🔁 Requeued {len(chunk) - len(results) - len(given_up)} missing words")
+            if given_up:
+                failed_count += len(given_up)
+                print(f"❌ Gave up on: {[word[1] for word in given_up]}")
             
             # Save progress for resuming
-            self.save_progress(hsk_level, chunk_index, vocabulary_data)
+            self.save_progress(hsk_level, chunk_index, results)
             
             # Print progress stats every 5 chunks
             if chunk_index % 5 == 0:
                 self.print_progress_stats()
             
             # Add small random delay to avoid predictable patterns
-            delay = self.base_delay + random.uniform(0, 1)
-            time.sleep(delay)
+            # (not needed when the whole chunk was served from the cache)
+            if self.total_api_calls > api_calls_before:
+                delay = self.base_delay + random.uniform(0, 1)
+                time.sleep(delay)
+        
+        # Write the output CSV once, from the journal
+        self.write_level_outputs(hsk_level, output_file)
+        
+        # Levels with failed words stay open so a rerun retries just those words
+        if failed_count == 0:
+            self.journal.mark_level_done(hsk_level)
         
         print(f"\nHSK {hsk_level} complete!")
         print(f"Successfully processed: {processed_count} words")
         print(f"Failed: {failed_count} words")
         
-        return vocabulary_data
+        return self.journal.level_records(hsk_level)
     
     def process_all_hsk_files(self, resume: bool = True):
         """Process all HSK 1-5 files."""
@@ -371,13 +505,11 @@ class HSKVocabularyProcessor:
         
         # Check for existing progress
         if resume:
-            progress = self.load_progress()
-            if progress:
-                # Restore progress state
-                self.total_api_calls = progress.get('total_api_calls', 0)
-                self.successful_api_calls = progress.get('successful_api_calls', 0)
-                self.failed_api_calls = progress.get('failed_api_calls', 0)
+            if self.load_progress():
                 print(f"📂 Resuming from previous session")
+        else:
+            self.journal.remove()
+            self.journal.replay()
         
         # Define HSK files
         hsk_files = [
@@ -393,30 +525,18 @@ class HSKVocabularyProcessor:
         os.makedirs(output_dir, exist_ok=True)
         
         all_vocabulary = {}
-        resume_hsk_level = progress['hsk_level'] if progress else 0
         
         # Process each HSK file
         for hsk_level, input_file, output_file in hsk_files:
-            if hsk_level < resume_hsk_level:
+            if hsk_level in self.journal.completed_levels:
                 print(f"⏭️  Skipping HSK {hsk_level} (already completed)")
+                all_vocabulary[f"HSK{hsk_level}"] = self.journal.level_records(hsk_level)
                 continue
                 
             if os.path.exists(input_file):
                 output_path = os.path.join(output_dir, output_file)
                 print(f"\n🚀 Starting HSK {hsk_level}...")
                 
-                # If resuming this level, load existing data
-                if progress and hsk_level == resume_hsk_level:
-                    existing_data = progress.get('vocabulary_data', [])
-                    print(f"📂 Loading {len(existing_data)} existing words for HSK {hsk_level}")
-                    
-                    # Save existing data to file
-                    if existing_data:
-                        with open(output_path, 'w', newline='', encoding='utf-8') as file:
-                            writer = csv.DictWriter(file, fieldnames=['chinese_word', 'english_translation', 'chinese_sentence', 'english_sentence'])
-                            writer.writeheader()
-                            writer.writerows(existing_data)
-                
                 vocabulary = self.process_hsk_file(hsk_level, input_file, output_path)
                 all_vocabulary[f"HSK{hsk_level}"] = vocabulary
             else:
@@ -434,11 +554,12 @@ class HSKVocabularyProcessor:
         
         # Final progress stats
         self.print_progress_stats()
+        self.batcher.save_stats(os.path.join(output_dir, "batch_stats.csv"))
         
-        # Clean up progress file
-        if os.path.exists(self.progress_file):
-            os.remove(self.progress_file)
-            print(f"🧹 Progress file cleaned up")
+        # Clean up the journal once every level has been fully processed
+        if all(hsk_level in self.journal.completed_levels for hsk_level, _, _ in hsk_files):
+            self.journal.remove()
+            print(f"🧹 Progress journal cleaned up")
     
     def process_single_hsk_file(self, hsk_level: int, input_file: str, output_file: str):
         """Process a single HSK file for testing."""
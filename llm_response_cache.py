@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache
+
+Persistent, content-addressed cache for parsed Anthropic API results.
+
+Each entry is keyed by a SHA-256 hash of the model, the prompt template and the
+per-word inputs (word, existing translation, target language). Results are stored
+per word rather than per batch, so a rerun after a crash, a different batch size
+or an overlapping HSK level only sends the words that are not cached yet.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+DEFAULT_CACHE_PATH = "llm_response_cache.sqlite3"
+
+
+class LLMResponseCache:
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH):
+        """
+        Open (or create) the SQLite cache.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                target_language TEXT NOT NULL,
+                word TEXT NOT NULL,
+                result_json TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def make_key(model: str, prompt_template: str, target_language: str,
+                 word: str, existing_translation: str = "") -> str:
+        """
+        Build the content-addressed key for a single word request.
+
+        Args:
+            model: Anthropic model name
+            prompt_template: Unformatted prompt template (any edit invalidates entries)
+            target_language: Language the word is translated into (e.g. "english", "french")
+            word: Source word
+            existing_translation: Existing dictionary gloss sent along with the word
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(
+            [model, prompt_template, target_language, word, existing_translation],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached parsed result for a key, or None on a miss."""
+        row = self.conn.execute(
+            "SELECT result_json FROM llm_responses WHERE cache_key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Look up several keys in one query.
+
+        Args:
+            keys: Cache keys to fetch
+
+        Returns:
+            Mapping of key -> cached result for the keys that were found
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        # SQLite limits bound parameters per statement, so query in slices
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT cache_key, result_json FROM llm_responses WHERE cache_key IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            for key, result_json in rows:
+                found[key] = json.loads(result_json)
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: List[Tuple[str, str, str, str, Dict]]):
+        """
+        Store parsed results.
+
+        Args:
+            entries: List of (key, model, target_language, word, result) tuples
+        """
+        if not entries:
+            return
+        now = datetime.now().isoformat()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO llm_responses "
+            "(cache_key, model, target_language, word, result_json, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (key, model, target_language, word, json.dumps(result, ensure_ascii=False), now)
+                for key, model, target_language, word, result in entries
+            ],
+        )
+        self.conn.commit()
+        self.writes += len(entries)
+
+    def hit_rate(self) -> float:
+        """Percentage of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return (self.hits / lookups * 100) if lookups > 0 else 0.0
+
+    def print_stats(self):
+        """Print cache hit/miss statistics."""
+        print(f"   🗄️  Cache hits: {self.hits}")
+        print(f"   🔍 Cache misses: {self.misses}")
+        print(f"   💾 Cache writes: {self.writes}")
+        print(f"   📈 Cache hit rate: {self.hit_rate():.1f}%")
+
+    def close(self):
+        """Close the underlying database connection."""
+        self.conn.close()
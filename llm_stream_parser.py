@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+LLM Stream Parser
+
+Incremental parsers for structured Anthropic responses, plus a reader for the
+Messages API server-sent event stream.
+
+The parsers are fed text as it arrives and return each record as soon as it is
+complete, so callers can write results out before the whole response has finished.
+Lines that look like records but cannot be parsed are collected in `malformed`
+instead of being silently dropped, so the affected words can be re-requested.
+"""
+
+import json
+import re
+from typing import Dict, Iterator, List, Tuple
+
+FIELD = r'"((?:[^"\\]|\\.)*)"'
+
+
+class TupleStreamParser:
+    """Extracts ("field", "field", ...) records, one per line, from streamed text."""
+
+    def __init__(self, field_count: int = 4):
+        """
+        Args:
+            field_count: Number of quoted fields in each record
+        """
+        self.pattern = re.compile(r'\(\s*' + r',\s*'.join([FIELD] * field_count) + r'\s*\)')
+        self.buffer = ""
+        self.records: List[Tuple[str, ...]] = []
+        self.malformed: List[str] = []
+
+    def feed(self, text: str) -> List[Tuple[str, ...]]:
+        """
+        Add streamed text and return the records completed by it.
+
+        Args:
+            text: Next piece of the response
+
+        Returns:
+            Newly completed records
+        """
+        self.buffer += text
+        completed = []
+        while "\n" in self.buffer:
+            line, self.buffer = self.buffer.split("\n", 1)
+            completed.extend(self.parse_line(line))
+        return completed
+
+    def close(self) -> List[Tuple[str, ...]]:
+        """Parse whatever is left once the stream has ended."""
+        line, self.buffer = self.buffer, ""
+        return self.parse_line(line)
+
+    def parse_line(self, line: str) -> List[Tuple[str, ...]]:
+        """Parse one complete line, flagging record-like lines that do not match."""
+        line = line.strip()
+        if not line:
+            return []
+        found = [tuple(unescape(field) for field in match) for match in self.pattern.findall(line)]
+        if not found and line.startswith('('):
+            self.malformed.append(line)
+        self.records.extend(found)
+        return found
+
+
+class JsonStreamParser:
+    """Extracts top-level JSON objects (JSON Lines or back-to-back objects) from streamed text."""
+
+    def __init__(self):
+        self.current: List[str] = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.records: List[Dict] = []
+        self.malformed: List[str] = []
+
+    def feed(self, text: str) -> List[Dict]:
+        """
+        Add streamed text and return the objects completed by it.
+
+        Args:
+            text: Next piece of the response
+
+        Returns:
+            Newly completed objects
+        """
+        completed = []
+        for char in text:
+            if self.depth == 0:
+                # Skip prose, code fences and separators between objects
+                if char == '{':
+                    self.depth = 1
+                    self.current = [char]
+                continue
+
+            self.current.append(char)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+            elif char == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    raw = "".join(self.current)
+                    self.current = []
+                    try:
+                        obj = json.loads(raw)
+                    except json.JSONDecodeError:
+                        self.malformed.append(raw)
+                        continue
+                    self.records.append(obj)
+                    completed.append(obj)
+        return completed
+
+    def close(self) -> List[Dict]:
+        """Flag an object left open when the stream ended (e.g. hit max_tokens)."""
+        if self.depth > 0 and self.current:
+            self.malformed.append("".join(self.current))
+        self.current = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        return []
+
+
+def unescape(field: str) -> str:
+    """Undo backslash escapes inside a quoted tuple field."""
+    if '\\' not in field:
+        return field
+    try:
+        return json.loads('"' + field + '"')
+    except json.JSONDecodeError:
+        return field
+
+
+class AnthropicMessageStream:
+    """Reads text deltas from a streamed Messages API response (body sent with "stream": true)."""
+
+    def __init__(self, response):
+        """
+        Args:
+            response: requests.Response opened with stream=True and status 200
+        """
+        self.response = response
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.stop_reason = ""
+
+    def text_deltas(self) -> Iterator[str]:
+        """Yield response text as it arrives; usage and stop_reason are set once exhausted."""
+        for raw_line in self.response.iter_lines(decode_unicode=True):
+            if not raw_line or not raw_line.startswith('data:'):
+                continue
+            event = json.loads(raw_line[len('data:'):].strip())
+            event_type = event.get('type')
+
+            if event_type == 'message_start':
+                usage = event.get('message', {}).get('usage', {})
+                self.input_tokens = usage.get('input_tokens', 0)
+            elif event_type == 'content_block_delta':
+                delta = event.get('delta', {})
+                if delta.get('type') == 'text_delta':
+                    yield delta.get('text', '')
+            elif event_type == 'message_delta':
+                self.stop_reason = event.get('delta', {}).get('stop_reason') or self.stop_reason
+                self.output_tokens = event.get('usage', {}).get('output_tokens', self.output_tokens)
+            elif event_type == 'error':
+                raise RuntimeError(f"Stream error: {event.get('error', {}).get('message', event)}")
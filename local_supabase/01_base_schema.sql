@@ -0,0 +1,84 @@
+-- Core tables that were created in the Supabase dashboard and have no migration
+-- file. Columns follow src/lib/supabase.ts and what the Python scripts read and
+-- write; project migrations are applied on top of this.
+
+CREATE TABLE IF NOT EXISTS public.vocabulary (
+    id SERIAL PRIMARY KEY,
+    word_number INTEGER,
+    language_a_word TEXT NOT NULL,
+    language_b_translation TEXT,
+    language_a_sentence TEXT,
+    language_b_sentence TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_vocabulary_language_a_word ON public.vocabulary(language_a_word);
+
+CREATE TABLE IF NOT EXISTS public.vocabulary_decks (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name TEXT NOT NULL,
+    description TEXT,
+    language_a_code TEXT,
+    language_b_code TEXT,
+    language_a_name TEXT,
+    language_b_name TEXT,
+    difficulty_level TEXT,
+    total_words INTEGER DEFAULT 0,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS public.deck_vocabulary (
+    id SERIAL PRIMARY KEY,
+    deck_id UUID NOT NULL REFERENCES public.vocabulary_decks(id) ON DELETE CASCADE,
+    vocabulary_id INTEGER NOT NULL REFERENCES public.vocabulary(id) ON DELETE CASCADE,
+    word_order INTEGER,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    CONSTRAINT unique_deck_vocabulary UNIQUE (deck_id, vocabulary_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_deck_vocabulary_deck ON public.deck_vocabulary(deck_id, word_order);
+CREATE INDEX IF NOT EXISTS idx_deck_vocabulary_vocabulary ON public.deck_vocabulary(vocabulary_id);
+
+CREATE TABLE IF NOT EXISTS public.user_progress (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    word_id INTEGER NOT NULL REFERENCES public.vocabulary(id) ON DELETE CASCADE,
+    deck_id TEXT NOT NULL,
+    repetitions INTEGER DEFAULT 0,
+    interval INTEGER DEFAULT 0,
+    ease_factor DOUBLE PRECISION DEFAULT 2.5,
+    next_review_date TIMESTAMPTZ,
+    again_count INTEGER DEFAULT 0,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    CONSTRAINT unique_user_progress UNIQUE (user_id, word_id, deck_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_progress_user_deck ON public.user_progress(user_id, deck_id);
+
+CREATE TABLE IF NOT EXISTS public.rating_history (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    word_id INTEGER NOT NULL,
+    deck_id TEXT NOT NULL,
+    rating TEXT NOT NULL,
+    timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_rating_history_user_time ON public.rating_history(user_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS public.study_sessions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    deck_id TEXT NOT NULL,
+    session_type TEXT NOT NULL,
+    words_studied INTEGER DEFAULT 0,
+    correct_answers INTEGER DEFAULT 0,
+    session_duration INTEGER DEFAULT 0,
+    completed_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
@@ -5,7 +5,6 @@ Migrates 5 merged HSK6 vocabulary databases to Supabase
 Converts traditional Chinese to simplified Chinese
 """
 
-import sqlite3
 import json
 import os
 from pathlib import Path
@@ -15,6 +14,10 @@ import time
 from typing import List, Dict, Any
 import re
 
+from chinese_converter import PhraseConverter
+from deck_importer import DeckImporter
+from sqlite_source_scanner import SQLiteSourceScanner
+
 # Load environment variables
 print("Loading environment variables...")
 load_dotenv('.env.local')
@@ -234,16 +237,12 @@ TRADITIONAL_TO_SIMPLIFIED = {
     '信息化絲綢之路': '信息化丝绸之路'
 }
 
+# Compiled once; the mapping keys only use traditional-only characters
+SIMPLIFIED_CONVERTER = PhraseConverter(TRADITIONAL_TO_SIMPLIFIED, derive_characters=True)
+
 def convert_to_simplified_chinese(text: str) -> str:
     """Convert traditional Chinese characters to simplified Chinese"""
-    if not text:
-        return text
-    
-    result = text
-    for traditional, simplified in TRADITIONAL_TO_SIMPLIFIED.items():
-        result = result.replace(traditional, simplified)
-    
-    return result
+    return SIMPLIFIED_CONVERTER.convert(text)
 
 def create_hsk6_decks() -> List[Dict[str, Any]]:
     """Create the 5 HSK6 vocabulary decks"""
@@ -306,101 +305,32 @@ def create_hsk6_decks() -> List[Dict[str, Any]]:
     ]
     return decks
 
+# Read-only, streaming access to the merged SQLite databases
+SOURCE_SCANNER = SQLiteSourceScanner(cache_path=None)
+
 def load_vocabulary_from_db(db_path: str) -> List[Dict[str, Any]]:
     """Load vocabulary from SQLite database"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+    rows = SOURCE_SCANNER.iter_rows(db_path, """
         SELECT word_number, chinese_word, french_translation, 
                example_sentence, sentence_translation
         FROM vocabulary
         ORDER BY word_number
     """)
     
-    rows = cursor.fetchall()
-    conn.close()
-    
     vocabulary = []
     for row in rows:
         word_number, chinese_word, french_translation, example_sentence, sentence_translation = row
         
-        # Convert traditional Chinese to simplified
-        chinese_word_simplified = convert_to_simplified_chinese(chinese_word)
-        example_sentence_simplified = convert_to_simplified_chinese(example_sentence)
-        
         vocabulary.append({
             "word_number": word_number,
-            "language_a_word": chinese_word_simplified,
+            "language_a_word": chinese_word,
             "language_b_translation": french_translation,
-            "language_a_sentence": example_sentence_simplified,
+            "language_a_sentence": example_sentence,
             "language_b_sentence": sentence_translation
         })
     
-    return vocabulary
-
-def insert_deck_to_supabase(deck: Dict[str, Any]) -> str:
-    """Insert deck into Supabase and return deck ID"""
-    try:
-        result = supabase.table('vocabulary_decks').insert(deck).execute()
-        deck_id = result.data[0]['id']
-        print(f"✅ Created deck: {deck['name']} (ID: {deck_id})")
-        return deck_id
-    except Exception as e:
-        print(f"❌ Error creating deck {deck['name']}: {e}")
-        raise
-
-def insert_vocabulary_to_supabase(vocabulary: List[Dict[str, Any]]) -> List[str]:
-    """Insert vocabulary into Supabase and return vocabulary IDs"""
-    vocab_ids = []
-    
-    # Insert in batches of 100
-    batch_size = 100
-    for i in range(0, len(vocabulary), batch_size):
-        batch = vocabulary[i:i + batch_size]
-        
-        # Prepare batch data
-        batch_data = []
-        for item in batch:
-            batch_data.append({
-                "language_a_word": item["language_a_word"],
-                "language_b_translation": item["language_b_translation"],
-                "language_a_sentence": item["language_a_sentence"],
-                "language_b_sentence": item["language_b_sentence"]
-            })
-        
-        try:
-            result = supabase.table('vocabulary').insert(batch_data).execute()
-            batch_ids = [item['id'] for item in result.data]
-            vocab_ids.extend(batch_ids)
-            print(f"✅ Inserted batch {i//batch_size + 1}: {len(batch_ids)} words")
-        except Exception as e:
-            print(f"❌ Error inserting vocabulary batch {i//batch_size + 1}: {e}")
-            raise
-    
-    return vocab_ids
-
-def link_vocabulary_to_deck(deck_id: str, vocabulary_ids: List[str]):
-    """Link vocabulary to deck in deck_vocabulary table"""
-    deck_vocab_data = []
-    for i, vocab_id in enumerate(vocabulary_ids):
-        deck_vocab_data.append({
-            "deck_id": deck_id,
-            "vocabulary_id": vocab_id,
-            "word_order": i + 1
-        })
-    
-    # Insert in batches
-    batch_size = 100
-    for i in range(0, len(deck_vocab_data), batch_size):
-        batch = deck_vocab_data[i:i + batch_size]
-        
-        try:
-            supabase.table('deck_vocabulary').insert(batch).execute()
-            print(f"✅ Linked batch {i//batch_size + 1}: {len(batch)} words to deck")
-        except Exception as e:
-            print(f"❌ Error linking vocabulary batch {i//batch_size + 1}: {e}")
-            raise
+    # Convert traditional Chinese to simplified, one pass per field for the whole deck
+    return SIMPLIFIED_CONVERTER.convert_vocabulary(vocabulary, ["language_a_word", "language_a_sentence"])
 
 def migrate_hsk6_decks():
     """Main migration function"""
@@ -409,21 +339,18 @@ def migrate_hsk6_decks():
     
     # Create decks
     decks = create_hsk6_decks()
+    importer = DeckImporter(supabase)
     deck_ids = []
     
-    for i, deck in enumerate(decks, 1):
+    # Load all deck databases in parallel before importing
+    db_paths = [f"{HSK6_VOCAB_PATH}/hsk6_vocab_batch_merged_{i}.db" for i in range(1, len(decks) + 1)]
+    print(f"📖 Loading vocabulary from {len(db_paths)} databases in {HSK6_VOCAB_PATH}")
+    vocabularies = SOURCE_SCANNER.map(load_vocabulary_from_db, db_paths)
+    
+    for i, (deck, vocabulary) in enumerate(zip(decks, vocabularies), 1):
         print(f"\n📚 Processing Deck {i}: {deck['name']}")
         print("-" * 40)
         
-        # Create deck in Supabase
-        deck_id = insert_deck_to_supabase(deck)
-        deck_ids.append(deck_id)
-        
-        # Load vocabulary from SQLite
-        db_path = f"{HSK6_VOCAB_PATH}/hsk6_vocab_batch_merged_{i}.db"
-        print(f"📖 Loading vocabulary from: {db_path}")
-        
-        vocabulary = load_vocabulary_from_db(db_path)
         print(f"📝 Loaded {len(vocabulary)} vocabulary items")
         
         # Show sample of converted text
@@ -434,13 +361,12 @@ def migrate_hsk6_decks():
             print(f"   French: {sample['language_b_translation']}")
             print(f"   Example: {sample['language_a_sentence'][:50]}...")
         
-        # Insert vocabulary to Supabase
-        print(f"💾 Inserting vocabulary to Supabase...")
-        vocabulary_ids = insert_vocabulary_to_supabase(vocabulary)
-        
-        # Link vocabulary to deck
-        print(f"🔗 Linking vocabulary to deck...")
-        link_vocabulary_to_deck(deck_id, vocabulary_ids)
+        # Deck, vocabulary and links in one transactional call
+        print(f"💾 Importing deck and vocabulary to Supabase...")
+        result = importer.import_deck(f"hsk6:{deck['name']}", deck, vocabulary)
+        if not result:
+            raise RuntimeError(f"Import of deck {deck['name']} failed")
+        deck_ids.append(result['deck_id'])
         
         print(f"✅ Completed Deck {i}: {deck['name']}")
         
@@ -451,6 +377,7 @@ def migrate_hsk6_decks():
     print("\n" + "=" * 60)
     print("🎉 HSK6 Vocabulary Migration Complete!")
     print(f"📊 Created {len(deck_ids)} decks with total vocabulary items")
+    importer.print_stats()
     
     return deck_ids
 
@@ -15,8 +15,31 @@ import os
 from datetime import datetime, timedelta
 from typing import List, Tuple, Dict
 
+from llm_response_cache import LLMResponseCache
+
+PROMPT_TEMPLATE = """
+        Translate these {word_count} Chinese words/phrases to French and provide example sentences. Return ONLY the structured data in this exact format:
+
+        Chinese words:
+        {words_text}
+
+        Return format (one line per word):
+        ("chinese_word", "French translation", "Chinese example sentence", "French sentence translation"),
+        ("chinese_word", "French translation", "Chinese example sentence", "French sentence translation"),
+        ...
+
+        Requirements:
+        - Provide clear, concise French translations
+        - Create natural Chinese example sentences appropriate for HSK learners
+        - Provide accurate French translations of examples
+        - Use exact format with quotes and commas
+        - Include all {word_count} words
+        - Keep examples simple but natural
+        - Use proper French grammar and vocabulary
+        """
+
 class HSKToFrenchProcessor:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_path: str = "llm_response_cache.sqlite3"):
         self.api_key = api_key
         self.api_url = "https://api.anthropic.com/v1/messages"
 
@@ -34,6 +57,11 @@ class HSKToFrenchProcessor:
         self.words_per_api_call = 15
         self.max_retries = 3
         self.base_delay = 2.0
+        self.model = "claude-3-5-sonnet-20241022"
+        self.target_language = "french"
+
+        # Response cache so reruns only pay for words not translated yet
+        self.cache = LLMResponseCache(cache_path)
 
         # Progress tracking
         self.start_time = datetime.now()
@@ -52,6 +80,35 @@ class HSKToFrenchProcessor:
             time.sleep(wait_time)
 
     def call_api(self, words_batch: List[Tuple[int, str, str]]) -> List[Dict]:
+        """Process words, serving cached results and calling the API only for misses."""
+        keys = [
+            self.cache.make_key(self.model, PROMPT_TEMPLATE, self.target_language, word, existing_translation)
+            for _, word, existing_translation in words_batch
+        ]
+        cached = self.cache.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+
+        if len(missing) < len(words_batch):
+            print(f"🗄️  {len(words_batch) - len(missing)} cached, {len(missing)} to request")
+
+        fresh = {}
+        if missing:
+            # request_api results are positional against the batch it was given
+            results = self.request_api([words_batch[i] for i in missing])
+            new_entries = []
+            for batch_index, result in zip(missing, results):
+                fresh[batch_index] = result
+                if result['chinese_word'] == words_batch[batch_index][1]:
+                    new_entries.append((keys[batch_index], self.model, self.target_language, result['chinese_word'], result))
+            self.cache.put_many(new_entries)
+
+        return [
+            cached[key] if key in cached else fresh[i]
+            for i, key in enumerate(keys)
+            if key in cached or i in fresh
+        ]
+
+    def request_api(self, words_batch: List[Tuple[int, str, str]]) -> List[Dict]:
         """Call Anthropic API to process words."""
         self.check_rate_limit()
 
@@ -62,29 +119,10 @@ class HSKToFrenchProcessor:
 
         words_text = "\n".join(word_list)
 
-        prompt = f"""
-        Translate these {len(words_batch)} Chinese words/phrases to French and provide example sentences. Return ONLY the structured data in this exact format:
-
-        Chinese words:
-        {words_text}
-
-        Return format (one line per word):
-        ("chinese_word", "French translation", "Chinese example sentence", "French sentence translation"),
-        ("chinese_word", "French translation", "Chinese example sentence", "French sentence translation"),
-        ...
-
-        Requirements:
-        - Provide clear, concise French translations
-        - Create natural Chinese example sentences appropriate for HSK learners
-        - Provide accurate French translations of examples
-        - Use exact format with quotes and commas
-        - Include all {len(words_batch)} words
-        - Keep examples simple but natural
-        - Use proper French grammar and vocabulary
-        """
+        prompt = PROMPT_TEMPLATE.format(word_count=len(words_batch), words_text=words_text)
 
         body = {
-            "model": "claude-3-5-sonnet-20241022",
+            "model": self.model,
             "max_tokens": 4096,
             "messages": [{"role": "user", "content": prompt}]
         }
@@ -209,6 +247,7 @@ class HSKToFrenchProcessor:
             print(f"🔤 Sample: {[word[1] for word in chunk[:3]]}...")
 
             # Call API
+            api_calls_before = self.total_api_calls
             results = self.call_api(chunk)
 
             if results:
@@ -229,8 +268,9 @@ class HSKToFrenchProcessor:
             if chunk_num % 5 == 0:
                 self.print_stats()
 
-            # Small delay
-            time.sleep(self.base_delay + random.uniform(0, 1))
+            # Small delay (skipped when the chunk was fully cached)
+            if self.total_api_calls > api_calls_before:
+                time.sleep(self.base_delay + random.uniform(0, 1))
 
         print(f"\n🎉 HSK {hsk_level} complete! {len(vocabulary_data)} words processed")
         return vocabulary_data
@@ -241,6 +281,7 @@ class HSKToFrenchProcessor:
         success_rate = (self.successful_calls / self.total_api_calls * 100) if self.total_api_calls > 0 else 0
 
         print(f"\n📊 Stats: {self.total_api_calls} calls, {self.successful_calls} success ({success_rate:.1f}%), {elapsed}")
+        print(f"🗄️  Cache: {self.cache.hits} hits, {self.cache.misses} misses ({self.cache.hit_rate():.1f}% hit rate)")
 
     def process_all(self):
         """Process HSK 1-5 sequentially."""
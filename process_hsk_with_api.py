@@ -11,14 +11,22 @@ import time
 from anthropic import Anthropic
 from dotenv import load_dotenv
 
+from llm_stream_parser import JsonStreamParser
+
 # Load environment variables
 load_dotenv()
 
 # Initialize Anthropic client
 anthropic = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
 
-def generate_vocabulary_content(chinese_word, existing_translation):
-    """Generate high-quality English translation and example sentences using Anthropic API"""
+FIELDNAMES = ['chinese_word', 'english_translation', 'chinese_sentence', 'english_sentence']
+REQUIRED_FIELDS = ['english_translation', 'chinese_sentence', 'english_sentence']
+
+def generate_vocabulary_content(chinese_word, existing_translation, max_attempts=3):
+    """Generate high-quality English translation and example sentences using Anthropic API
+    
+    Returns None if no well-formed response was received after max_attempts.
+    """
     
     prompt = f"""You are a Chinese language expert and HSK exam preparation specialist. For the Chinese word "{chinese_word}" which has the basic meaning "{existing_translation}", please provide:
 
@@ -39,57 +47,50 @@ Format your response as JSON only:
     "english_sentence": "English translation of the example sentence"
 }}"""
 
-    try:
-        response = anthropic.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=300,
-            temperature=0.2,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        # Extract JSON from response
-        content = response.content[0].text.strip()
+    for attempt in range(1, max_attempts + 1):
+        parser = JsonStreamParser()
+        try:
+            # Stream the response and stop at the first complete, well-formed object
+            with anthropic.messages.stream(
+                model="claude-3-5-sonnet-20241022",
+                max_tokens=300,
+                temperature=0.2,
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                for text in stream.text_stream:
+                    for record in parser.feed(text):
+                        if all(record.get(field) for field in REQUIRED_FIELDS):
+                            return record
+                        parser.malformed.append(json.dumps(record, ensure_ascii=False))
+            parser.close()
+            print(f"⚠️  Malformed response for {chinese_word} (attempt {attempt}/{max_attempts})")
+        except Exception as e:
+            print(f"❌ Error generating content for {chinese_word}: {e} (attempt {attempt}/{max_attempts})")
         
-        # Find JSON in the response
-        start_idx = content.find('{')
-        end_idx = content.rfind('}') + 1
-        
-        if start_idx != -1 and end_idx != -1:
-            json_str = content[start_idx:end_idx]
-            result = json.loads(json_str)
-            return result
-        else:
-            # Fallback if JSON parsing fails
-            print(f"⚠️  JSON parsing failed for {chinese_word}, using fallback")
-            return {
-                "english_translation": existing_translation.split(';')[0].strip(),
-                "chinese_sentence": f"这个{chinese_word}很好。",
-                "english_sentence": f"This {existing_translation.split(';')[0].strip()} is good."
-            }
-            
-    except Exception as e:
-        print(f"❌ Error generating content for {chinese_word}: {e}")
-        # Fallback response
-        return {
-            "english_translation": existing_translation.split(';')[0].strip(),
-            "chinese_sentence": f"这个{chinese_word}很好。",
-            "english_sentence": f"This {existing_translation.split(';')[0].strip()} is good."
-        }
+        if attempt < max_attempts:
+            time.sleep(1.5 * attempt)
+    
+    # No canned fallback: the caller flags the word for a targeted re-request
+    return None
 
 def process_hsk_file(hsk_level, input_file, output_file):
     """Process a single HSK file and generate enhanced vocabulary using API"""
     print(f"🔧 Processing HSK {hsk_level} vocabulary with Anthropic API...")
     
     vocabulary_data = []
+    flagged_words = []
     
     # Read the input file to get total count
     with open(input_file, 'r', encoding='utf-8') as file:
         reader = csv.DictReader(file)
         total_words = sum(1 for row in reader)
     
-    # Re-read to process
-    with open(input_file, 'r', encoding='utf-8') as file:
+    # Re-read to process, writing each word to the output as soon as it is ready
+    with open(input_file, 'r', encoding='utf-8') as file, \
+            open(output_file, 'w', newline='', encoding='utf-8') as out_file:
         reader = csv.DictReader(file)
+        writer = csv.DictWriter(out_file, fieldnames=FIELDNAMES)
+        writer.writeheader()
         
         for i, row in enumerate(reader, 1):
             chinese_word = row['chinese_word'].strip()
@@ -100,29 +101,31 @@ def process_hsk_file(hsk_level, input_file, output_file):
             # Generate enhanced content using API
             content = generate_vocabulary_content(chinese_word, existing_translation)
             
-            vocabulary_data.append({
-                'chinese_word': chinese_word,
-                'english_translation': content['english_translation'],
-                'chinese_sentence': content['chinese_sentence'],
-                'english_sentence': content['english_sentence']
-            })
+            if content is None:
+                flagged_words.append({'chinese_word': chinese_word, 'translation': existing_translation})
+                print(f"🚩 Flagged {chinese_word} for re-request")
+            else:
+                record = {
+                    'chinese_word': chinese_word,
+                    'english_translation': content['english_translation'],
+                    'chinese_sentence': content['chinese_sentence'],
+                    'english_sentence': content['english_sentence']
+                }
+                vocabulary_data.append(record)
+                writer.writerow(record)
+                out_file.flush()
             
             # Rate limiting - pause between API calls
             time.sleep(1.5)
-            
-            # Save progress every 10 words
-            if i % 10 == 0:
-                print(f"💾 Saving progress... ({i}/{total_words})")
-                with open(output_file, 'w', newline='', encoding='utf-8') as save_file:
-                    writer = csv.DictWriter(save_file, fieldnames=['chinese_word', 'english_translation', 'chinese_sentence', 'english_sentence'])
-                    writer.writeheader()
-                    writer.writerows(vocabulary_data)
-    
-    # Final save
-    with open(output_file, 'w', newline='', encoding='utf-8') as file:
-        writer = csv.DictWriter(file, fieldnames=['chinese_word', 'english_translation', 'chinese_sentence', 'english_sentence'])
-        writer.writeheader()
-        writer.writerows(vocabulary_data)
+    
+    # Flagged words keep the input format so the file can be fed straight back in
+    if flagged_words:
+        flagged_file = output_file.replace('.csv', '_flagged.csv')
+        with open(flagged_file, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=['chinese_word', 'translation'])
+            writer.writeheader()
+            writer.writerows(flagged_words)
+        print(f"🚩 {len(flagged_words)} words need a re-request → {flagged_file}")
     
     print(f"✅ HSK {hsk_level} completed: {len(vocabulary_data)} words → {output_file}")
     return vocabulary_data
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Progress Journal
+
+Crash-safe, append-only JSON Lines journal for the bulk vocabulary processors.
+
+Every processed chunk appends one line per word plus a chunk marker, so the cost of
+saving progress is proportional to the chunk, not to everything processed so far.
+Resuming replays the journal line by line; a partially written last line (crash in
+the middle of a write) is truncated away. The journal is periodically compacted into a
+deduplicated copy that atomically replaces the original.
+"""
+
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+
+class ProgressJournal:
+    def __init__(self, path: str = "hsk_processing_journal.jsonl", compact_every: int = 200):
+        """
+        Open the journal and rebuild state from any existing entries.
+
+        Args:
+            path: Path to the JSONL journal file
+            compact_every: Compact after this many chunk markers have been appended
+        """
+        self.path = path
+        self.compact_every = compact_every
+        self.chunks_since_compaction = 0
+
+        # Rebuilt state
+        self.words: Dict[int, Dict[int, Dict]] = {}
+        self.last_chunk: Dict[int, int] = {}
+        self.completed_levels: set = set()
+        self.counters: Dict = {}
+
+        self.replay()
+
+    def read_entries(self) -> Iterator[Dict]:
+        """Stream journal entries, skipping unreadable lines."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"⚠️  Ignoring unreadable journal line {line_number} in {self.path}")
+
+    def repair_tail(self):
+        """Truncate a partially written last line so new appends start on a fresh line."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+
+            # Walk back to the last complete line
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                block = f.read(step)
+                newline = block.rfind(b"\n")
+                if newline != -1:
+                    position += newline + 1
+                    break
+            f.truncate(position)
+        print(f"⚠️  Dropped a partially written entry at the end of {self.path}")
+
+    def replay(self):
+        """Rebuild per-level state by streaming the journal."""
+        self.repair_tail()
+        self.words = {}
+        self.last_chunk = {}
+        self.completed_levels = set()
+        self.counters = {}
+
+        for entry in self.read_entries():
+            self.apply(entry)
+
+        if self.words or self.completed_levels:
+            word_count = sum(len(words) for words in self.words.values())
+            print(f"📂 Journal replayed: {word_count} words, levels done: {sorted(self.completed_levels)}")
+
+    def apply(self, entry: Dict):
+        """Apply a single journal entry to the in-memory state."""
+        kind = entry.get('type')
+        level = entry.get('hsk_level')
+        if kind == 'word':
+            self.words.setdefault(level, {})[entry['word_number']] = entry['data']
+        elif kind == 'chunk':
+            self.last_chunk[level] = max(self.last_chunk.get(level, 0), entry['chunk_index'])
+            self.counters = entry.get('counters', self.counters)
+        elif kind == 'level_done':
+            self.completed_levels.add(level)
+
+    def append(self, entries: List[Dict]):
+        """
+        Append entries and fsync so they survive a crash.
+
+        Args:
+            entries: Journal entries to write, in order
+        """
+        lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        for entry in entries:
+            self.apply(entry)
+
+    def record_chunk(self, hsk_level: int, chunk_index: int, results: List[Dict], counters: Optional[Dict] = None):
+        """
+        Record the words of one processed chunk followed by its chunk marker.
+
+        Args:
+            hsk_level: HSK level the chunk belongs to
+            chunk_index: 1-based chunk index within the level
+            results: Parsed results, each carrying a 'word_number'
+            counters: API call counters to restore on resume
+        """
+        # Words already journaled with the same data (e.g. streamed in) are not rewritten
+        entries = [
+            entry for entry in (self.word_entry(hsk_level, result) for result in results)
+            if self.words.get(hsk_level, {}).get(entry['word_number']) != entry['data']
+        ]
+        entries.append({
+            'type': 'chunk',
+            'hsk_level': hsk_level,
+            'chunk_index': chunk_index,
+            'counters': counters or {},
+            'timestamp': datetime.now().isoformat(),
+        })
+        self.append(entries)
+
+        self.chunks_since_compaction += 1
+        if self.chunks_since_compaction >= self.compact_every:
+            self.compact()
+
+    def record_word(self, hsk_level: int, result: Dict):
+        """Record a single result as soon as it is available."""
+        self.append([self.word_entry(hsk_level, result)])
+
+    @staticmethod
+    def word_entry(hsk_level: int, result: Dict) -> Dict:
+        """Journal entry for one result carrying a 'word_number'."""
+        return {
+            'type': 'word',
+            'hsk_level': hsk_level,
+            'word_number': result['word_number'],
+            'data': {k: v for k, v in result.items() if k != 'word_number'},
+        }
+
+    def mark_level_done(self, hsk_level: int):
+        """Record that every chunk of a level has been processed."""
+        self.append([{'type': 'level_done', 'hsk_level': hsk_level}])
+
+    def processed_word_numbers(self, hsk_level: int) -> set:
+        """Word numbers of a level that already have a result."""
+        return set(self.words.get(hsk_level, {}))
+
+    def level_records(self, hsk_level: int) -> List[Dict]:
+        """Results for a level, ordered by word number."""
+        words = self.words.get(hsk_level, {})
+        return [words[number] for number in sorted(words)]
+
+    def compact(self):
+        """Rewrite the journal without superseded entries and swap it in atomically."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for level in sorted(self.words):
+                for number, data in sorted(self.words[level].items()):
+                    f.write(json.dumps({'type': 'word', 'hsk_level': level, 'word_number': number, 'data': data}, ensure_ascii=False) + "\n")
+            for level, chunk_index in sorted(self.last_chunk.items()):
+                f.write(json.dumps({'type': 'chunk', 'hsk_level': level, 'chunk_index': chunk_index, 'counters': self.counters}) + "\n")
+            for level in sorted(self.completed_levels):
+                f.write(json.dumps({'type': 'level_done', 'hsk_level': level}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.chunks_since_compaction = 0
+        print(f"🗜️  Journal compacted: {self.path}")
+
+    def write_level_csv(self, hsk_level: int, output_file: str, fieldnames: List[str]) -> int:
+        """
+        Write a level's output CSV once from the journal.
+
+        Args:
+            hsk_level: HSK level to export
+            output_file: Destination CSV path
+            fieldnames: CSV columns
+
+        Returns:
+            Number of rows written
+        """
+        records = self.level_records(hsk_level)
+        with open(output_file, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(records)
+        return len(records)
+
+    def remove(self):
+        """Delete the journal once all work has been exported."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
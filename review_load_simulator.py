@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Review Load Simulator
+
+Monte-Carlo forecast of daily review volume under SM-2 and FSRS.
+
+A snapshot of user_progress (due date, SM-2 fields and FSRS state when present) is
+turned into arrays and every card is advanced day by day with array operations:
+
+- each day the due cards are reviewed; whether a card is recalled is drawn from
+  its FSRS retrievability, which serves as the "true" memory model for both
+  schedulers, and recalled cards get hard/good/easy with fixed probabilities
+- the memory state is updated with FSRS, then the scheduler under test picks the
+  next interval: the app's SM-2 rules (src/lib/utils.ts calculateNextReview) or
+  FSRS at the desired retention
+
+Runs with different seeds and both schedulers are spread over worker processes.
+The report gives, per scheduler, the daily due counts (mean and percentiles across
+runs), review minutes and the busiest users' daily load, which is what the
+apply-srs path has to serve.
+
+New cards are not introduced during the simulation; the forecast covers the
+backlog in the snapshot.
+
+Usage:
+    python review_load_simulator.py --days 90 --runs 16 --workers 4
+    python review_load_simulator.py --snapshot user_progress_snapshot.npz --report load_report.json
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from fsrs_batch import (DEFAULT_PARAMETERS, SECONDS_PER_DAY, _epoch_days, memory_state_from_sm2,
+                        next_interval, retrievability, step)
+from supabase_table_reader import iter_table_rows
+
+SCHEDULERS = ('sm2', 'fsrs')
+SNAPSHOT_COLUMNS = ['id', 'user_id', 'interval', 'ease_factor', 'repetitions', 'next_review_date']
+FSRS_COLUMNS = ['stability', 'difficulty']
+
+# SM-2 constants from src/lib/utils.ts
+MIN_EASE_FACTOR = 1.3
+EASE_FACTOR_DEFAULT = 2.5
+
+
+def sm2_step(interval: np.ndarray, ease_factor: np.ndarray, repetitions: np.ndarray, ratings: np.ndarray):
+    """Vectorized calculateNextReview (ratings 1-4 = again/hard/good/easy)."""
+    again, hard, easy = ratings == 1, ratings == 2, ratings == 4
+    passed = ratings >= 3
+
+    grown = np.where(repetitions == 0, 1, np.where(repetitions == 1, 6, np.ceil(interval * ease_factor)))
+    new_interval = np.where(again, 0, np.where(hard, np.maximum(1, np.ceil(interval / 2)), grown))
+
+    # good leaves the ease factor unchanged, easy adds 0.1
+    new_ease = np.where(again, ease_factor - 0.2,
+                        np.where(hard, ease_factor - 0.15, np.where(easy, ease_factor + 0.1, ease_factor)))
+    new_ease = np.maximum(MIN_EASE_FACTOR, new_ease)
+
+    new_repetitions = np.where(again, 0, np.where(passed, repetitions + 1, repetitions))
+    return new_interval, new_ease, new_repetitions
+
+
+def build_snapshot(rows: List[Dict], parameters: Dict, now: datetime) -> Dict[str, np.ndarray]:
+    """
+    Arrays for the simulation from user_progress rows.
+
+    Args:
+        rows: user_progress rows (SNAPSHOT_COLUMNS, plus stability/difficulty if migrated)
+        parameters: {'global': [...], 'users': {user_id: [...]}} (may be empty)
+        now: Day 0 of the simulation
+
+    Returns:
+        Dict of arrays (user, due_day, last_day, interval, ease_factor, repetitions,
+        stability, difficulty, weights)
+    """
+    today = np.floor(now.timestamp() / SECONDS_PER_DAY)
+    user_codes: Dict[str, int] = {}
+    count = len(rows)
+    snapshot = {
+        'user': np.zeros(count, dtype=np.int64),
+        'due_day': np.zeros(count, dtype=np.int64),
+        'interval': np.zeros(count),
+        'ease_factor': np.zeros(count),
+        'repetitions': np.zeros(count),
+        'stability': np.full(count, np.nan),
+        'difficulty': np.full(count, np.nan),
+    }
+    for i, row in enumerate(rows):
+        snapshot['user'][i] = user_codes.setdefault(row['user_id'], len(user_codes))
+        due = row.get('next_review_date')
+        snapshot['due_day'][i] = np.floor(_epoch_days(due)) - today if due else 0
+        snapshot['interval'][i] = row.get('interval') or 0
+        snapshot['ease_factor'][i] = row.get('ease_factor') or EASE_FACTOR_DEFAULT
+        snapshot['repetitions'][i] = row.get('repetitions') or 0
+        if row.get('stability') is not None and row.get('difficulty') is not None:
+            snapshot['stability'][i] = row['stability']
+            snapshot['difficulty'][i] = row['difficulty']
+
+    global_w = np.array(parameters.get('global') or DEFAULT_PARAMETERS, dtype=np.float64)
+    personal = parameters.get('users', {})
+    user_ids = list(user_codes)
+    if personal:
+        user_w = np.array([personal.get(user_id, global_w) for user_id in user_ids], dtype=np.float64)
+        snapshot['weights'] = user_w[snapshot['user']]
+    else:
+        snapshot['weights'] = global_w
+
+    # Cards never migrated to FSRS get their state from the SM-2 fields
+    missing = np.isnan(snapshot['stability'])
+    if missing.any():
+        w = snapshot['weights'] if snapshot['weights'].ndim == 1 else snapshot['weights'][missing]
+        snapshot['stability'][missing], snapshot['difficulty'][missing] = memory_state_from_sm2(
+            snapshot['interval'][missing], snapshot['ease_factor'][missing], w)
+    snapshot['last_day'] = (snapshot['due_day'] - snapshot['interval']).astype(np.float64)
+    snapshot['user_count'] = np.array(len(user_ids))
+    return snapshot
+
+
+def load_snapshot(client, parameters: Dict) -> Dict[str, np.ndarray]:
+    """Read user_progress and build the simulation arrays."""
+    try:
+        rows = list(iter_table_rows(client, 'user_progress', SNAPSHOT_COLUMNS + FSRS_COLUMNS, key='id'))
+    except Exception as e:
+        # FSRS columns not migrated yet
+        print(f"ℹ️  Reading without FSRS columns ({e})")
+        rows = list(iter_table_rows(client, 'user_progress', SNAPSHOT_COLUMNS, key='id'))
+    print(f"📥 Loaded {len(rows)} user_progress rows")
+    return build_snapshot(rows, parameters, datetime.now(timezone.utc))
+
+
+# Set once per worker process so the snapshot is not pickled for every task
+_SNAPSHOT: Optional[Dict[str, np.ndarray]] = None
+
+
+def _init_worker(snapshot: Dict[str, np.ndarray]):
+    global _SNAPSHOT
+    _SNAPSHOT = snapshot
+
+
+def simulate(scheduler: str, seed: int, days: int, desired_retention: float = 0.9,
+             success_ratings=(0.15, 0.75, 0.10), seconds_per_review: float = 8.0,
+             seconds_per_lapse: float = 20.0, snapshot: Optional[Dict[str, np.ndarray]] = None) -> Dict:
+    """
+    One Monte-Carlo run.
+
+    Args:
+        scheduler: 'sm2' or 'fsrs'
+        seed: Random seed
+        days: Days to simulate
+        desired_retention: FSRS target retention
+        success_ratings: Probabilities of hard/good/easy when a card is recalled
+        seconds_per_review: Time spent on a recalled card
+        seconds_per_lapse: Time spent on a forgotten card
+        snapshot: Arrays from build_snapshot (default: the worker's snapshot)
+
+    Returns:
+        {'scheduler', 'seed', 'due', 'lapses', 'minutes', 'user_p99'} with one value per day
+    """
+    snapshot = snapshot if snapshot is not None else _SNAPSHOT
+    rng = np.random.default_rng(seed)
+    user = snapshot['user']
+    weights = snapshot['weights']
+    user_count = int(snapshot['user_count'])
+    due_day = snapshot['due_day'].copy()
+    last_day = snapshot['last_day'].copy()
+    stability = snapshot['stability'].copy()
+    difficulty = snapshot['difficulty'].copy()
+    interval = snapshot['interval'].copy()
+    ease_factor = snapshot['ease_factor'].copy()
+    repetitions = snapshot['repetitions'].copy()
+
+    due_counts = np.zeros(days, dtype=np.int64)
+    lapses = np.zeros(days, dtype=np.int64)
+    minutes = np.zeros(days)
+    user_p99 = np.zeros(days)
+
+    for day in range(days):
+        cards = np.flatnonzero(due_day <= day)
+        due_counts[day] = len(cards)
+        if not len(cards):
+            continue
+
+        elapsed = np.maximum(day - last_day[cards], 0)
+        recalled = rng.random(len(cards)) < retrievability(elapsed, stability[cards])
+        ratings = np.where(recalled, rng.choice([2, 3, 4], size=len(cards), p=success_ratings), 1)
+
+        w = weights if weights.ndim == 1 else weights[cards]
+        stability[cards], difficulty[cards], _ = step(stability[cards], difficulty[cards], elapsed, ratings, w)
+        last_day[cards] = day
+
+        if scheduler == 'sm2':
+            interval[cards], ease_factor[cards], repetitions[cards] = sm2_step(
+                interval[cards], ease_factor[cards], repetitions[cards], ratings)
+            # "again" is due immediately in the app; at day resolution it comes back tomorrow
+            next_days = np.maximum(interval[cards], 1)
+        else:
+            next_days = next_interval(stability[cards], desired_retention)
+        due_day[cards] = day + next_days.astype(np.int64)
+
+        lapses[day] = int((~recalled).sum())
+        minutes[day] = ((len(cards) - lapses[day]) * seconds_per_review + lapses[day] * seconds_per_lapse) / 60
+        per_user = np.bincount(user[cards], minlength=user_count)
+        user_p99[day] = np.percentile(per_user[per_user > 0], 99)
+
+    return {'scheduler': scheduler, 'seed': seed, 'due': due_counts, 'lapses': lapses,
+            'minutes': minutes, 'user_p99': user_p99}
+
+
+def summarize(runs: List[Dict], days: int) -> Dict:
+    """Percentiles across runs per scheduler and day."""
+    summary = {}
+    for scheduler in SCHEDULERS:
+        selected = [run for run in runs if run['scheduler'] == scheduler]
+        if not selected:
+            continue
+        due = np.array([run['due'] for run in selected])
+        minutes = np.array([run['minutes'] for run in selected])
+        lapses = np.array([run['lapses'] for run in selected])
+        user_p99 = np.array([run['user_p99'] for run in selected])
+        summary[scheduler] = {
+            'runs': len(selected),
+            'due_mean': due.mean(axis=0).round(1).tolist(),
+            'due_p5': np.percentile(due, 5, axis=0).tolist(),
+            'due_p50': np.percentile(due, 50, axis=0).tolist(),
+            'due_p95': np.percentile(due, 95, axis=0).tolist(),
+            'minutes_mean': minutes.mean(axis=0).round(1).tolist(),
+            'lapse_rate': (lapses.sum(axis=0) / np.maximum(due.sum(axis=0), 1)).round(4).tolist(),
+            'user_p99_mean': user_p99.mean(axis=0).round(1).tolist(),
+            'total_reviews_mean': float(due.sum(axis=1).mean()),
+            'peak_day_p95': float(np.percentile(due.max(axis=1), 95)),
+        }
+    return summary
+
+
+def print_report(summary: Dict, days: int):
+    print("\n" + "=" * 60)
+    print("📊 REVIEW LOAD FORECAST")
+    print("=" * 60)
+    header = "   Days      " + "".join(f"{scheduler.upper():>28}" for scheduler in summary)
+    print(header)
+    print("             " + "".join(f"{'reviews/day (p50 [p5-p95])':>28}" for _ in summary))
+    for start in range(0, days, 7):
+        end = min(start + 7, days)
+        cells = []
+        for data in summary.values():
+            p50 = np.mean(data['due_p50'][start:end])
+            p5 = np.mean(data['due_p5'][start:end])
+            p95 = np.mean(data['due_p95'][start:end])
+            cells.append(f"{p50:>10.0f} [{p5:.0f}-{p95:.0f}]")
+        print(f"   {start + 1:>3}-{end:<3}   " + "".join(f"{cell:>28}" for cell in cells))
+
+    print()
+    for scheduler, data in summary.items():
+        print(f"🗓️  {scheduler.upper()} ({data['runs']} runs)")
+        print(f"   Reviews over {days} days: {data['total_reviews_mean']:.0f}")
+        print(f"   Peak day (p95 across runs): {data['peak_day_p95']:.0f} reviews")
+        print(f"   Review time per day: {np.mean(data['minutes_mean']):.0f} min on average")
+        print(f"   Lapse rate: {np.mean(data['lapse_rate']) * 100:.1f}%")
+        print(f"   Busiest 1% of users: {np.mean(data['user_p99_mean']):.0f} reviews/day")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast daily review load under SM-2 and FSRS")
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--runs', type=int, default=8, help="Monte-Carlo runs per scheduler")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--retention', type=float, default=0.9, help="FSRS desired retention")
+    parser.add_argument('--parameters', default='fsrs_parameters.json', help="Fitted FSRS parameters, if any")
+    parser.add_argument('--snapshot', help="Reuse (or create) a saved snapshot .npz instead of querying each time")
+    parser.add_argument('--report', help="Write the summary as JSON")
+    args = parser.parse_args()
+
+    parameters = {}
+    if os.path.exists(args.parameters):
+        with open(args.parameters, 'r', encoding='utf-8') as f:
+            parameters = json.load(f)
+
+    if args.snapshot and os.path.exists(args.snapshot):
+        with np.load(args.snapshot) as data:
+            snapshot = {key: data[key] for key in data.files}
+        print(f"📂 Loaded snapshot {args.snapshot} ({len(snapshot['user'])} cards)")
+    else:
+        from dotenv import load_dotenv
+        from supabase import create_client
+
+        load_dotenv('.env.local')
+        supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+        supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+        if not supabase_url or not supabase_key:
+            raise ValueError("Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY")
+        snapshot = load_snapshot(create_client(supabase_url, supabase_key), parameters)
+        if args.snapshot:
+            np.savez(args.snapshot, **snapshot)
+            print(f"💾 Saved snapshot to {args.snapshot}")
+
+    print(f"🎲 {args.runs} runs x {len(SCHEDULERS)} schedulers over {args.days} days, {args.workers} workers")
+    started = time.monotonic()
+    tasks = [(scheduler, seed) for seed in range(args.runs) for scheduler in SCHEDULERS]
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(snapshot,)) as executor:
+        futures = [executor.submit(simulate, scheduler, seed, args.days, args.retention)
+                   for scheduler, seed in tasks]
+        runs = [future.result() for future in futures]
+    print(f"⏱️  Simulated in {time.monotonic() - started:.1f}s")
+
+    summary = summarize(runs, args.days)
+    print_report(summary, args.days)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'days': args.days, 'retention': args.retention, 'schedulers': summary}, f, indent=2)
+        print(f"\n💾 Report saved to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Similarity Sync
+
+Diff-based sync for word_similarities uploads.
+
+The existing (source_word_id, target_word_id) keys of one algorithm version are read
+once with a keyset scan and kept as compact arrays: a packed 64-bit key per row
+(source << 32 | target), the row id and the score. The freshly computed rows are
+sorted by the same packed key and merge-walked against the existing ones, so a run
+only sends:
+
+- inserts for pairs that are not in the table yet
+- updates for pairs whose similarity_score changed
+- deletes (by row id) for pairs that are no longer computed
+
+Inserts and updates go through BulkUpsertWriter; deletes are sent as id lists.
+Deletes are limited to rows whose two words are both in `scope_ids` when given, so
+a script that only computes part of the table never removes pairs it does not own.
+"""
+
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from supabase_bulk_writer import BulkUpsertWriter
+from supabase_table_reader import iter_table_rows
+
+
+def pack_pair(source_id: int, target_id: int) -> int:
+    """Pack a (source, target) pair of 32-bit ids into one 64-bit key."""
+    return (source_id << 32) | target_id
+
+
+def unpack_pair(key: int) -> Tuple[int, int]:
+    """Inverse of pack_pair."""
+    return key >> 32, key & 0xFFFFFFFF
+
+
+class SimilaritySync:
+    def __init__(self, client, algorithm_version: Optional[str] = None,
+                 scope_ids: Optional[Set[int]] = None, table: str = 'word_similarities',
+                 score_tolerance: float = 5e-5, delete_page_size: int = 200,
+                 max_in_flight: int = 4):
+        """
+        Initialize the sync.
+
+        Args:
+            client: Supabase client
+            algorithm_version: Only rows of this version are compared and written.
+                None targets the minimal schema (ids only, no version or score)
+            scope_ids: Vocabulary ids this run is responsible for; existing rows
+                outside the scope are never deleted (None means the whole version)
+            table: Similarity table
+            score_tolerance: Score differences at or below this are not updates
+                (similarity_score is stored as DECIMAL(5,4))
+            delete_page_size: Row ids per delete request
+            max_in_flight: Concurrent upsert batches
+        """
+        self.client = client
+        self.algorithm_version = algorithm_version
+        self.scope_ids = scope_ids
+        self.table = table
+        self.score_tolerance = score_tolerance
+        self.delete_page_size = delete_page_size
+        self.max_in_flight = max_in_flight
+        self.with_scores = algorithm_version is not None
+
+        if self.with_scores:
+            self.on_conflict = 'source_word_id,target_word_id,algorithm_version'
+        else:
+            self.on_conflict = 'source_word_id,target_word_id'
+
+        self.keys = array('q')
+        self.row_ids = array('q')
+        self.scores = array('d')
+        self.loaded = False
+        self.stats = {
+            'existing': 0,
+            'computed': 0,
+            'unchanged': 0,
+            'inserts': 0,
+            'updates': 0,
+            'deletes': 0,
+            'write_errors': 0,
+            'delete_errors': 0,
+            'seconds': 0.0,
+        }
+
+    def load_existing(self):
+        """Read the current keys (and scores) of this algorithm version once."""
+        columns = ['id', 'source_word_id', 'target_word_id']
+        filters = None
+        if self.with_scores:
+            columns.append('similarity_score')
+            filters = lambda q: q.eq('algorithm_version', self.algorithm_version)
+
+        started = time.monotonic()
+        for row in iter_table_rows(self.client, self.table, columns, key='id', filters=filters):
+            self.keys.append(pack_pair(row['source_word_id'], row['target_word_id']))
+            self.row_ids.append(row['id'])
+            if self.with_scores:
+                self.scores.append(float(row.get('similarity_score') or 0.0))
+
+        self.loaded = True
+        self.stats['existing'] = len(self.keys)
+        print(f"📥 Loaded {len(self.keys)} existing {self.table} keys"
+              f"{' for ' + self.algorithm_version if self.algorithm_version else ''}"
+              f" in {time.monotonic() - started:.1f}s")
+
+    def in_scope(self, key: int) -> bool:
+        if self.scope_ids is None:
+            return True
+        source_id, target_id = unpack_pair(key)
+        return source_id in self.scope_ids and target_id in self.scope_ids
+
+    def diff(self, rows: Iterable[Dict]) -> Tuple[List[Dict], List[Dict], List[int]]:
+        """
+        Compare computed rows with the existing ones.
+
+        Args:
+            rows: Computed rows (source_word_id, target_word_id and, for versioned
+                tables, similarity_score plus any other columns to write)
+
+        Returns:
+            (inserts, updates, delete_row_ids)
+        """
+        if not self.loaded:
+            self.load_existing()
+
+        computed: Dict[int, Dict] = {}
+        for row in rows:
+            # The same pair twice in one run keeps the last row, like an upsert would
+            computed[pack_pair(row['source_word_id'], row['target_word_id'])] = row
+        self.stats['computed'] = len(computed)
+
+        existing_order = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        computed_keys = sorted(computed)
+
+        inserts: List[Dict] = []
+        updates: List[Dict] = []
+        deletes: List[int] = []
+        unchanged = 0
+
+        i = j = 0
+        while i < len(existing_order) or j < len(computed_keys):
+            existing_key = self.keys[existing_order[i]] if i < len(existing_order) else None
+            computed_key = computed_keys[j] if j < len(computed_keys) else None
+
+            if computed_key is None or (existing_key is not None and existing_key < computed_key):
+                # Only in the table
+                if self.in_scope(existing_key):
+                    deletes.append(self.row_ids[existing_order[i]])
+                i += 1
+            elif existing_key is None or computed_key < existing_key:
+                # Only computed
+                inserts.append(self.versioned(computed[computed_key]))
+                j += 1
+            else:
+                row = computed[computed_key]
+                index = existing_order[i]
+                if self.with_scores and abs(float(row.get('similarity_score', 0.0)) - self.scores[index]) > self.score_tolerance:
+                    updates.append(self.versioned(row))
+                else:
+                    unchanged += 1
+                i += 1
+                j += 1
+                # Duplicate keys already in the table are extra copies; remove them
+                while i < len(existing_order) and self.keys[existing_order[i]] == computed_key:
+                    deletes.append(self.row_ids[existing_order[i]])
+                    i += 1
+
+        self.stats['unchanged'] = unchanged
+        return inserts, updates, deletes
+
+    def versioned(self, row: Dict) -> Dict:
+        """Make sure versioned rows carry the algorithm version used for the conflict key."""
+        if self.with_scores and 'algorithm_version' not in row:
+            row = dict(row, algorithm_version=self.algorithm_version)
+        return row
+
+    def delete_rows(self, row_ids: List[int]) -> int:
+        """Delete rows by id in pages; returns the number deleted."""
+        deleted = 0
+        for i in range(0, len(row_ids), self.delete_page_size):
+            page = row_ids[i:i + self.delete_page_size]
+            try:
+                result = self.client.table(self.table).delete().in_('id', page).execute()
+                deleted += len(result.data or [])
+            except Exception as e:
+                print(f"❌ Delete error ({len(page)} rows): {e}")
+                self.stats['delete_errors'] += len(page)
+        return deleted
+
+    def sync(self, rows: Iterable[Dict], dry_run: bool = False) -> Dict:
+        """
+        Bring the table in line with the computed rows.
+
+        Args:
+            rows: Complete set of computed rows for this version and scope
+            dry_run: Only report the diff, send nothing
+
+        Returns:
+            Stats dict (existing, computed, unchanged, inserts, updates, deletes, ...)
+        """
+        started = time.monotonic()
+        inserts, updates, deletes = self.diff(rows)
+        print(f"🔀 Diff: {len(inserts)} inserts, {len(updates)} score updates, "
+              f"{len(deletes)} deletes, {self.stats['unchanged']} unchanged")
+
+        if not dry_run:
+            if inserts or updates:
+                # No ledger: the diff already says exactly what is missing
+                writer = BulkUpsertWriter(self.client, self.table, on_conflict=self.on_conflict,
+                                          max_in_flight=self.max_in_flight)
+                writer.write(inserts + updates)
+                self.stats['inserts'] = len(inserts)
+                self.stats['updates'] = len(updates)
+                self.stats['write_errors'] = writer.stats['rows_failed']
+            if deletes:
+                self.stats['deletes'] = self.delete_rows(deletes)
+
+        self.stats['seconds'] = time.monotonic() - started
+        return self.stats
+
+    def print_stats(self):
+        """Print a summary of the last sync."""
+        print(f"   📥 Existing rows: {self.stats['existing']}")
+        print(f"   🧮 Computed rows: {self.stats['computed']}")
+        print(f"   ⏸️  Unchanged: {self.stats['unchanged']}")
+        print(f"   ➕ Inserted: {self.stats['inserts']}")
+        print(f"   ✏️  Score updates: {self.stats['updates']}")
+        print(f"   ➖ Deleted: {self.stats['deletes']}")
+        if self.stats['write_errors']:
+            print(f"   ❌ Insert/update errors: {self.stats['write_errors']} (rerun the sync to retry)")
+        if self.stats['delete_errors']:
+            print(f"   ❌ Delete errors: {self.stats['delete_errors']}")
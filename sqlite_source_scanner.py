@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+SQLite Source Scanner
+
+Reads the legacy SQLite vocabulary banks quickly and without side effects.
+
+- Databases are opened with `file:...?mode=ro&immutable=1` URIs: nothing can be
+  written (a mistyped path fails instead of creating an empty database), and
+  SQLite skips locking and change detection. Only use it on files no other process
+  is writing, which holds for the exported vocab banks.
+- Schemas, columns, row counts and sample rows are cached in a JSON file keyed by
+  path, mtime and size, so profiling an unchanged bank again costs one stat() call.
+- Several databases are profiled or loaded at once on a thread pool (sqlite3
+  releases the GIL while it reads).
+- Rows are streamed with `fetchmany` instead of materialising whole tables.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+DEFAULT_CACHE_PATH = '.sqlite_schema_cache.json'
+
+
+def open_readonly(db_path: str) -> sqlite3.Connection:
+    """Open a database read-only and immutable."""
+    path = os.path.abspath(db_path)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"SQLite database not found: {db_path}")
+    return sqlite3.connect(f"file:{quote(path)}?mode=ro&immutable=1", uri=True)
+
+
+def _json_value(value: Any) -> Any:
+    # BLOBs are not JSON serialisable; keep a readable stand-in in the cache
+    return value.hex() if isinstance(value, bytes) else value
+
+
+class SQLiteSourceScanner:
+    def __init__(self, cache_path: Optional[str] = DEFAULT_CACHE_PATH, max_workers: int = 8,
+                 fetch_size: int = 1000, sample_rows: int = 3):
+        """
+        Initialize the scanner.
+
+        Args:
+            cache_path: JSON file for cached profiles (None disables the cache)
+            max_workers: Databases read concurrently
+            fetch_size: Rows per fetchmany call when streaming
+            sample_rows: Sample rows kept per table in a profile
+        """
+        self.cache_path = cache_path
+        self.max_workers = max_workers
+        self.fetch_size = fetch_size
+        self.sample_rows = sample_rows
+        self.cache: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self.stats = {'profiled': 0, 'cache_hits': 0, 'rows_streamed': 0}
+
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    self.cache = json.load(f)
+            except (OSError, ValueError):
+                print(f"⚠️  Ignoring unreadable schema cache {cache_path}")
+
+    def save_cache(self):
+        """Write the cached profiles to disk."""
+        if not self.cache_path:
+            return
+        with self.lock:
+            payload = json.dumps(self.cache, indent=2, ensure_ascii=False)
+        with open(self.cache_path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(self.cache_path + '.tmp', self.cache_path)
+
+    def _profile(self, db_path: str) -> Dict:
+        path = os.path.abspath(db_path)
+        stat = os.stat(path)
+        signature = [stat.st_mtime_ns, stat.st_size]
+
+        with self.lock:
+            cached = self.cache.get(path)
+        if cached and cached['signature'] == signature:
+            with self.lock:
+                self.stats['cache_hits'] += 1
+            return cached
+
+        conn = open_readonly(path)
+        try:
+            tables = {}
+            for name, sql in conn.execute(
+                    "SELECT name, sql FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"):
+                quoted = '"' + name.replace('"', '""') + '"'
+                columns = [col[1] for col in conn.execute(f"PRAGMA table_info({quoted})")]
+                row_count = conn.execute(f"SELECT COUNT(*) FROM {quoted}").fetchone()[0]
+                sample = conn.execute(f"SELECT * FROM {quoted} LIMIT ?", (self.sample_rows,)).fetchall()
+                tables[name] = {
+                    'schema': sql,
+                    'columns': columns,
+                    'row_count': row_count,
+                    'sample_data': [[_json_value(value) for value in row] for row in sample],
+                }
+        finally:
+            conn.close()
+
+        profile = {'db_path': db_path, 'signature': signature, 'tables': tables}
+        with self.lock:
+            self.cache[path] = profile
+            self.stats['profiled'] += 1
+        return profile
+
+    def profile(self, db_path: str) -> Dict:
+        """
+        Schema, columns, row count and sample rows of every table in a database.
+
+        Args:
+            db_path: Path of the SQLite file
+
+        Returns:
+            {'db_path', 'signature', 'tables': {name: {'schema', 'columns', 'row_count', 'sample_data'}}}
+        """
+        profile = self._profile(db_path)
+        self.save_cache()
+        return profile
+
+    def profile_many(self, db_paths: Sequence[str]) -> List[Tuple[str, Optional[Dict], Optional[Exception]]]:
+        """
+        Profile several databases concurrently.
+
+        Args:
+            db_paths: Paths of the SQLite files
+
+        Returns:
+            (db_path, profile, error) per path, in input order; one of profile/error is None
+        """
+        results = []
+        for db_path, (profile, error) in zip(db_paths, self.map(self._profile, db_paths, return_exceptions=True)):
+            results.append((db_path, profile, error))
+        self.save_cache()
+        return results
+
+    def iter_rows(self, db_path: str, sql: str, params: Sequence = ()) -> Iterator[Tuple]:
+        """
+        Stream the rows of a query with fetchmany.
+
+        Args:
+            db_path: Path of the SQLite file
+            sql: Query to run
+            params: Query parameters
+
+        Yields:
+            Row tuples
+        """
+        conn = open_readonly(db_path)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(self.fetch_size)
+                if not rows:
+                    break
+                with self.lock:
+                    self.stats['rows_streamed'] += len(rows)
+                yield from rows
+        finally:
+            conn.close()
+
+    def map(self, function: Callable[[str], Any], db_paths: Sequence[str],
+            return_exceptions: bool = False) -> List[Any]:
+        """
+        Run function(db_path) for several databases on the thread pool.
+
+        Args:
+            function: Called with each path, e.g. a loader built on iter_rows
+            db_paths: Paths of the SQLite files
+            return_exceptions: Return (result, error) pairs instead of raising the first error
+
+        Returns:
+            Results in input order
+        """
+        def call(db_path):
+            try:
+                return function(db_path), None
+            except Exception as e:
+                return None, e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(db_paths)))) as executor:
+            outcomes = list(executor.map(call, db_paths))
+
+        if return_exceptions:
+            return outcomes
+        for result, error in outcomes:
+            if error is not None:
+                raise error
+        return [result for result, _ in outcomes]
+
+    def print_stats(self):
+        """Print a summary of the scanner's work."""
+        print(f"   🔍 Databases profiled: {self.stats['profiled']}")
+        print(f"   ⚡ Profiles from cache: {self.stats['cache_hits']}")
+        print(f"   📜 Rows streamed: {self.stats['rows_streamed']}")
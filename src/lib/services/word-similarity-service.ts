@@ -130,6 +130,53 @@ export class WordSimilarityService {
       return []
     }
   }
+
+  /**
+   * Get precomputed multiple-choice distractors for a word, best first.
+   * Reads vocabulary.distractor_ids (filled by distractor_generator.py) instead of
+   * querying word_similarities at runtime.
+   */
+  static async getDistractors(wordId: number, limit: number = 4): Promise<SimilarWord[]> {
+    try {
+      const effectiveLimit = Math.max(0, Math.floor(limit))
+
+      type DistractorRow = { distractor_ids: number[] | null }
+      const { data: row, error } = await supabase
+        .from('vocabulary')
+        .select('distractor_ids')
+        .eq('id', wordId)
+        .single()
+
+      if (error || !row) return []
+
+      const ids = ((row as unknown as DistractorRow).distractor_ids || []).slice(0, effectiveLimit)
+      if (ids.length === 0) return []
+
+      type VocabRow = { id: number; language_a_word: string; language_b_translation: string; language_a_sentence: string | null; language_b_sentence: string | null }
+      const { data: words, error: vocabError } = await supabase
+        .from('vocabulary')
+        .select('id, language_a_word, language_b_translation, language_a_sentence, language_b_sentence')
+        .in('id', ids)
+
+      if (vocabError || !words) return []
+
+      // Keep the precomputed ranking
+      const byId = new Map((words as unknown as VocabRow[]).map((v) => [v.id, v]))
+      return ids
+        .map((id) => byId.get(id))
+        .filter((v): v is VocabRow => Boolean(v))
+        .map((v) => ({
+          wordId: v.id,
+          word: v.language_a_word,
+          translation: v.language_b_translation,
+          sentence: v.language_a_sentence || undefined,
+          sentenceTranslation: v.language_b_sentence || undefined,
+        } as SimilarWord))
+    } catch (e) {
+      console.error('getDistractors exception:', e)
+      return []
+    }
+  }
 }
 
 
@@ -0,0 +1,81 @@
+-- import_deck: create a deck, its vocabulary and the deck_vocabulary links in one
+-- transactional call.
+--
+-- The deck-building scripts used to insert the deck, then vocabulary in batches of
+-- 100, then the links in another round trip per batch. A failure half way left a
+-- deck with orphan vocabulary. This function does everything in the RPC's single
+-- transaction, so an import either fully exists or not at all.
+--
+-- Imports are idempotent per import_key: calling again with the same key and
+-- content hash returns the existing deck (status 'unchanged'); the same key with
+-- different content is rejected instead of creating a second copy.
+
+CREATE TABLE IF NOT EXISTS public.deck_imports (
+    import_key TEXT PRIMARY KEY,
+    deck_id UUID NOT NULL REFERENCES public.vocabulary_decks(id) ON DELETE CASCADE,
+    content_hash TEXT NOT NULL,
+    word_count INTEGER NOT NULL,
+    imported_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE public.deck_imports IS 'One row per deck created through import_deck(); makes re-running an import a no-op.';
+
+CREATE OR REPLACE FUNCTION public.import_deck(
+    p_import_key TEXT,
+    p_content_hash TEXT,
+    p_deck JSONB,
+    p_words JSONB
+) RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_existing public.deck_imports%ROWTYPE;
+    v_deck_id UUID;
+    v_word_count INTEGER := jsonb_array_length(p_words);
+BEGIN
+    SELECT * INTO v_existing FROM public.deck_imports WHERE import_key = p_import_key FOR UPDATE;
+    IF FOUND THEN
+        IF v_existing.content_hash = p_content_hash THEN
+            RETURN jsonb_build_object('deck_id', v_existing.deck_id, 'status', 'unchanged',
+                                      'word_count', v_existing.word_count);
+        END IF;
+        RAISE EXCEPTION 'Deck import % already exists with different content (deck %)',
+            p_import_key, v_existing.deck_id;
+    END IF;
+
+    -- total_words always reflects what is actually linked
+    INSERT INTO public.vocabulary_decks (
+        name, description, language_a_code, language_b_code, language_a_name,
+        language_b_name, difficulty_level, total_words, is_active
+    ) VALUES (
+        p_deck->>'name', p_deck->>'description', p_deck->>'language_a_code', p_deck->>'language_b_code',
+        p_deck->>'language_a_name', p_deck->>'language_b_name', p_deck->>'difficulty_level',
+        v_word_count, COALESCE((p_deck->>'is_active')::BOOLEAN, TRUE)
+    )
+    RETURNING id INTO v_deck_id;
+
+    -- Ids are drawn up front so each word keeps its position as word_order
+    WITH words AS MATERIALIZED (
+        SELECT nextval(pg_get_serial_sequence('public.vocabulary', 'id')) AS id, w.elem, w.ord
+        FROM jsonb_array_elements(p_words) WITH ORDINALITY AS w(elem, ord)
+    ), inserted AS (
+        INSERT INTO public.vocabulary (id, language_a_word, language_b_translation,
+                                       language_a_sentence, language_b_sentence)
+        SELECT id, elem->>'language_a_word', elem->>'language_b_translation',
+               elem->>'language_a_sentence', elem->>'language_b_sentence'
+        FROM words
+        RETURNING id
+    )
+    INSERT INTO public.deck_vocabulary (deck_id, vocabulary_id, word_order)
+    SELECT v_deck_id, words.id, words.ord
+    FROM words
+    JOIN inserted ON inserted.id = words.id;
+
+    INSERT INTO public.deck_imports (import_key, deck_id, content_hash, word_count)
+    VALUES (p_import_key, v_deck_id, p_content_hash, v_word_count);
+
+    RETURN jsonb_build_object('deck_id', v_deck_id, 'status', 'imported', 'word_count', v_word_count);
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.import_deck(TEXT, TEXT, JSONB, JSONB) TO anon, authenticated, service_role;
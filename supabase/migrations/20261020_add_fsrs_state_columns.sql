@@ -0,0 +1,46 @@
+-- FSRS state on user_progress, plus a bulk backfill function.
+--
+-- Additive columns from docs/SRS_BACKEND_FSRS_MIGRATION.md; the SM-2 columns stay
+-- and srs_algorithm keeps every row on 'sm2' until a cohort is switched.
+--
+-- apply_fsrs_backfill() updates only the FSRS columns of existing rows by id, so
+-- the batch backfill (fsrs_batch.py backfill) never overwrites SM-2 fields that a
+-- user changed while it was running, and it needs no upsert of the NOT NULL keys.
+
+ALTER TABLE public.user_progress ADD COLUMN IF NOT EXISTS srs_algorithm TEXT NOT NULL DEFAULT 'sm2';
+ALTER TABLE public.user_progress ADD COLUMN IF NOT EXISTS scheduler_version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE public.user_progress ADD COLUMN IF NOT EXISTS last_reviewed_at TIMESTAMPTZ;
+ALTER TABLE public.user_progress ADD COLUMN IF NOT EXISTS stability DOUBLE PRECISION;
+ALTER TABLE public.user_progress ADD COLUMN IF NOT EXISTS difficulty DOUBLE PRECISION;
+ALTER TABLE public.user_progress ADD COLUMN IF NOT EXISTS retrievability DOUBLE PRECISION;
+ALTER TABLE public.user_progress ADD COLUMN IF NOT EXISTS elapsed_days INTEGER;
+
+CREATE OR REPLACE FUNCTION public.apply_fsrs_backfill(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.user_progress AS up
+       SET stability = r.stability,
+           difficulty = r.difficulty,
+           retrievability = r.retrievability,
+           elapsed_days = r.elapsed_days,
+           last_reviewed_at = COALESCE(up.last_reviewed_at, r.last_reviewed_at)
+      FROM jsonb_to_recordset(p_rows) AS r(
+               id UUID,
+               stability DOUBLE PRECISION,
+               difficulty DOUBLE PRECISION,
+               retrievability DOUBLE PRECISION,
+               elapsed_days INTEGER,
+               last_reviewed_at TIMESTAMPTZ
+           )
+     WHERE up.id = r.id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
+
+COMMENT ON FUNCTION public.apply_fsrs_backfill(JSONB) IS 'Sets FSRS state columns of user_progress rows by id; used by fsrs_batch.py backfill.';
@@ -0,0 +1,35 @@
+-- Precomputed progress buckets per (user, deck).
+--
+-- Same buckets as SessionQueueManager.calculateMetrics (leech: again_count >= 4,
+-- then interval < 7 / < 21 / < 60 / mastered), written by deck_progress_metrics.py
+-- so the deck list and dashboard read one row instead of every user_progress row
+-- of the deck plus a deck_vocabulary count. deck_id is TEXT like user_progress.deck_id.
+
+CREATE TABLE IF NOT EXISTS public.deck_progress_metrics (
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  deck_id TEXT NOT NULL,
+  total_words INTEGER NOT NULL DEFAULT 0,
+  unseen INTEGER NOT NULL DEFAULT 0,
+  leeches INTEGER NOT NULL DEFAULT 0,
+  learning INTEGER NOT NULL DEFAULT 0,
+  strengthening INTEGER NOT NULL DEFAULT 0,
+  consolidating INTEGER NOT NULL DEFAULT 0,
+  mastered INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (user_id, deck_id)
+);
+
+-- Enable RLS
+ALTER TABLE public.deck_progress_metrics ENABLE ROW LEVEL SECURITY;
+
+-- Policies (rows are written by the service role batch job only)
+DO $$ BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_policies WHERE schemaname='public' AND tablename='deck_progress_metrics' AND policyname='dpm_select_own'
+  ) THEN
+    CREATE POLICY dpm_select_own ON public.deck_progress_metrics
+      FOR SELECT USING (auth.uid() = user_id OR auth.role() = 'service_role');
+  END IF;
+END $$;
+
+COMMENT ON TABLE public.deck_progress_metrics IS 'Per user and deck progress bucket counts; refreshed by deck_progress_metrics.py';
@@ -0,0 +1,36 @@
+-- Materialized study streaks per user.
+--
+-- Written by activity_streaks.py from daily_summary. activity_runs is the user's
+-- active days run-length encoded as [[first_date, days], ...] in date order, so
+-- the streak card and the activity heatmap read one row instead of every
+-- rating_history timestamp. current_streak is as of refreshed_at; readers that
+-- need it for "now" use the last run: it is still current when
+-- last_run_end >= yesterday, and then equals last_run_length.
+-- heatmap_thresholds are the user's reviews_done cut-offs for heatmap levels 1-4.
+
+CREATE TABLE IF NOT EXISTS public.user_activity_streaks (
+  user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+  current_streak INTEGER NOT NULL DEFAULT 0,
+  longest_streak INTEGER NOT NULL DEFAULT 0,
+  active_days INTEGER NOT NULL DEFAULT 0,
+  last_run_end DATE,
+  last_run_length INTEGER NOT NULL DEFAULT 0,
+  activity_runs JSONB NOT NULL DEFAULT '[]'::jsonb,
+  heatmap_thresholds INTEGER[] NOT NULL DEFAULT '{}',
+  refreshed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Enable RLS
+ALTER TABLE public.user_activity_streaks ENABLE ROW LEVEL SECURITY;
+
+-- Policies (rows are written by the service role batch job only)
+DO $$ BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_policies WHERE schemaname='public' AND tablename='user_activity_streaks' AND policyname='uas_select_own'
+  ) THEN
+    CREATE POLICY uas_select_own ON public.user_activity_streaks
+      FOR SELECT USING (auth.uid() = user_id OR auth.role() = 'service_role');
+  END IF;
+END $$;
+
+COMMENT ON TABLE public.user_activity_streaks IS 'Run-length encoded study days and streaks per user; refreshed by activity_streaks.py';
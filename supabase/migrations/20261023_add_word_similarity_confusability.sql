@@ -0,0 +1,45 @@
+-- Learned confusability on word_similarities.
+--
+-- confusable_pair_analytics.py measures, from rating_history, how often a word
+-- gets "again" shortly after its similar neighbour was reviewed, relative to that
+-- word's usual failure rate. The result is stored per similarity row so queue
+-- building and distractor selection can prefer pairs that actually interfere.
+
+-- word_similarities is created outside the migrations (create_word_similarities_table.sql
+-- or fix_word_similarities_table.sql), so only add the columns once it exists.
+DO $$
+BEGIN
+    IF to_regclass('public.word_similarities') IS NOT NULL THEN
+        ALTER TABLE public.word_similarities ADD COLUMN IF NOT EXISTS co_exposures INTEGER;
+        ALTER TABLE public.word_similarities ADD COLUMN IF NOT EXISTS co_failures INTEGER;
+        ALTER TABLE public.word_similarities ADD COLUMN IF NOT EXISTS confusability_weight DOUBLE PRECISION;
+        ALTER TABLE public.word_similarities ADD COLUMN IF NOT EXISTS confusability_updated_at TIMESTAMPTZ;
+    END IF;
+END $$;
+
+CREATE OR REPLACE FUNCTION public.apply_confusability_weights(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.word_similarities AS ws
+       SET co_exposures = r.co_exposures,
+           co_failures = r.co_failures,
+           confusability_weight = r.confusability_weight,
+           confusability_updated_at = NOW()
+      FROM jsonb_to_recordset(p_rows) AS r(
+               id INTEGER,
+               co_exposures INTEGER,
+               co_failures INTEGER,
+               confusability_weight DOUBLE PRECISION
+           )
+     WHERE ws.id = r.id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
+
+COMMENT ON FUNCTION public.apply_confusability_weights(JSONB) IS 'Sets learned confusability columns of word_similarities rows by id; used by confusable_pair_analytics.py.';
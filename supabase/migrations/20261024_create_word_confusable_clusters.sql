@@ -0,0 +1,29 @@
+-- Confusable word clusters.
+--
+-- Written by confusable_clusters.py: communities of the word_similarities graph
+-- (label propagation or connected components). cluster_id is the smallest
+-- vocabulary id in the cluster, so it stays the same across reruns unless the
+-- cluster itself changes. Words without any similar word have no row.
+
+CREATE TABLE IF NOT EXISTS public.word_confusable_clusters (
+    vocabulary_id INTEGER PRIMARY KEY REFERENCES public.vocabulary(id) ON DELETE CASCADE,
+    cluster_id INTEGER NOT NULL,
+    cluster_size INTEGER NOT NULL,
+    method TEXT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_word_confusable_clusters_cluster ON public.word_confusable_clusters(cluster_id);
+
+ALTER TABLE public.word_confusable_clusters ENABLE ROW LEVEL SECURITY;
+
+-- Reference data like word_similarities
+DO $$ BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_policies WHERE schemaname='public' AND tablename='word_confusable_clusters' AND policyname='wcc_select_all'
+  ) THEN
+    CREATE POLICY wcc_select_all ON public.word_confusable_clusters FOR SELECT USING (true);
+  END IF;
+END $$;
+
+COMMENT ON TABLE public.word_confusable_clusters IS 'Cluster of mutually confusable words per vocabulary id; refreshed by confusable_clusters.py';
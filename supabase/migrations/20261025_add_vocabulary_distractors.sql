@@ -0,0 +1,34 @@
+-- Precomputed multiple-choice distractors per word.
+--
+-- distractor_generator.py fills distractor_ids with the vocabulary ids of the
+-- best wrong answers for each word (similar words first, then words of similar
+-- frequency and compatible part of speech), best first. Quiz and tutor flows read
+-- this one column instead of querying word_similarities at runtime.
+
+ALTER TABLE public.vocabulary ADD COLUMN IF NOT EXISTS distractor_ids INTEGER[];
+ALTER TABLE public.vocabulary ADD COLUMN IF NOT EXISTS distractors_updated_at TIMESTAMPTZ;
+
+CREATE OR REPLACE FUNCTION public.apply_distractors(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.vocabulary AS v
+       SET distractor_ids = ARRAY(SELECT e::INTEGER
+                                   FROM jsonb_array_elements_text(r.distractor_ids) WITH ORDINALITY AS t(e, n)
+                                  ORDER BY n),
+           distractors_updated_at = NOW()
+      FROM jsonb_to_recordset(p_rows) AS r(
+               id INTEGER,
+               distractor_ids JSONB
+           )
+     WHERE v.id = r.id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
+
+COMMENT ON FUNCTION public.apply_distractors(JSONB) IS 'Sets vocabulary.distractor_ids by id; used by distractor_generator.py.';
@@ -0,0 +1,30 @@
+-- Per-day review totals rebuilt from rating_history.
+--
+-- Written by daily_summary_rollup.py only. The app keeps incrementing
+-- daily_summary per study session, keyed by the user's local date; this table
+-- holds the batch job's totals instead, recounted from rating_history and cut
+-- into days at a fixed UTC offset, so the two writers never overwrite each other.
+
+CREATE TABLE IF NOT EXISTS public.daily_summary_rollup (
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  date DATE NOT NULL,
+  reviews_done INTEGER NOT NULL DEFAULT 0,
+  new_words_learned INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (user_id, date)
+);
+
+-- Enable RLS
+ALTER TABLE public.daily_summary_rollup ENABLE ROW LEVEL SECURITY;
+
+-- Policies (rows are written by the service role batch job only)
+DO $$ BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_policies WHERE schemaname='public' AND tablename='daily_summary_rollup' AND policyname='dsr_select_own'
+  ) THEN
+    CREATE POLICY dsr_select_own ON public.daily_summary_rollup
+      FOR SELECT USING (auth.uid() = user_id OR auth.role() = 'service_role');
+  END IF;
+END $$;
+
+COMMENT ON TABLE public.daily_summary_rollup IS 'Daily review totals per user recounted from rating_history; refreshed by daily_summary_rollup.py';
@@ -0,0 +1,24 @@
+-- Keep user_progress.updated_at current.
+--
+-- The app's upserts never send updated_at, so without a trigger it keeps its
+-- insert-time default forever. analytics_snapshot.py reads changed progress rows
+-- by updated_at; run `analytics_snapshot.py export --full` once after applying
+-- this so rows changed before the trigger existed are picked up.
+
+ALTER TABLE public.user_progress ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+CREATE OR REPLACE FUNCTION public.set_user_progress_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS update_user_progress_updated_at ON public.user_progress;
+CREATE TRIGGER update_user_progress_updated_at
+    BEFORE UPDATE ON public.user_progress
+    FOR EACH ROW
+    EXECUTE FUNCTION public.set_user_progress_updated_at();
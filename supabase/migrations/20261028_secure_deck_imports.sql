@@ -0,0 +1,85 @@
+-- Lock down deck_imports and run import_deck with the owner's rights.
+--
+-- deck_imports was created without RLS, and Supabase's default privileges grant
+-- anon ALL on new public tables. With the anon key the deck scripts use, anyone
+-- could delete rows (turning idempotency off) or insert keys (blocking imports).
+-- The table is now reachable only through import_deck, which becomes SECURITY
+-- DEFINER with a fixed search_path.
+--
+-- Decks created before 20261019 have no deck_imports row, so their import keys
+-- are unknown to import_deck. Rather than creating a duplicate, the function now
+-- refuses to create a deck whose name already exists; delete the old deck or
+-- insert its deck_imports row by hand to bring it under import_deck.
+
+ALTER TABLE public.deck_imports ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON public.deck_imports FROM anon, authenticated;
+
+CREATE OR REPLACE FUNCTION public.import_deck(
+    p_import_key TEXT,
+    p_content_hash TEXT,
+    p_deck JSONB,
+    p_words JSONB
+) RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_existing public.deck_imports%ROWTYPE;
+    v_deck_id UUID;
+    v_word_count INTEGER := jsonb_array_length(p_words);
+BEGIN
+    SELECT * INTO v_existing FROM public.deck_imports WHERE import_key = p_import_key FOR UPDATE;
+    IF FOUND THEN
+        IF v_existing.content_hash = p_content_hash THEN
+            RETURN jsonb_build_object('deck_id', v_existing.deck_id, 'status', 'unchanged',
+                                      'word_count', v_existing.word_count);
+        END IF;
+        RAISE EXCEPTION 'Deck import % already exists with different content (deck %)',
+            p_import_key, v_existing.deck_id;
+    END IF;
+
+    -- Decks created before deck_imports existed have no import row; refuse to
+    -- create a second deck with the same name instead of duplicating it
+    SELECT id INTO v_deck_id FROM public.vocabulary_decks WHERE name = p_deck->>'name' LIMIT 1;
+    IF FOUND THEN
+        RAISE EXCEPTION 'Deck "%" (deck %) was not created by import_deck; delete it or record it in deck_imports before importing %',
+            p_deck->>'name', v_deck_id, p_import_key;
+    END IF;
+
+    -- total_words always reflects what is actually linked
+    INSERT INTO public.vocabulary_decks (
+        name, description, language_a_code, language_b_code, language_a_name,
+        language_b_name, difficulty_level, total_words, is_active
+    ) VALUES (
+        p_deck->>'name', p_deck->>'description', p_deck->>'language_a_code', p_deck->>'language_b_code',
+        p_deck->>'language_a_name', p_deck->>'language_b_name', p_deck->>'difficulty_level',
+        v_word_count, COALESCE((p_deck->>'is_active')::BOOLEAN, TRUE)
+    )
+    RETURNING id INTO v_deck_id;
+
+    -- Ids are drawn up front so each word keeps its position as word_order
+    WITH words AS MATERIALIZED (
+        SELECT nextval(pg_get_serial_sequence('public.vocabulary', 'id')) AS id, w.elem, w.ord
+        FROM jsonb_array_elements(p_words) WITH ORDINALITY AS w(elem, ord)
+    ), inserted AS (
+        INSERT INTO public.vocabulary (id, language_a_word, language_b_translation,
+                                       language_a_sentence, language_b_sentence)
+        SELECT id, elem->>'language_a_word', elem->>'language_b_translation',
+               elem->>'language_a_sentence', elem->>'language_b_sentence'
+        FROM words
+        RETURNING id
+    )
+    INSERT INTO public.deck_vocabulary (deck_id, vocabulary_id, word_order)
+    SELECT v_deck_id, words.id, words.ord
+    FROM words
+    JOIN inserted ON inserted.id = words.id;
+
+    INSERT INTO public.deck_imports (import_key, deck_id, content_hash, word_count)
+    VALUES (p_import_key, v_deck_id, p_content_hash, v_word_count);
+
+    RETURN jsonb_build_object('deck_id', v_deck_id, 'status', 'imported', 'word_count', v_word_count);
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.import_deck(TEXT, TEXT, JSONB, JSONB) TO anon, authenticated, service_role;
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Supabase Bulk Writer
+
+Pipelined bulk upserts with retry and idempotent resume.
+
+Rows are streamed into batches that are sent on a small thread pool, so several
+upserts are in flight instead of waiting for each response. Batch size adapts to
+the measured payload bytes per row and request latency. Failed batches are retried
+with exponential backoff instead of being dropped. Every committed batch is appended
+to a local JSONL ledger (batch id plus a digest per row); a rerun with the same
+ledger skips rows that were already committed and only sends the rest. The ledger
+only covers an interrupted or partly failed write: once a write finishes with no
+failed rows its entries are cleared, so later runs send everything again (rows may
+have been deleted in between). Give each script its own ledger file.
+"""
+
+import hashlib
+import json
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional
+
+
+def row_digest(row: Dict) -> str:
+    """Stable content digest of a row, used to recognise already committed rows."""
+    payload = json.dumps(row, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def rpc_in_batches(client, function_name: str, rows: List[Dict], batch_size: int = 2000,
+                   max_in_flight: int = 4) -> Dict:
+    """
+    Send rows to a database function taking p_rows JSONB, in concurrent batches.
+
+    Args:
+        client: Supabase client
+        function_name: RPC name; it must return the number of rows it updated
+        rows: Rows to send
+        batch_size: Rows per call
+        max_in_flight: Calls running at once
+
+    Returns:
+        {'updated': rows the function reported, 'failed': rows in failed calls}
+    """
+    stats = {'updated': 0, 'failed': 0}
+    batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+
+    def send(batch):
+        try:
+            return client.rpc(function_name, {'p_rows': batch}).execute().data or 0, 0
+        except Exception as e:
+            print(f"❌ {function_name} batch of {len(batch)} rows failed: {e}")
+            return 0, len(batch)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for updated, failed in executor.map(send, batches):
+            stats['updated'] += updated
+            stats['failed'] += failed
+    return stats
+
+
+class BulkUpsertWriter:
+    def __init__(self, client, table: str, on_conflict: Optional[str] = None,
+                 max_in_flight: int = 4, initial_batch_rows: int = 500,
+                 min_batch_rows: int = 50, max_batch_rows: int = 5000,
+                 target_batch_bytes: int = 512 * 1024, target_latency: float = 2.0,
+                 max_retries: int = 5, base_delay: float = 1.0,
+                 ledger_path: Optional[str] = None):
+        """
+        Initialize the writer.
+
+        Args:
+            client: Supabase client
+            table: Table to upsert into
+            on_conflict: Comma-separated conflict columns passed to upsert()
+            max_in_flight: Maximum number of batches being sent at once
+            initial_batch_rows: Rows in the first batch
+            min_batch_rows: Lower bound for adaptive batch size
+            max_batch_rows: Upper bound for adaptive batch size
+            target_batch_bytes: Payload size batches are sized towards
+            target_latency: Batches slower than this shrink, much faster ones grow
+            max_retries: Attempts per batch before it is reported as failed
+            base_delay: First backoff delay in seconds (doubles per attempt)
+            ledger_path: JSONL ledger of committed batches (None disables resume);
+                cleared after a write without failed rows
+        """
+        self.client = client
+        self.table = table
+        self.on_conflict = on_conflict
+        self.max_in_flight = max_in_flight
+        self.batch_rows = initial_batch_rows
+        self.min_batch_rows = min_batch_rows
+        self.max_batch_rows = max_batch_rows
+        self.target_batch_bytes = target_batch_bytes
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.ledger_path = ledger_path
+
+        self.committed_digests = set()
+        self.bytes_per_row: Optional[float] = None
+        self.stats = {
+            'rows_sent': 0,
+            'rows_skipped': 0,
+            'rows_failed': 0,
+            'batches_committed': 0,
+            'batches_failed': 0,
+            'retries': 0,
+            'seconds': 0.0,
+        }
+        self.load_ledger()
+
+    def load_ledger(self):
+        """Load digests of rows committed by earlier runs."""
+        if not self.ledger_path or not os.path.exists(self.ledger_path):
+            return
+        batches = 0
+        with open(self.ledger_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get('table') == self.table:
+                    self.committed_digests.update(entry.get('rows', []))
+                    batches += 1
+        if batches:
+            print(f"📒 Ledger: {batches} committed batches, {len(self.committed_digests)} rows will be skipped")
+
+    def record_batch(self, batch_id: str, digests: List[str]):
+        """Append a committed batch to the ledger."""
+        self.committed_digests.update(digests)
+        if not self.ledger_path:
+            return
+        with open(self.ledger_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'table': self.table, 'batch': batch_id, 'rows': digests}) + "\n")
+            f.flush()
+
+    def clear_ledger(self):
+        """Drop this table's ledger entries (entries of other tables are kept)."""
+        self.committed_digests.clear()
+        if not self.ledger_path or not os.path.exists(self.ledger_path):
+            return
+        with open(self.ledger_path, 'r', encoding='utf-8') as f:
+            kept = []
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get('table') != self.table:
+                    kept.append(line if line.endswith("\n") else line + "\n")
+        if kept:
+            tmp_path = self.ledger_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(kept)
+            os.replace(tmp_path, self.ledger_path)
+        else:
+            os.remove(self.ledger_path)
+        print(f"📒 Ledger cleared for {self.table}: write completed without failures")
+
+    def send_batch(self, rows: List[Dict]) -> Dict:
+        """Upsert one batch, retrying with exponential backoff. Runs on a worker thread."""
+        payload_bytes = len(json.dumps(rows, default=str).encode("utf-8"))
+        retries = 0
+        last_error = None
+        for attempt in range(self.max_retries):
+            started = time.monotonic()
+            try:
+                query = self.client.table(self.table)
+                if self.on_conflict:
+                    query.upsert(rows, on_conflict=self.on_conflict).execute()
+                else:
+                    query.upsert(rows).execute()
+                return {'ok': True, 'latency': time.monotonic() - started,
+                        'bytes': payload_bytes, 'retries': retries}
+            except Exception as e:
+                last_error = e
+                retries += 1
+                if attempt < self.max_retries - 1:
+                    delay = self.base_delay * (2 ** attempt) + random.uniform(0, self.base_delay)
+                    time.sleep(delay)
+        return {'ok': False, 'error': last_error, 'bytes': payload_bytes, 'retries': retries - 1}
+
+    def adapt(self, rows: int, payload_bytes: int, latency: float):
+        """Resize future batches from the measured payload size and latency."""
+        per_row = payload_bytes / max(rows, 1)
+        self.bytes_per_row = per_row if self.bytes_per_row is None else 0.7 * self.bytes_per_row + 0.3 * per_row
+        target = int(self.target_batch_bytes / self.bytes_per_row)
+
+        if latency > self.target_latency:
+            target = min(target, int(self.batch_rows * 0.7))
+        elif latency < self.target_latency / 2:
+            target = min(target, int(self.batch_rows * 1.5))
+        else:
+            target = min(target, self.batch_rows)
+
+        self.batch_rows = max(self.min_batch_rows, min(self.max_batch_rows, target))
+
+    def write(self, rows: Iterable[Dict]) -> Dict:
+        """
+        Upsert rows with up to max_in_flight batches outstanding.
+
+        Args:
+            rows: Rows to upsert; consumed lazily
+
+        Returns:
+            Stats dict (rows_sent, rows_skipped, rows_failed, batches_committed, ...)
+        """
+        started = time.monotonic()
+        in_flight = {}
+        pending: List[Dict] = []
+        pending_digests: List[str] = []
+
+        def handle(future):
+            batch_rows, digests = in_flight.pop(future)
+            outcome = future.result()
+            self.stats['retries'] += outcome['retries']
+            if outcome['ok']:
+                batch_id = hashlib.sha1("".join(digests).encode("utf-8")).hexdigest()[:16]
+                self.record_batch(batch_id, digests)
+                self.stats['rows_sent'] += len(batch_rows)
+                self.stats['batches_committed'] += 1
+                self.adapt(len(batch_rows), outcome['bytes'], outcome['latency'])
+                print(f"✅ Upserted {self.stats['rows_sent']} rows into {self.table} "
+                      f"(batch {len(batch_rows)}, {outcome['latency']:.2f}s, next {self.batch_rows})")
+            else:
+                self.stats['rows_failed'] += len(batch_rows)
+                self.stats['batches_failed'] += 1
+                print(f"❌ Batch of {len(batch_rows)} rows failed after {self.max_retries} attempts: {outcome['error']}")
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            def submit():
+                nonlocal pending, pending_digests
+                # Keep at most max_in_flight batches outstanding
+                while len(in_flight) >= self.max_in_flight:
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        handle(future)
+                future = executor.submit(self.send_batch, pending)
+                in_flight[future] = (pending, pending_digests)
+                pending, pending_digests = [], []
+
+            for row in rows:
+                digest = row_digest(row)
+                if digest in self.committed_digests:
+                    self.stats['rows_skipped'] += 1
+                    continue
+                pending.append(row)
+                pending_digests.append(digest)
+                if len(pending) >= self.batch_rows:
+                    submit()
+
+            if pending:
+                submit()
+            while in_flight:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    handle(future)
+
+        self.stats['seconds'] = time.monotonic() - started
+        # Nothing left to resume; stale digests would hide rows deleted before the next run
+        if self.stats['rows_failed'] == 0:
+            self.clear_ledger()
+        return self.stats
+
+    def print_stats(self):
+        """Print a summary of the last write."""
+        seconds = self.stats['seconds'] or 1e-9
+        print(f"   ✅ Rows upserted: {self.stats['rows_sent']} in {self.stats['batches_committed']} batches")
+        print(f"   ⏭️  Rows skipped (already in ledger): {self.stats['rows_skipped']}")
+        print(f"   ❌ Rows failed: {self.stats['rows_failed']} ({self.stats['batches_failed']} batches)")
+        print(f"   🔁 Retries: {self.stats['retries']}")
+        print(f"   🚀 Throughput: {self.stats['rows_sent'] / seconds:.0f} rows/s over {self.stats['seconds']:.1f}s")
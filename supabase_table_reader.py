@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Supabase Table Reader
+
+Streams rows out of a Supabase table with keyset pagination and parallel pages.
+
+Instead of `select('*', count='exact')` followed by serial `.range(offset, ...)`
+calls, the reader looks up the smallest and largest key, splits that range into
+partitions and walks each partition with `key > last` pages on its own thread. Only
+the requested columns are fetched, no count is computed, and rows are yielded as
+soon as a page arrives so callers can start work immediately with flat memory.
+
+Rows from different partitions interleave, so output is not globally ordered. The
+key column should be unique; with a non-unique key rows that share a key value
+across a page boundary can be skipped (fine when only distinct values are needed).
+
+`iter_rows_by_ids` covers the other common read: all rows matching a long id list.
+The ids are split into bounded `in_()` chunks so request URLs stay short, chunks are
+fetched concurrently, and each chunk is paged so the PostgREST row cap never
+silently truncates a result.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+_DONE = object()
+
+
+def _first_key(client, table: str, key: str, filters: Optional[Callable], descending: bool):
+    query = client.table(table).select(key)
+    if filters:
+        query = filters(query)
+    result = query.order(key, desc=descending).limit(1).execute()
+    return result.data[0][key] if result.data else None
+
+
+def iter_table_rows(client, table: str, columns: List[str], key: str = 'id',
+                    page_size: int = 1000, max_workers: int = 4,
+                    filters: Optional[Callable] = None) -> Iterator[Dict]:
+    """
+    Yield rows from a table using parallel keyset pagination.
+
+    Args:
+        client: Supabase client
+        table: Table name
+        columns: Columns to fetch (the key column is added if missing)
+        key: Integer key column used for keyset pagination and partitioning
+        page_size: Rows per request (keep at or below the PostgREST max-rows setting)
+        max_workers: Number of partitions fetched in parallel
+        filters: Optional function applying extra filters to each query builder,
+            e.g. lambda q: q.in_('deck_id', deck_ids)
+
+    Yields:
+        Row dicts as pages arrive
+    """
+    select_columns = list(columns) if key in columns or '*' in columns else [key] + list(columns)
+    select_clause = ",".join(select_columns)
+
+    lowest = _first_key(client, table, key, filters, descending=False)
+    if lowest is None:
+        return
+    highest = _first_key(client, table, key, filters, descending=True)
+
+    # Integer keys are split into equal ranges; anything else is read as one partition
+    if isinstance(lowest, int) and isinstance(highest, int) and max_workers > 1:
+        span = highest - lowest + 1
+        step = max(1, -(-span // max_workers))
+        partitions = [(start - 1, min(start + step - 1, highest))
+                      for start in range(lowest, highest + 1, step)]
+    else:
+        partitions = [(None, None)]
+
+    pages: queue.Queue = queue.Queue(maxsize=max(2, 2 * len(partitions)))
+    stop = threading.Event()
+
+    def read_partition(after, upper):
+        try:
+            while not stop.is_set():
+                query = client.table(table).select(select_clause)
+                if filters:
+                    query = filters(query)
+                if after is not None:
+                    query = query.gt(key, after)
+                if upper is not None:
+                    query = query.lte(key, upper)
+                rows = query.order(key).limit(page_size).execute().data or []
+                if rows:
+                    pages.put(rows)
+                    after = rows[-1][key]
+                if len(rows) < page_size:
+                    break
+        except Exception as e:
+            pages.put(e)
+        finally:
+            pages.put(_DONE)
+
+    threads = [threading.Thread(target=read_partition, args=partition, daemon=True)
+               for partition in partitions]
+    for thread in threads:
+        thread.start()
+
+    finished = 0
+    try:
+        while finished < len(threads):
+            item = pages.get()
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield from item
+    finally:
+        # Stop workers if the caller stops early or an error is raised
+        stop.set()
+        while any(thread.is_alive() for thread in threads):
+            try:
+                pages.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def iter_rows_by_ids(client, table: str, column: str, ids: Iterable, columns: Optional[List[str]] = None,
+                     order_key: str = 'id', chunk_size: int = 200, page_size: int = 1000,
+                     max_workers: int = 8, filters: Optional[Callable] = None) -> Iterator[Dict]:
+    """
+    Yield rows whose column is in ids, using bounded concurrent in_() chunks.
+
+    Args:
+        client: Supabase client
+        table: Table name
+        column: Column matched against the ids
+        ids: Ids to look up (duplicates are ignored)
+        columns: Columns to fetch (default all)
+        order_key: Unique column used to page through a chunk's result
+        chunk_size: Ids per request; keeps request URLs well below server limits
+        page_size: Rows per page (keep at or below the PostgREST max-rows setting)
+        max_workers: Number of chunks fetched concurrently
+        filters: Optional function applying extra filters to each query builder
+
+    Yields:
+        Row dicts, chunk by chunk as they complete
+    """
+    distinct = list(dict.fromkeys(ids))
+    if not distinct:
+        return
+    select_clause = ",".join(columns or ['*'])
+    chunks = [distinct[i:i + chunk_size] for i in range(0, len(distinct), chunk_size)]
+
+    def fetch_chunk(chunk):
+        rows = []
+        offset = 0
+        while True:
+            query = client.table(table).select(select_clause).in_(column, chunk)
+            if filters:
+                query = filters(query)
+            page = query.order(order_key).range(offset, offset + page_size - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            offset += page_size
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fetch_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
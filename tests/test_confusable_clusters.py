@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from confusable_clusters import ConfusableClusters, connected_components, study_sets, undirected_edges
+
+
+def random_graph(node_count, edge_count, seed=0):
+    rng = np.random.default_rng(seed)
+    sources = rng.integers(0, node_count, edge_count)
+    targets = rng.integers(0, node_count, edge_count)
+    return undirected_edges(node_count, sources, targets, np.ones(edge_count))
+
+
+def test_undirected_edges_keeps_larger_duplicate_weight():
+    rows, cols, weights = undirected_edges(3, np.array([0, 1, 2]), np.array([1, 0, 2]), np.array([0.2, 0.7, 1.0]))
+    assert list(zip(rows.tolist(), cols.tolist())) == [(0, 1), (1, 0)]
+    np.testing.assert_allclose(weights, [0.7, 0.7])
+
+
+def test_connected_components_puts_both_ends_of_every_edge_together():
+    rows, cols, _ = random_graph(500, 400)
+    labels = connected_components(500, rows, cols)
+    np.testing.assert_array_equal(labels[rows], labels[cols])
+
+
+def test_connected_components_labels_with_smallest_node():
+    # 4-3-2 chain plus 0-5, node 1 isolated
+    rows, cols, _ = undirected_edges(6, np.array([4, 3, 0]), np.array([3, 2, 5]), np.ones(3))
+    assert connected_components(6, rows, cols).tolist() == [0, 1, 2, 2, 2, 0]
+
+
+@pytest.mark.parametrize('max_set_size', [2, 5, 10])
+def test_study_sets_respect_size_and_cover_connected_words(max_set_size):
+    rows, cols, _ = random_graph(300, 250, seed=1)
+    labels = connected_components(300, rows, cols)
+    sets = study_sets(labels, rows, cols, max_set_size)
+
+    assert all(len(s) <= max_set_size for s in sets)
+    covered = [node for s in sets for node in s]
+    assert len(covered) == len(set(covered))
+    assert set(covered) == set(rows.tolist())
+    for s in sets:
+        assert len({int(labels[node]) for node in s}) == 1
+
+
+@pytest.mark.parametrize('method', ['labels', 'components'])
+def test_cluster_ids_are_smallest_node_id(method):
+    node_ids = np.array([50, 10, 40, 30, 20])
+    # 50-10 and 40-30-20
+    result = ConfusableClusters(method=method).cluster(node_ids, np.array([0, 2, 3]), np.array([1, 3, 4]),
+                                                       np.ones(3))
+    assert result['cluster'].tolist() == [10, 10, 20, 20, 20]
+    assert result['size'].tolist() == [2, 2, 3, 3, 3]
+    assert sorted(map(sorted, result['sets'])) == [[0, 1], [2, 3, 4]]
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from fsrs_batch import (DEFAULT_PARAMETERS, ReviewLog, encode_ratings, log_loss, next_interval, replay,
+                        retrievability, step)
+
+W = DEFAULT_PARAMETERS
+
+
+def review_rows(user_id, word_id, ratings, start_day=1):
+    """rating_history rows for one card, one rating every other day."""
+    return [{'user_id': user_id, 'word_id': word_id, 'deck_id': 'deck', 'rating': rating,
+             'timestamp': f"2026-01-{start_day + 2 * i:02d}T09:00:00+00:00"}
+            for i, rating in enumerate(ratings)]
+
+
+def test_new_card_rated_good_starts_at_initial_weights():
+    stability, difficulty, recall = step(np.array([np.nan]), np.array([np.nan]), np.array([0.0]),
+                                         np.array([3]), W)
+    assert stability[0] == pytest.approx(W[2])
+    assert difficulty[0] == pytest.approx(W[4])
+    assert np.isnan(recall[0])
+
+
+def test_new_card_initial_stability_per_rating():
+    stability, _, _ = step(np.full(4, np.nan), np.full(4, np.nan), np.zeros(4), np.arange(1, 5), W)
+    np.testing.assert_allclose(stability, W[:4])
+
+
+def test_retrievability_is_ninety_percent_after_stability_days():
+    assert retrievability(np.array([7.0]), np.array([7.0]))[0] == pytest.approx(0.9)
+    assert next_interval(np.array([7.0]))[0] == 7
+
+
+def test_success_grows_and_failure_shrinks_stability():
+    stability, difficulty = np.array([5.0, 5.0]), np.array([5.0, 5.0])
+    new_stability, new_difficulty, recall = step(stability, difficulty, np.array([5.0, 5.0]), np.array([3, 1]), W)
+    assert new_stability[0] > 5.0
+    assert new_stability[1] < 5.0
+    assert new_difficulty[1] > new_difficulty[0]
+    np.testing.assert_allclose(recall, retrievability(np.array([5.0, 5.0]), stability))
+
+
+def test_per_card_weights_match_shared_weights():
+    ratings = np.array([1, 2, 3, 4])
+    shared = step(np.full(4, 3.0), np.full(4, 6.0), np.full(4, 2.0), ratings, W)
+    per_card = step(np.full(4, 3.0), np.full(4, 6.0), np.full(4, 2.0), ratings, np.tile(W, (4, 1)))
+    for a, b in zip(shared, per_card):
+        np.testing.assert_allclose(a, b)
+
+
+def test_replay_matches_stepping_one_review_at_a_time():
+    rows = review_rows('u1', 1, ['good', 'again', 'good', 'easy'])
+    log = ReviewLog.from_rows(rows)
+    stability, difficulty, _, predicted = replay(log, W)
+
+    s, d = np.array([np.nan]), np.array([np.nan])
+    ratings = encode_ratings(['good', 'again', 'good', 'easy'])
+    for i, rating in enumerate(ratings):
+        s, d, _ = step(s, d, np.array([0.0 if i == 0 else 2.0]), np.array([rating], dtype=np.int64), W)
+    assert stability[0] == pytest.approx(s[0])
+    assert difficulty[0] == pytest.approx(d[0])
+    assert np.isnan(predicted[0]) and not np.isnan(predicted[1:]).any()
+
+
+def test_from_rows_skips_learn_and_know_ratings():
+    rows = review_rows('u1', 1, ['learn', 'good', 'know', 'good'])
+    log = ReviewLog.from_rows(rows)
+    assert len(log) == 2
+    assert log.rating.tolist() == [3, 3]
+
+
+def test_subset_renumbers_cards_to_its_own():
+    rows = (review_rows('u1', 1, ['good', 'hard', 'good']) + review_rows('u2', 1, ['again', 'good'])
+            + review_rows('u1', 2, ['good', 'good']) + review_rows('u3', 7, ['easy', 'again', 'good']))
+    log = ReviewLog.from_rows(rows)
+    user = log.user_ids.index('u1')
+    subset = log.subset(log.user == user)
+
+    assert len(subset.card_keys) == 2
+    assert sorted(subset.card_keys) == [('u1', 1, 'deck'), ('u1', 2, 'deck')]
+    assert set(subset.card.tolist()) == {0, 1}
+
+    alone = ReviewLog.from_rows([row for row in rows if row['user_id'] == 'u1'])
+    assert log_loss(subset, W) == pytest.approx(log_loss(alone, W))
+    stability, _, _, _ = replay(subset, W)
+    alone_stability, _, _, _ = replay(alone, W)
+    index = {key: i for i, key in enumerate(alone.card_keys)}
+    np.testing.assert_allclose(stability, alone_stability[[index[key] for key in subset.card_keys]])
+
+
+def test_cards_subset_keeps_all_reviews_of_the_chosen_cards():
+    rows = review_rows('u1', 1, ['good', 'hard', 'good']) + review_rows('u1', 2, ['good', 'good'])
+    log = ReviewLog.from_rows(rows)
+    subset = log.cards_subset(np.array([log.card_keys.index(('u1', 2, 'deck'))]))
+    assert subset.card_keys == [('u1', 2, 'deck')]
+    assert len(subset) == 2
@@ -0,0 +1,44 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from review_load_simulator import sm2_step
+
+RATINGS = {'again': 1, 'hard': 2, 'good': 3, 'easy': 4}
+
+
+def calculate_next_review(current_interval, ease_factor, repetitions, rating):
+    """Line-for-line port of calculateNextReview in src/lib/utils.ts."""
+    if rating == 'again':
+        return 0, max(1.3, ease_factor - 0.2), 0
+    if rating == 'hard':
+        return max(1, math.ceil(current_interval / 2)), max(1.3, ease_factor - 0.15), repetitions
+    if repetitions == 0:
+        interval = 1
+    elif repetitions == 1:
+        interval = 6
+    else:
+        interval = math.ceil(current_interval * ease_factor)
+    rating_value = 4 if rating == 'good' else 5
+    ease = max(1.3, ease_factor + (0.1 - (5 - rating_value) * (0.08 + (5 - rating_value) * 0.02)))
+    return interval, ease, repetitions + 1
+
+
+def test_sm2_step_matches_calculate_next_review():
+    cases = list(itertools.product([0, 1, 3, 6, 15, 40], [1.3, 1.4, 2.5, 2.9], [0, 1, 2, 5], RATINGS))
+    interval, ease, repetitions, rating = (np.array(column) for column in zip(*cases))
+    new_interval, new_ease, new_repetitions = sm2_step(interval.astype(float), ease, repetitions,
+                                                       np.array([RATINGS[r] for r in rating]))
+
+    for i, case in enumerate(cases):
+        expected = calculate_next_review(*case)
+        assert new_interval[i] == expected[0], case
+        assert new_ease[i] == pytest.approx(expected[1]), case
+        assert new_repetitions[i] == expected[2], case
+
+
+def test_sm2_step_keeps_minimum_ease_factor():
+    _, ease, _ = sm2_step(np.array([10.0, 10.0]), np.array([1.3, 1.35]), np.array([3, 3]), np.array([1, 2]))
+    np.testing.assert_allclose(ease, [1.3, 1.3])
@@ -0,0 +1,48 @@
+import numpy as np
+
+from word_order_optimizer import frequency_priority, min_neighbour_distance, neighbour_csr, schedule
+
+
+def test_neighbour_csr_is_symmetric_and_drops_outside_edges():
+    word_ids = np.array([30, 10, 20])
+    indptr, indices = neighbour_csr(word_ids, np.array([10, 10, 20, 99, 30]), np.array([20, 20, 30, 10, 30]))
+    neighbours = {node: sorted(indices[indptr[node]:indptr[node + 1]].tolist()) for node in range(3)}
+    # 10-20 (duplicated) and 20-30; the edge to 99 and the self-loop on 30 are dropped
+    assert neighbours == {0: [2], 1: [2], 2: [0, 1]}
+
+
+def test_schedule_keeps_minimum_gap_when_feasible():
+    # Confusable pairs that start out next to each other in a 200-word deck
+    word_ids = np.arange(1000, 1200)
+    indptr, indices = neighbour_csr(word_ids, word_ids[0:60:3], word_ids[1:60:3])
+    assert min_neighbour_distance(np.arange(200), indptr, indices) == 1
+
+    order, violations = schedule(np.arange(200, dtype=np.float64), indptr, indices, min_gap=25)
+    assert violations == 0
+    assert sorted(order.tolist()) == list(range(200))
+    assert min_neighbour_distance(order, indptr, indices) >= 25
+
+
+def test_schedule_follows_priority_without_edges():
+    word_ids = np.arange(6)
+    indptr, indices = neighbour_csr(word_ids, np.array([], dtype=np.int64), np.array([], dtype=np.int64))
+    priority = np.array([3.0, 0.0, 5.0, 1.0, 4.0, 2.0])
+    order, violations = schedule(priority, indptr, indices, min_gap=10)
+    assert order.tolist() == [1, 3, 5, 0, 4, 2]
+    assert violations == 0
+    assert min_neighbour_distance(order, indptr, indices) is None
+
+
+def test_schedule_counts_violations_when_gap_is_impossible():
+    # A triangle cannot be spread 5 apart in 3 positions
+    word_ids = np.array([1, 2, 3])
+    indptr, indices = neighbour_csr(word_ids, np.array([1, 2, 1]), np.array([2, 3, 3]))
+    order, violations = schedule(np.zeros(3), indptr, indices, min_gap=5)
+    assert sorted(order.tolist()) == [0, 1, 2]
+    assert violations == 2
+
+
+def test_frequency_priority_puts_ranked_words_first():
+    word_ids = np.array([7, 8, 9, 10])
+    priority = frequency_priority(word_ids, np.arange(4), {9: 5, 10: 2})
+    assert np.argsort(priority).tolist() == [3, 2, 0, 1]
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Vocabulary ID Resolver
+
+Resolves many vocabulary words to their `vocabulary.id` in a handful of requests.
+
+Callers collect every distinct word up front and call `resolve()` once. Words already
+in the local JSON cache are answered without a request; the rest are fetched with
+`in_()` filters in pages that run concurrently. Found ids are written back to the
+cache so the next run of a relationship migration only asks for new words.
+
+Decks are routinely deleted and re-imported, which gives their words new ids, so
+cached ids are re-checked once per run with `in_('id', ...)` pages (much cheaper
+than resolving by word); entries whose row is gone or now holds another word are
+dropped and resolved again. `refresh=True` ignores the cache altogether.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+
+class VocabularyIdResolver:
+    def __init__(self, client, column: str = 'language_a_word',
+                 cache_path: Optional[str] = "vocabulary_id_cache.json",
+                 page_size: int = 150, max_workers: int = 8):
+        """
+        Initialize the resolver.
+
+        Args:
+            client: Supabase client
+            column: Vocabulary column the words are matched against (exact match)
+            cache_path: JSON file for the persistent word→id cache (None disables it)
+            page_size: Words per in_() request; bounded to keep request URLs short
+            max_workers: Number of pages fetched concurrently
+        """
+        self.client = client
+        self.column = column
+        self.cache_path = cache_path
+        self.page_size = page_size
+        self.max_workers = max_workers
+
+        self.cache: Dict[str, int] = {}
+        self.verified = False
+        self.requests_made = 0
+        self.cache_hits = 0
+        self.stale_entries = 0
+        self.load_cache()
+
+    def load_cache(self):
+        """Load the persistent cache for this column, if present."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f).get(self.column, {})
+            print(f"📂 Loaded {len(self.cache)} cached vocabulary ids from {self.cache_path}")
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load vocabulary id cache: {e}")
+            self.cache = {}
+
+    def save_cache(self):
+        """Write the cache back atomically, keeping entries for other columns."""
+        if not self.cache_path:
+            return
+        data = {}
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        data[self.column] = self.cache
+
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def fetch_page(self, words: List[str]) -> Dict[str, int]:
+        """Fetch ids for one page of words."""
+        result = self.client.table('vocabulary').select(f'id,{self.column}').in_(self.column, words).execute()
+        found: Dict[str, int] = {}
+        for row in result.data or []:
+            word = row.get(self.column)
+            word_id = row.get('id')
+            if word is None or word_id is None:
+                continue
+            # Keep the lowest id when a word appears more than once
+            if word not in found or word_id < found[word]:
+                found[word] = word_id
+        return found
+
+    def fetch_ids_page(self, ids: List[int]) -> Dict[int, str]:
+        """Current word of each id in one page of ids (deleted ids are absent)."""
+        result = self.client.table('vocabulary').select(f'id,{self.column}').in_('id', ids).execute()
+        return {row['id']: row.get(self.column) for row in result.data or []}
+
+    def verify_cache(self):
+        """Drop cached entries whose id no longer exists or now holds a different word."""
+        self.verified = True
+        if not self.cache:
+            return
+        ids = sorted(set(self.cache.values()))
+        pages = [ids[i:i + self.page_size] for i in range(0, len(ids), self.page_size)]
+        current: Dict[int, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for found in executor.map(self.fetch_ids_page, pages):
+                current.update(found)
+        self.requests_made += len(pages)
+
+        stale = [word for word, word_id in self.cache.items() if current.get(word_id) != word]
+        for word in stale:
+            del self.cache[word]
+        self.stale_entries += len(stale)
+        if stale:
+            print(f"🧹 Dropped {len(stale)} stale cached vocabulary ids")
+            self.save_cache()
+
+    def resolve(self, words: Iterable[str], refresh: bool = False) -> Dict[str, int]:
+        """
+        Resolve words to vocabulary ids.
+
+        Args:
+            words: Words to look up (matched exactly against the column)
+            refresh: Ignore cached ids and fetch everything again (otherwise the
+                cache is verified against the vocabulary table on first use)
+
+        Returns:
+            Mapping of word → id for the words that exist; missing words are absent
+        """
+        distinct = [word for word in dict.fromkeys(words) if word]
+
+        if refresh:
+            to_fetch = distinct
+            for word in to_fetch:
+                self.cache.pop(word, None)
+        else:
+            if not self.verified:
+                self.verify_cache()
+            to_fetch = [word for word in distinct if word not in self.cache]
+            self.cache_hits += len(distinct) - len(to_fetch)
+
+        if to_fetch:
+            pages = [to_fetch[i:i + self.page_size] for i in range(0, len(to_fetch), self.page_size)]
+            print(f"🔎 Resolving {len(to_fetch)} words in {len(pages)} requests "
+                  f"({len(distinct) - len(to_fetch)} cached)")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for found in executor.map(self.fetch_page, pages):
+                    self.cache.update(found)
+            self.requests_made += len(pages)
+            self.save_cache()
+
+        return {word: self.cache[word] for word in distinct if word in self.cache}
+
+    def print_stats(self):
+        """Print request and cache statistics."""
+        print(f"   🔎 Resolver requests: {self.requests_made}")
+        print(f"   🗄️  Resolver cache hits: {self.cache_hits}")
+        print(f"   🧹 Stale cache entries dropped: {self.stale_entries}")